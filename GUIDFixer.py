@@ -1,17 +1,139 @@
 import os
-import sys
-import re
 import json
+import time
+import queue
 import threading
+from collections import deque
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 
+from GUIDFixerEngine import GUIDFixerEngine, PACKAGE_CATALOG_FILE, SOURCE_INDEX_DEPTH, MATCH_MODES, LOG_LEVELS, DEBUG, INFO, WARNING, ERROR
+from GUIDFixerProfile import PROFILE_FILE
+
+# LogPump: worker threads never touch Tk widgets, they only put into a bounded queue
+# which the Tk thread drains every PUMP_INTERVAL_MS (at most PUMP_MAX_ITEMS per tick).
+PUMP_INTERVAL_MS = 50
+PUMP_MAX_ITEMS = 2000
+LOG_QUEUE_SIZE = 10000
+LOG_HISTORY_LINES = 20000 # In-memory ring buffer (all levels, used when the level filter changes)
+LOG_WIDGET_LINES = 5000 # Lines kept in the log widget
+LOG_TAGS = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+
+class LogPump:
+    def __init__(self, root, widget, level=INFO):
+        self.root = root
+        self.widget = widget
+        self.level = level
+        self.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.history = deque(maxlen=LOG_HISTORY_LINES) # (level, message)
+        self.dropped = 0
+        self.log_file = None
+        self.file_lock = threading.Lock()
+        self.ui_thread = threading.current_thread()
+
+        self.widget.tag_config("debug", foreground="#808080")
+        self.widget.tag_config("warning", foreground="#b36b00")
+        self.widget.tag_config("error", foreground="#cc0000")
+        self.root.after(PUMP_INTERVAL_MS, self.pump)
+
+    def log(self, message, level=INFO):
+        # Any thread. Never blocks: if the UI falls behind, messages are counted as dropped
+        # (they are still in the history and the log file).
+        self.history.append((level, message))
+        if self.log_file:
+            with self.file_lock:
+                if self.log_file:
+                    self.log_file.write(f"{time.strftime('%H:%M:%S')} {LOG_TAGS.get(level, 'info').upper():7} {message}\n")
+        if level < self.level:
+            return
+        try:
+            self.queue.put_nowait((level, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def call(self, func, *args, **kwargs):
+        # Run a UI update on the Tk thread (in order with the log lines queued before it)
+        if threading.current_thread() is self.ui_thread:
+            func(*args, **kwargs)
+        else:
+            self.queue.put((None, lambda: func(*args, **kwargs)))
+
+    def set_level(self, level):
+        # Re-render the widget from the ring buffer with the new filter
+        self.level = level
+        lines = [(lvl, msg) for lvl, msg in list(self.history) if lvl >= level][-LOG_WIDGET_LINES:]
+        self.widget.config(state='normal')
+        self.widget.delete("1.0", tk.END)
+        self.widget.config(state='disabled')
+        self.write_lines(lines)
+
+    def set_log_file(self, path):
+        # Full log (all levels) from now on; None closes the current file
+        with self.file_lock:
+            if self.log_file:
+                self.log_file.close()
+            self.log_file = open(path, 'a', encoding='utf-8') if path else None
+
+    def pump(self):
+        lines = []
+        try:
+            for _ in range(PUMP_MAX_ITEMS):
+                level, item = self.queue.get_nowait()
+                if level is None:
+                    self.write_lines(lines)
+                    lines = []
+                    item()
+                else:
+                    lines.append((level, item))
+        except queue.Empty:
+            pass
+
+        if self.dropped:
+            lines.append((WARNING, f"... {self.dropped} log lines not shown (UI busy), see the log file / lower verbosity."))
+            self.dropped = 0
+        self.write_lines(lines)
+        if self.log_file:
+            with self.file_lock:
+                if self.log_file:
+                    self.log_file.flush()
+        self.root.after(PUMP_INTERVAL_MS, self.pump)
+
+    def write_lines(self, lines):
+        if not lines:
+            return
+        self.widget.config(state='normal')
+        # One insert per run of same-level lines
+        run_level, run = lines[0][0], []
+        for level, message in lines:
+            if level != run_level:
+                self.widget.insert(tk.END, "\n".join(run) + "\n", LOG_TAGS.get(run_level, "info"))
+                run_level, run = level, []
+            run.append(message)
+        self.widget.insert(tk.END, "\n".join(run) + "\n", LOG_TAGS.get(run_level, "info"))
+
+        excess = int(self.widget.index("end-1c").split(".")[0]) - 1 - LOG_WIDGET_LINES
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+        self.widget.see(tk.END)
+        self.widget.config(state='disabled')
+
 class GUIDFixerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Unity GUID Fixer")
         self.root.geometry("1000x800")
 
+        # GUI-free engine doing the actual work (also used by GUIDFixerCLI.py)
+        # The persistent meta GUID cache lives next to the project, like settings.json
+        # Replacement uses one worker process per CPU
+        # The engine may already log while it opens its caches (e.g. a broken cache file); those lines
+        # are kept until the log area exists, see log()
+        self.startup_logs = []
+        self.engine = GUIDFixerEngine(log=self.log, workers=0)
+        # Live readout in the progress label, full run profile written next to settings.json
+        self.engine.on_progress = lambda profile, done, total: self.ui(self.lbl_progress.config, text=profile.status_line(done, total))
+        self.engine.profile_path = os.path.join(os.getcwd(), PROFILE_FILE)
+
         # Unity Project Path
         self.lbl_unity = tk.Label(root, text="Unity Project Assets Path (Target Project):")
         self.lbl_unity.pack(anchor="w", padx=10, pady=(10, 0))
@@ -65,6 +187,25 @@ class GUIDFixerApp:
         self.btn_old = tk.Button(self.frame_old, text="Browse", command=self.browse_old)
         self.btn_old.pack(side="right", padx=(5, 0))
 
+        # Scan options: source index depth (-1 = unlimited) and folder ignore globs
+        self.frame_scan_options = tk.Frame(root)
+        self.frame_scan_options.pack(fill="x", padx=10, pady=5)
+
+        tk.Label(self.frame_scan_options, text="Source Index Depth (-1 = unlimited):").pack(side="left")
+        self.var_depth = tk.IntVar(value=SOURCE_INDEX_DEPTH)
+        self.spin_depth = tk.Spinbox(self.frame_scan_options, from_=-1, to=32, textvariable=self.var_depth, width=4)
+        self.spin_depth.pack(side="left", padx=5)
+
+        # Folder matching: by name, by the script names inside (content), or both
+        tk.Label(self.frame_scan_options, text="Match By:").pack(side="left", padx=(15, 0))
+        self.var_match_mode = tk.StringVar(value="name")
+        self.combo_match_mode = ttk.Combobox(self.frame_scan_options, textvariable=self.var_match_mode, values=list(MATCH_MODES), state="readonly", width=8)
+        self.combo_match_mode.pack(side="left", padx=5)
+
+        tk.Label(self.frame_scan_options, text="Ignore Folders (globs, ; separated):").pack(side="left", padx=(15, 0))
+        self.entry_ignore = tk.Entry(self.frame_scan_options)
+        self.entry_ignore.pack(side="left", fill="x", expand=True, padx=5)
+
 
         # Action Buttons
         self.frame_actions = tk.Frame(root)
@@ -78,12 +219,31 @@ class GUIDFixerApp:
 
         # Interactive Mode Checkbox
         self.var_interactive = tk.BooleanVar(value=False)
-        self.chk_interactive = tk.Checkbutton(self.frame_actions, text="Interactive Mode (Confirm Each Change)", variable=self.var_interactive)
+        self.chk_interactive = tk.Checkbutton(self.frame_actions, text="Interactive Mode (Review Changes)", variable=self.var_interactive)
         self.chk_interactive.pack(side="left", padx=10)
 
+        # Reference Index Checkbox (persistent GUID -> files index, see GUIDFixerEngine.ReferenceIndex)
+        self.var_use_index = tk.BooleanVar(value=False)
+        self.chk_use_index = tk.Checkbutton(self.frame_actions, text="Use Reference Index", variable=self.var_use_index)
+        self.chk_use_index.pack(side="left", padx=10)
+
+        # Package Catalog Checkbox (PackageCache versions read once, see GUIDFixerEngine.PackageCatalog)
+        self.var_use_catalog = tk.BooleanVar(value=False)
+        self.chk_use_catalog = tk.Checkbutton(self.frame_actions, text="Use Package Catalog", variable=self.var_use_catalog)
+        self.chk_use_catalog.pack(side="left", padx=10)
+
+        # Match scope: only touch {fileID, guid, type} references in YAML files (see MATCH_SCOPES)
+        self.var_references_only = tk.BooleanVar(value=False)
+        self.chk_references_only = tk.Checkbutton(self.frame_actions, text="Only Unity References", variable=self.var_references_only)
+        self.chk_references_only.pack(side="left", padx=10)
+
         self.btn_missing = tk.Button(self.frame_actions, text="3. Find Missing Scripts (No Backup)", command=self.start_missing_scan_thread, bg="#ffffe0")
         self.btn_missing.pack(side="left", padx=10)
 
+        # Progress readout (phase, files, files/s, MB read)
+        self.lbl_progress = tk.Label(root, text="", anchor="w", fg="#444444")
+        self.lbl_progress.pack(fill="x", padx=10)
+
         # Preview Treeview
         self.lbl_preview = tk.Label(root, text="Detected Folder Mappings (Old -> New):")
         self.lbl_preview.pack(anchor="w", padx=10)
@@ -91,11 +251,13 @@ class GUIDFixerApp:
         self.tree_frame = tk.Frame(root)
         self.tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
-        self.tree = ttk.Treeview(self.tree_frame, columns=("Old", "New"), show="headings")
+        self.tree = ttk.Treeview(self.tree_frame, columns=("Old", "New", "Score"), show="headings")
         self.tree.heading("Old", text="Decompiled / Old Folder Path")
         self.tree.heading("New", text="Source / New Folder Path")
+        self.tree.heading("Score", text="Similarity")
         self.tree.column("Old", width=350)
         self.tree.column("New", width=350)
+        self.tree.column("Score", width=110, anchor="center")
         
         # Add scrollbar
         self.scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
@@ -126,9 +288,27 @@ class GUIDFixerApp:
         self.btn_load = tk.Button(self.frame_manual, text="Load Mappings", command=self.load_mappings, bg="#eeeeee")
         self.btn_load.pack(side="left", padx=5)
 
-        # Log Area
+        # Log Controls
+        self.frame_log = tk.Frame(root)
+        self.frame_log.pack(fill="x", padx=10)
+
+        tk.Label(self.frame_log, text="Log Level:").pack(side="left")
+        self.var_log_level = tk.StringVar(value="info")
+        self.combo_log_level = ttk.Combobox(self.frame_log, textvariable=self.var_log_level, values=list(LOG_LEVELS), state="readonly", width=10)
+        self.combo_log_level.pack(side="left", padx=5)
+        self.combo_log_level.bind("<<ComboboxSelected>>", lambda event: self.log_pump.set_level(LOG_LEVELS[self.var_log_level.get()]))
+
+        self.btn_log_file = tk.Button(self.frame_log, text="Log to File...", command=self.choose_log_file)
+        self.btn_log_file.pack(side="left", padx=5)
+
+        # Log Area (only written by the log pump on the Tk thread)
         self.log_area = scrolledtext.ScrolledText(root, state='disabled', height=20)
         self.log_area.pack(fill="x", padx=10, pady=(0, 10))
+        self.log_pump = LogPump(root, self.log_area)
+        self.ui = self.log_pump.call # Worker threads update widgets through this
+        for message, level in self.startup_logs:
+            self.log_pump.log(message, level)
+        self.startup_logs = None
 
         self.found_mappings = [] # List of tuples (old_path, new_path)
 
@@ -291,11 +471,35 @@ class GUIDFixerApp:
         # Actually, we will rebuild it in start_fix_thread
         self.log(f"Removed {len(selected_items)} mapping(s).")
 
-    def log(self, message):
-        self.log_area.config(state='normal')
-        self.log_area.insert(tk.END, message + "\n")
-        self.log_area.see(tk.END)
-        self.log_area.config(state='disabled')
+    def log(self, message, level=INFO):
+        # Safe from any thread (see LogPump)
+        if self.startup_logs is not None:
+            self.startup_logs.append((message, level))
+            return
+        self.log_pump.log(message, level)
+
+    def error(self, message):
+        self.log(message, ERROR)
+
+    def choose_log_file(self):
+        if self.log_pump.log_file:
+            self.log_pump.set_log_file(None)
+            self.btn_log_file.config(text="Log to File...")
+            return
+
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".log",
+            filetypes=[("Log files", "*.log"), ("All files", "*.*")],
+            title="Write Full Log To"
+        )
+        if file_path:
+            try:
+                self.log_pump.set_log_file(file_path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to open log file: {e}")
+                return
+            self.btn_log_file.config(text="Stop Log File")
+            self.log(f"Writing full log to {file_path}")
 
     def save_mappings(self):
         # Gather data
@@ -385,68 +589,24 @@ class GUIDFixerApp:
         self.tree.delete(*self.tree.get_children()) # Clear tree to show missing guids instead
         self.tree.heading("Old", text="Missing GUID (Found in Scene)")
         self.tree.heading("New", text="Suggested Match (Select Manually)")
+        self.tree.heading("Score", text="")
         self.found_mappings = []
         
+        self.engine.set_use_index(self.var_use_index.get())
+        self.engine.set_catalog_path(PACKAGE_CATALOG_FILE if self.var_use_catalog.get() else None)
         threading.Thread(target=self.run_missing_scan, args=(unity_path,), daemon=True).start()
 
     def run_missing_scan(self, unity_path):
-        self.log("Scanning project for Missing Scripts...")
-        
-        # 1. Collect ALL valid GUIDs from current project meta files
-        valid_guids = set()
-        self.log("Indexing valid GUIDs in project...")
-        count_meta = 0
-        for root, _, files in os.walk(unity_path):
-            for file in files:
-                if file.endswith(".meta"):
-                    guid = self.extract_guid(os.path.join(root, file))
-                    if guid:
-                        valid_guids.add(guid)
-                        count_meta += 1
-                        
-        self.log(f"Indexed {len(valid_guids)} valid GUIDs from {count_meta} meta files.")
-        
-        # 2. Scan Scenes/Prefabs for Script references
-        # Pattern: m_Script: {fileID: 11500000, guid: <GUID>, type: 3}
-        script_ref_pattern = re.compile(r"m_Script: \{fileID: 11500000, guid: ([a-fA-F0-9]{32}), type: 3\}")
-        
-        missing_counts = {} # GUID -> Count
-        files_with_missing = {} # GUID -> [List of Files]
-        
-        scanned_files = 0
-        
-        for root, _, files in os.walk(unity_path):
-            for file in files:
-                if file.endswith((".unity", ".prefab", ".asset")):
-                    scanned_files += 1
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            
-                        matches = script_ref_pattern.findall(content)
-                        for guid in matches:
-                            if guid not in valid_guids:
-                                missing_counts[guid] = missing_counts.get(guid, 0) + 1
-                                if guid not in files_with_missing:
-                                    files_with_missing[guid] = []
-                                if len(files_with_missing[guid]) < 3: # Keep only first 3 examples
-                                    files_with_missing[guid].append(file)
-                    except:
-                        pass
-                        
-        self.log(f"Scanned {scanned_files} files. Found {len(missing_counts)} unique missing script GUIDs.")
-        
-        if not missing_counts:
-            self.log("No missing scripts found! (Or they are not referenced as Monobehaviours)")
-            return
-            
-        # 3. Populate Tree with Missing GUIDs
-        # Sort by occurrence count (highest first)
-        sorted_missing = sorted(missing_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        for guid, count in sorted_missing:
-            example_files = ", ".join(files_with_missing[guid])
+        result = self.engine.run_missing_scan(unity_path)
+        if result["missing"]:
+            self.ui(self.show_missing_results, result)
+
+    def show_missing_results(self, result):
+        # Populate Tree with Missing GUIDs (already sorted by occurrence count, highest first)
+        for entry in result["missing"]:
+            guid = entry["guid"]
+            count = entry["count"]
+            example_files = ", ".join(entry["example_files"])
             display_text = f"{guid} (Used {count} times) in [{example_files}...]"
             self.tree.insert("", "end", values=(display_text, "DOUBLE CLICK TO SELECT NEW SCRIPT"))
             
@@ -488,6 +648,7 @@ class GUIDFixerApp:
                 return
                 
             new_guid = self.extract_guid(meta_path)
+            self.engine.guid_cache.save()
             self.log(f"Extracted GUID: {new_guid}")
             
             if not new_guid:
@@ -556,56 +717,15 @@ class GUIDFixerApp:
         
         # Use existing logic but skip map building
         # We need a custom run function because run_fix expects folder mappings
+        self.engine.set_use_index(self.var_use_index.get())
+        self.engine.set_catalog_path(PACKAGE_CATALOG_FILE if self.var_use_catalog.get() else None)
+        self.engine.match_scope = "references" if self.var_references_only.get() else "any"
         threading.Thread(target=self.run_direct_guid_replacement, args=(self.entry_unity.get(), guid_map), daemon=True).start()
 
     def run_direct_guid_replacement(self, unity_path, guid_map):
-         self.log("Replacing GUIDs...")
-         count_replaced = 0
-         guid_pattern = re.compile(r"([a-fA-F0-9]{32})")
-         
-         # Extensions to scan (Scenes/Prefabs/Assets)
-         TARGET_EXTENSIONS = {'.unity', '.prefab', '.asset', '.mat', '.controller'}
-
-         for root, dirs, files in os.walk(unity_path):
-            for file in files:
-                _, ext = os.path.splitext(file)
-                if ext.lower() not in TARGET_EXTENSIONS:
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                try:
-                    # Use strict binary mode first to check if file is writable? No, text mode is fine.
-                    # But we must be careful about encoding.
-                    with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
-                        content = f.read()
-
-                    # DEBUG: Check if this file contains the OLD guid we are looking for
-                    for old_g in guid_map.keys():
-                        if old_g in content:
-                            self.log(f"  > Found target GUID {old_g} in {file}")
-
-                    def replace_func(match):
-                        g = match.group(1)
-                        # Replace if g is in map, otherwise keep g
-                        return guid_map.get(g, g)
-                    
-                    new_content, n = guid_pattern.subn(replace_func, content)
-                    
-                    if n > 0 and new_content != content:
-                        # Write back carefully
-                        with open(file_path, 'w', encoding='utf-8-sig') as f:
-                            f.write(new_content)
-                        count_replaced += 1
-                        self.log(f"FIXED: {file} (Replaced GUIDs)")
-                    else:
-                         pass
-                         # self.log(f"  (No changes needed for {file})")
-
-                except Exception as e:
-                    self.log(f"Error processing {file}: {e}")
-
-         self.log(f"Done! Updated {count_replaced} files.")
-         messagebox.showinfo("Success", f"Replaced GUIDs in {count_replaced} files.\nPlease reload Unity (or Reimport All).")
+        result = self.engine.run_direct_guid_replacement(unity_path, guid_map)
+        count_replaced = len(result["updated_files"])
+        self.ui(messagebox.showinfo, "Success", f"Replaced GUIDs in {count_replaced} files.\nPlease reload Unity (or Reimport All).")
 
     def start_scan_thread(self):
         source_path = self.entry_source.get()
@@ -623,128 +743,37 @@ class GUIDFixerApp:
         self.tree.delete(*self.tree.get_children()) # Clear previous
         self.found_mappings = []
         
-        threading.Thread(target=self.run_scan, args=(source_path, old_path), daemon=True).start()
-
-    def run_scan(self, source_path, old_path):
-        self.log("Scanning for matching folders...")
-        
-        # Generic folder names to ignore to avoid false positives
-        # Removed "scripts", "plugins" to ensure we don't skip actual script folders
-        IGNORE_NAMES = {
-            "core", "editor", "runtime", "resources", "tests", "samples", "examples",
-            "data", "internal", "utils", "extensions", "legacy", "serialization", "events", "jobs", "layers",
-            "enums", "classes", "interfaces", "structs", "models", "views", "controllers", "prefabs",
-            "materials", "textures", "images", "audio", "sounds", "music", "fonts", "shaders", "scenes",
-            "animations", "animators", "streamingassets", "gizmos", "settings", "documentation", "docs"
-        }
-
-        # 1. Index Source Packages (FolderName -> FullPath)
-        # Modified to search only Top Level and Second Level (Depth 0 and 1)
-        # to avoid false positives in deep nested folders.
-        
-        source_map = {}
         try:
-            self.log(f"Indexing source path (Depth 0 & 1 only): {source_path}")
-            
-            # Helper to process a directory
-            def process_dir(current_path):
-                try:
-                    items = os.listdir(current_path)
-                except:
-                    return
-
-                for item in items:
-                    full_path = os.path.join(current_path, item)
-                    if not os.path.isdir(full_path):
-                        continue
-                        
-                    if item.lower() in IGNORE_NAMES:
-                        continue
-                    
-                    if item.startswith("."): # skip .git, .vs etc
-                        continue
+            depth = self.var_depth.get()
+        except tk.TclError:
+            depth = SOURCE_INDEX_DEPTH
+        depth = depth if depth >= 0 else None
+        ignore_globs = [glob.strip() for glob in self.entry_ignore.get().split(";") if glob.strip()]
 
-                    # Index this folder
-                    # Use lowercase key for case-insensitive matching
-                    source_map[item.lower()] = full_path
-                    if "@" in item:
-                        clean_name = item.split("@")[0]
-                        source_map[clean_name.lower()] = full_path
+        match_mode = self.var_match_mode.get()
+        self.engine.set_catalog_path(PACKAGE_CATALOG_FILE if self.var_use_catalog.get() else None)
 
-            # Depth 0: Scan Source Path itself
-            process_dir(source_path)
+        threading.Thread(target=self.run_scan, args=(source_path, old_path, depth, ignore_globs, match_mode), daemon=True).start()
 
-            # Depth 1: Scan subfolders of Source Path
-            # e.g. Assets/Plugins, Assets/ThirdParty
-            try:
-                root_items = os.listdir(source_path)
-                for item in root_items:
-                    full_path = os.path.join(source_path, item)
-                    if os.path.isdir(full_path) and not item.startswith("."):
-                         process_dir(full_path)
-            except:
-                pass
-                        
+    def run_scan(self, source_path, old_path, depth=SOURCE_INDEX_DEPTH, ignore_globs=(), match_mode="name"):
+        try:
+            result = self.engine.run_scan(source_path, old_path, depth, ignore_globs, match_mode)
         except Exception as e:
-            self.log(f"Error reading source path: {e}")
-            self.btn_scan.config(state='normal')
+            self.error(f"Error reading source path: {e}")
+            self.ui(self.btn_scan.config, state='normal')
             return
+        self.ui(self.show_scan_results, result)
 
-        self.log(f"Indexed {len(source_map)} source folders.")
-
-        # 2. Walk Old Scripts Path and find matches
-        potential_mappings = []
-        found_count = 0
-        for root, dirs, files in os.walk(old_path):
-            for d in dirs:
-                if d.lower() in IGNORE_NAMES:
-                    continue
-
-                # Check if directory name exists in source map
-                if d.lower() in source_map:
-                    old_dir_full = os.path.join(root, d)
-                    new_dir_full = source_map[d.lower()]
-                    
-                    potential_mappings.append((old_dir_full, new_dir_full))
-                    found_count += 1
-        
-        # 3. Filter Redundant Sub-mappings
-        # If we map Parent -> Parent, we don't need to map Parent/Child -> Parent/Child
-        # This reduces noise significantly.
-        
-        self.log("Filtering redundant sub-mappings...")
-        
-        # Sort by length of old path (shortest first)
-        potential_mappings.sort(key=lambda x: len(x[0]))
-        
-        final_mappings = []
-        for pm in potential_mappings:
-            is_redundant = False
-            for fm in final_mappings:
-                # If pm starts with fm (and is not fm itself), it is a subfolder
-                # os.path.commonpath check
-                try:
-                    if os.path.commonpath([pm[0], fm[0]]) == fm[0] and pm[0] != fm[0]:
-                        is_redundant = True
-                        break
-                except:
-                    pass
-            
-            if not is_redundant:
-                final_mappings.append(pm)
-                
-        # Update UI
-        for old_dir_full, new_dir_full in final_mappings:
-             self.found_mappings.append((old_dir_full, new_dir_full))
-             self.tree.insert("", "end", values=(old_dir_full, new_dir_full))
+    def show_scan_results(self, result):
+        for match in result["matches"]:
+             self.found_mappings.append((match["old"], match["new"]))
+             # Similarity of the script names below both folders, low scores are worth a second look
+             self.tree.insert("", "end", values=(match["old"], match["new"], f"{match['score']:.2f} ({match['method']})"))
 
-        self.log(f"Scan complete. Found {len(final_mappings)} valid mappings (filtered from {found_count}).")
         self.btn_scan.config(state='normal')
         
-        if len(final_mappings) > 0:
+        if len(result["mappings"]) > 0:
             self.btn_run.config(state='normal', bg="#aaffaa")
-        else:
-            self.log("No matches found. Try pointing Source/Old paths to parent directories.")
 
     def start_fix_thread(self):
         unity_path = self.entry_unity.get()
@@ -770,320 +799,163 @@ class GUIDFixerApp:
         self.btn_scan.config(state='disabled')
         self.btn_remove.config(state='disabled')
         
-        threading.Thread(target=self.run_fix, args=(unity_path, current_mappings), daemon=True).start()
+        # Tk variables are read here, the worker thread only gets plain values
+        self.engine.set_use_index(self.var_use_index.get())
+        self.engine.set_catalog_path(PACKAGE_CATALOG_FILE if self.var_use_catalog.get() else None)
+        self.engine.match_scope = "references" if self.var_references_only.get() else "any"
+        interactive = self.var_interactive.get()
+        threading.Thread(target=self.run_fix, args=(unity_path, current_mappings, self.entry_source.get(), self.entry_old.get(), interactive), daemon=True).start()
 
     def extract_guid(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                # Updated Regex to handle various spacing/formats
-                # Matches: guid: <32_HEX_CHARS>
-                match = re.search(r"guid:\s*([a-fA-F0-9]{32})", content)
-                if match:
-                    return match.group(1)
-        except:
-            pass
-        return None
+        return self.engine.extract_guid(file_path)
 
-    def ask_replacement_confirmation(self, file_path, old_guid, new_guid):
-        # Thread-safe UI call
-        result = {'response': False}
+    def review_replacements(self, candidates):
+        # Called from the fix worker thread once all candidates are collected; blocks until the review window is closed
+        result = {'approved': []}
         event = threading.Event()
-        
-        def show_dialog():
-            msg = f"File: {os.path.basename(file_path)}\n" \
-                  f"Path: {file_path}\n\n" \
-                  f"Replacing Old GUID: {old_guid}\n" \
-                  f"With New GUID: {new_guid}\n\n" \
-                  f"Proceed?"
-            result['response'] = messagebox.askyesno("Confirm Replacement", msg)
-            event.set()
-            
-        self.root.after(0, show_dialog)
-        event.wait()
-        return result['response']
 
-    def run_fix(self, unity_path, mappings):
-        self.log("Starting Fix Process...")
-        guid_map = {} 
-        
-        total_meta_files_checked = 0
+        def on_done(approved):
+            result['approved'] = approved
+            event.set()
 
-        # 1. Build GUID Map
-        for old_dir, new_dir in mappings:
-            self.log(f"--- Processing Mapping ---")
-            self.log(f"Old (Source of GUIDs): {old_dir}")
-            self.log(f"New (Target for Match): {new_dir}")
-            
-            # Check if directory has meta files
-            has_meta = False
-            
-            # Walk old dir
-            for root, _, files in os.walk(old_dir):
-                self.log(f"  Walking subfolder: {root} (Files: {len(files)})") # Debug: See where we are walking
-                for file in files:
-                    if file.endswith(".meta"):
-                        has_meta = True
-                        total_meta_files_checked += 1
-                        old_meta_path = os.path.join(root, file)
-                        
-                        self.log(f"Searching match for: {file}") # Print every file being searched
-                        
-                        # Find corresponding file in new_dir (by filename)
-                        target_filename = file
-                        new_meta_path = None
-                        
-                        # Optimized search: Walk new_dir until found
-                        # We use a simple loop, but for large folders this is O(N*M).
-                        found_match = False
-                        target_filename_lower = target_filename.lower()
-                        
-                        # Fix: Instead of searching ONLY in new_dir (which is the mapped folder),
-                        # we should search in the ENTIRE Source Path provided by user?
-                        # User request: Search everywhere except Old folder.
-                        
-                        # Let's use the main Source Path defined in the UI for searching match
-                        # But wait, 'new_dir' comes from the mapping (OldFolder -> NewFolder).
-                        # If the mapping is correct, the file SHOULD be in new_dir.
-                        # If user wants to search EVERYWHERE, then the mapping logic (Folder -> Folder) is less strict.
-                        
-                        # Strategy: 
-                        # 1. Try finding in the mapped 'new_dir' first (fastest/most accurate).
-                        # 2. If not found, try finding in the ROOT Source Path (recursive).
-                        
-                        # 1. Search in mapped folder
-                        search_dirs = [new_dir]
-                        
-                        # 2. Add Root Source Path if different
-                        root_source_path = self.entry_source.get()
-                        if root_source_path and os.path.isdir(root_source_path) and root_source_path != new_dir:
-                             # Only search root if we really fail in mapped folder? 
-                             # Or just add it to search list.
-                             # Searching entire project for every file is slow but requested.
-                             pass # We will do fallback below
-                        
-                        # Helper to search in a directory recursively
-                        def find_in_path(search_path):
-                            # self.log(f"  > Scanning dir: {search_path}") # Very verbose
-                            
-                            # Pre-calculate normalized exclusion paths
-                            exclude_paths = []
-                            if self.entry_old.get():
-                                exclude_paths.append(os.path.abspath(self.entry_old.get()).lower())
-                            if old_dir:
-                                exclude_paths.append(os.path.abspath(old_dir).lower())
-                            
-                            found_candidates = []
-
-                            for r_s, _, f_s in os.walk(search_path):
-                                # Skip the "Old" directory to avoid self-matching
-                                r_s_abs = os.path.abspath(r_s).lower()
-                                
-                                # Check if current path is inside any excluded path
-                                is_excluded = False
-                                for ex_p in exclude_paths:
-                                    if r_s_abs.startswith(ex_p):
-                                        is_excluded = True
-                                        break
-                                
-                                if is_excluded:
-                                    continue
-                                    
-                                if target_filename in f_s:
-                                    found_candidates.append(os.path.join(r_s, target_filename))
-                                else:
-                                    # Case insensitive check
-                                    for f_cand in f_s:
-                                        if f_cand.lower() == target_filename_lower:
-                                            found_candidates.append(os.path.join(r_s, f_cand))
-                            
-                            if not found_candidates:
-                                return None
-                            
-                            if len(found_candidates) > 1:
-                                self.log(f"WARNING: Multiple candidates found for {target_filename}:")
-                                for c in found_candidates:
-                                    self.log(f"  - {c}")
-                                self.log(f"  > Using first one: {found_candidates[0]}")
-                            
-                            return found_candidates[0]
-
-                        # Attempt 1: Mapped Directory
-                        # self.log(f"  Attempt 1: Checking {new_dir}")
-                        new_meta_path = find_in_path(new_dir)
-                        
-                        # Attempt 2: Global Source Path (Fallback)
-                        if not new_meta_path and root_source_path and os.path.isdir(root_source_path):
-                             self.log(f"  Attempt 2: Fallback search in {root_source_path}")
-                             new_meta_path = find_in_path(root_source_path)
-
-                        if new_meta_path:
-                            old_guid = self.extract_guid(old_meta_path)
-                            new_guid = self.extract_guid(new_meta_path)
-                            
-                            if old_guid and new_guid:
-                                if old_guid != new_guid:
-                                    guid_map[old_guid] = new_guid
-                                    self.log(f"Map: {file} ({old_guid} -> {new_guid})") # Verbose
-                                else:
-                                    # GUIDs are same. This is suspicious if we expect them to be different.
-                                    # Could mean the "Old" file was already updated or is identical to the new one.
-                                    self.log(f"WARNING: Same GUID found in Old and New for {file} ({old_guid}).")
-                                    self.log(f"  Old Path: {old_meta_path}")
-                                    self.log(f"  New Path: {new_meta_path}")
-                                    self.log(f"  Skipping map for this file.")
-                            else:
-                                self.log(f"Warning: Could not extract GUID from {file}")
-                        else:
-                            # Debug: Why no match?
-                            # Only log first few failures to avoid spam
-                            # if total_meta_files_checked < 5:
-                            #    self.log(f"Debug: No match found for {target_filename} in target folder.")
-                            
-                            # MORE AGGRESSIVE DEBUGGING FOR CinemachineVirtualCamera.cs.meta
-                            if "CinemachineVirtualCamera.cs.meta" in target_filename:
-                                self.log(f"CRITICAL DEBUG: Could not find match for {target_filename}!")
-                                self.log(f"  Searched in: {new_dir}")
-                                self.log(f"  And fallback root: {root_source_path}")
-                                
-                                if not os.path.exists(new_dir):
-                                    self.log(f"  ERROR: Directory {new_dir} DOES NOT EXIST!")
-                                else:
-                                    # List contents of the searched directory to help user see what IS there
-                                    try:
-                                        self.log(f"  Contents of {new_dir} (First 10 items):")
-                                        items = os.listdir(new_dir)
-                                        for item in items[:10]:
-                                            self.log(f"    - {item}")
-                                    except:
-                                        self.log("    (Could not list directory contents)")
-                                
-                                # Check user suggested path from chat
-                                user_suggested_exact = r"C:\Users\aboja\Documents\SpiderFighting\Library\PackageCache\com.unity.cinemachine@2.10.3\Runtime\Behaviours"
-                                
-                                if os.path.exists(user_suggested_exact):
-                                     self.log(f"  Checking user suggested path: {user_suggested_exact}")
-                                     # Try to find it there
-                                     manual_match = find_in_path(user_suggested_exact)
-                                     if manual_match:
-                                          self.log(f"  !!! FOUND IN USER SUGGESTED PATH: {manual_match}")
-                                          new_meta_path = manual_match
-                                else:
-                                     self.log(f"  User suggested path not found: {user_suggested_exact}")
-                                     self.log(f"  (Note: Your current project seems to be 'SpiderFightingFinalVersionIncha2Allah', but path says 'SpiderFighting')")
-            
-            if not has_meta:
-                self.log(f"WARNING: No .meta files found in {old_dir}. \nAre you pointing to a folder with valid Unity metadata?")
+        self.ui(self.show_review_window, candidates, on_done)
+        event.wait()
+        return result['approved']
 
-        self.log(f"Checked {total_meta_files_checked} meta files.")
-        self.log(f"GUID Map built. {len(guid_map)} GUIDs to replace.")
-        
-        # DEBUG: Add Manual GUID override for testing if needed
-        # guid_map["45e653bab7fb20e499bda25e1b646fea"] = "NEW_GUID_HERE" 
-        
-        if not guid_map:
-            self.log("No GUIDs need replacing.")
-            self.btn_run.config(state='normal')
-            self.btn_scan.config(state='normal')
-            self.btn_remove.config(state='normal')
-            return
+    def show_review_window(self, candidates, on_done):
+        # Review queue: every candidate replacement, grouped by old GUID and by file.
+        # Everything starts accepted; reject single matches, whole GUIDs or whole files, then apply in one pass.
+        top = tk.Toplevel(self.root)
+        top.title(f"Review Replacements ({len(candidates)} matches)")
+        top.geometry("1100x650")
+        top.grab_set()
+
+        approved = [True] * len(candidates)
+        groups = {} # group item id -> [candidate index]
+        candidate_items = [[] for _ in candidates] # candidate index -> [item id in each tree]
+        candidate_groups = [[] for _ in candidates] # candidate index -> [group item id in each tree]
+
+        lbl_status = tk.Label(top, anchor="w")
+        lbl_status.pack(fill="x", padx=10, pady=(10, 0))
+
+        notebook = ttk.Notebook(top)
+        notebook.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def make_tree(title):
+            frame = tk.Frame(notebook)
+            notebook.add(frame, text=title)
+            tree = ttk.Treeview(frame, columns=("apply", "line", "context"), show="tree headings")
+            tree.heading("#0", text="Group / Match")
+            tree.heading("apply", text="Apply")
+            tree.heading("line", text="Line")
+            tree.heading("context", text="Context")
+            tree.column("#0", width=380)
+            tree.column("apply", width=50, anchor="center")
+            tree.column("line", width=60, anchor="e")
+            tree.column("context", width=560)
+            scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+            tree.configure(yscroll=scrollbar.set)
+            tree.pack(side="left", fill="both", expand=True)
+            scrollbar.pack(side="right", fill="y")
+            return tree
+
+        tree_guid = make_tree("By GUID")
+        tree_file = make_tree("By File")
+
+        # Populate both views
+        by_guid = {}
+        by_file = {}
+        for index, c in enumerate(candidates):
+            by_guid.setdefault(c["old_guid"], []).append(index)
+            by_file.setdefault(c["path"], []).append(index)
+
+        for old_g, indices in by_guid.items():
+            group = tree_guid.insert("", "end", text=f"{old_g} -> {candidates[indices[0]]['new_guid']}  ({len(indices)} matches)", values=("", "", ""))
+            groups[group] = indices
+            for index in indices:
+                c = candidates[index]
+                item = tree_guid.insert(group, "end", text=os.path.basename(c["path"]), values=("", c["line"], c["context"]))
+                candidate_items[index].append((tree_guid, item))
+                candidate_groups[index].append((tree_guid, group))
+
+        for path, indices in by_file.items():
+            group = tree_file.insert("", "end", text=f"{path}  ({len(indices)} matches)", values=("", "", ""))
+            groups[group] = indices
+            for index in indices:
+                c = candidates[index]
+                item = tree_file.insert(group, "end", text=f"{c['old_guid']} -> {c['new_guid']}", values=("", c["line"], c["context"]))
+                candidate_items[index].append((tree_file, item))
+                candidate_groups[index].append((tree_file, group))
+
+        item_index = {item: index for index, items in enumerate(candidate_items) for _, item in items}
+
+        def refresh(indices):
+            touched_groups = set()
+            for index in indices:
+                mark = "\u2714" if approved[index] else "\u2718"
+                for tree, item in candidate_items[index]:
+                    tree.set(item, "apply", mark)
+                touched_groups.update(candidate_groups[index])
+            for tree, group in touched_groups:
+                states = {approved[index] for index in groups[group]}
+                tree.set(group, "apply", "\u2714" if states == {True} else "\u2718" if states == {False} else "~")
+            count = sum(approved)
+            lbl_status.config(text=f"{count} of {len(candidates)} replacements will be applied "
+                                   f"({len(by_guid)} GUIDs, {len(by_file)} files). Double click toggles, groups apply to all their matches.")
+
+        def selected_indices():
+            tree = tree_guid if notebook.index(notebook.select()) == 0 else tree_file
+            indices = []
+            for item in tree.selection():
+                if item in groups:
+                    indices.extend(groups[item])
+                else:
+                    indices.append(item_index[item])
+            return indices
+
+        def set_state(indices, value):
+            for index in indices:
+                approved[index] = value
+            refresh(indices)
+
+        def toggle(event=None):
+            indices = selected_indices()
+            if indices:
+                set_state(indices, not all(approved[index] for index in indices))
+
+        def finish(apply):
+            top.grab_release()
+            top.destroy()
+            on_done([c for index, c in enumerate(candidates) if apply and approved[index]])
 
-        # 2. Replace in Unity Project
-        self.log("Replacing GUIDs in Unity Project...")
-        count_replaced = 0
-        
-        # Pre-compile regex for faster replacement?
-        # Actually, iterating 100s of keys for every file is slow.
-        # Better: Find ALL GUID-like strings in file, check if in map, replace.
-        
-        guid_pattern = re.compile(r"([a-fA-F0-9]{32})")
-        
-        old_path_abs = os.path.abspath(self.entry_old.get()).lower()
-
-        # Extensions to skip (Binary Media / Libraries) to improve performance and safety
-        SKIP_EXTENSIONS = {
-            '.png', '.jpg', '.jpeg', '.tga', '.tif', '.tiff', '.psd', '.bmp', '.gif', '.ico',
-            '.mp3', '.wav', '.ogg', '.aiff', '.m4a', '.mp4', '.avi', '.mov',
-            '.fbx', '.obj', '.dae', '.blend', '.max', '.3ds', '.dxf',
-            '.dll', '.exe', '.so', '.aar', '.jar', '.zip', '.7z', '.rar', '.gz',
-            '.ttf', '.otf', '.eot', '.woff', '.woff2',
-            '.mdb', '.pdb'
-        }
-        
-        for root, dirs, files in os.walk(unity_path):
-            # EXCLUDE OLD FOLDER from replacement process
-            # Modify 'dirs' in-place to prevent walking into the Old Scripts folder
-            root_abs = os.path.abspath(root).lower()
-            
-            # If we are somehow inside the Old folder (shouldn't happen if we prune dirs correctly, but safety check)
-            if root_abs.startswith(old_path_abs):
-                self.log(f"Skipping protection (Inside Old Path): {root}")
-                continue
-                
-            # Remove the Old directory from the list of directories to visit next
-            # This ensures we don't even enter the Old folder
-            # Case-insensitive check
-            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)).lower() != old_path_abs]
-            
-            for file in files:
-                # Optimization: Skip known binary/media files
-                _, ext = os.path.splitext(file)
-                if ext.lower() in SKIP_EXTENSIONS:
-                    continue
-
-                # To match original C++ tool behavior, we process ALL files.
-                # The original tool iterates everything and replaces text if found.
-                
-                # However, we should still skip likely binary files to avoid corruption or wasting time
-                # But to be safe and "like original", we try to read everything as text.
-                # If it fails to read as utf-8 (with ignore), we skip.
-                
-                # ext = os.path.splitext(file)[1].lower()
-                # if ext not in ['.prefab', '.unity', '.asset', '.mat', '.meta', '.controller', '.anim', '.overridecontroller', '.guiskin', '.fontsettings', '.physicmaterial']:
-                #         continue
+        tree_guid.bind("<Double-1>", toggle)
+        tree_file.bind("<Double-1>", toggle)
+        top.protocol("WM_DELETE_WINDOW", lambda: finish(False))
+        refresh(range(len(candidates)))
 
-                file_path = os.path.join(root, file)
-                try:
-                    # Use utf-8-sig to handle BOM if present (common in Unity)
-                    with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
-                        content = f.read()
-
-                    # Check for Binary files (Scene/Prefab) to warn user
-                    if file.lower().endswith(('.unity', '.prefab', '.asset', '.mat', '.controller', '.anim')):
-                         if not content.startswith("%YAML"):
-                             self.log(f"WARNING: {file} appears to be BINARY. Cannot replace GUIDs. Set 'Asset Serialization' to 'Force Text' in Unity.")
-
-                    # Function to replace if match found in map
-                    def replace_func(match):
-                        g = match.group(1)
-                        if g in guid_map:
-                            new_g = guid_map[g]
-                            # Check interactive mode
-                            if self.var_interactive.get():
-                                if not self.ask_replacement_confirmation(file_path, g, new_g):
-                                    return g # User said No, keep original
-                            return new_g
-                        return g
-                    
-                    new_content, n = guid_pattern.subn(replace_func, content)
-                    
-                    if n > 0 and new_content != content:
-                        with open(file_path, 'w', encoding='utf-8-sig') as f:
-                            f.write(new_content)
-                        count_replaced += 1
-                        
-                        if file.lower().endswith((".unity", ".prefab", ".asset")):
-                            self.log(f"Fixed File: {file} ({n} replacements)")
-                
-                except Exception as e:
-                    self.log(f"Error processing {file}: {e}")
+        btn_frame = tk.Frame(top)
+        btn_frame.pack(pady=10)
+        tk.Button(btn_frame, text="Accept Selected", command=lambda: set_state(selected_indices(), True), bg="#ddffdd").pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Reject Selected", command=lambda: set_state(selected_indices(), False), bg="#ffdddd").pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Accept All", command=lambda: set_state(range(len(candidates)), True)).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Reject All", command=lambda: set_state(range(len(candidates)), False)).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Apply Approved", command=lambda: finish(True), bg="#aaffaa").pack(side="left", padx=20)
+        tk.Button(btn_frame, text="Cancel (Apply Nothing)", command=lambda: finish(False)).pack(side="left", padx=5)
 
-        self.log(f"Done! Updated {count_replaced} files.")
-        messagebox.showinfo("Success", f"Process Complete.\nUpdated {count_replaced} files.")
+    def run_fix(self, unity_path, mappings, source_path, old_path, interactive):
+        # Interactive Mode: collect every match first, then review them all in one window
+        review = self.review_replacements if interactive else None
         
-        self.btn_run.config(state='normal')
-        self.btn_scan.config(state='normal')
-        self.btn_remove.config(state='normal')
+        try:
+            result = self.engine.run_fix(unity_path, mappings, source_path, old_path, review=review)
+            if result["guid_map"]:
+                self.ui(messagebox.showinfo, "Success", f"Process Complete.\nUpdated {len(result['updated_files'])} files.")
+        except Exception as e:
+            self.error(f"Error during fix: {e}")
+        finally:
+            self.ui(self.btn_run.config, state='normal')
+            self.ui(self.btn_scan.config, state='normal')
+            self.ui(self.btn_remove.config, state='normal')
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,356 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+
+from GUIDFixerEngine import GUIDFixerEngine, GUID_CACHE_FILE
+
+# Reproducible benchmarks on generated Unity projects (no real project needed).
+#
+#   python GUIDFixerBench.py run --preset medium --repeat 3 --label before-change
+#   python GUIDFixerBench.py run --preset medium --repeat 3 --label after-change
+#   python GUIDFixerBench.py compare                  # last two runs in bench_results.jsonl
+#   python GUIDFixerBench.py generate --preset small --root /tmp/bench_project
+#
+# Generated layout (same shape as a decompiled project being moved to packages):
+#   <root>/Library/PackageCache/com.bench.pkgN@1.0.0/Runtime/FolderM/ScriptK.cs(.meta)   new GUIDs
+#   <root>/Scripts/com.bench.pkgN/Runtime/FolderM/ScriptK.cs(.meta)                      old GUIDs
+#   <root>/Assets/Scenes/*.unity, Assets/Prefabs/*.prefab                                 references to old GUIDs
+#   <root>/Assets/Binary/*.asset                                                         binary serialized assets
+
+RESULTS_FILE = "bench_results.jsonl"
+BENCHMARKS = ("scan", "fix", "missing", "missing_warm", "replace")
+
+PRESETS = {
+    "small": {"packages": 5, "folders": 4, "scripts": 10, "scenes": 20, "prefabs": 100,
+              "refs_per_file": 20, "scene_kb": 64, "binary_assets": 10, "missing_ratio": 0.05},
+    "medium": {"packages": 20, "folders": 8, "scripts": 20, "scenes": 100, "prefabs": 1000,
+               "refs_per_file": 50, "scene_kb": 512, "binary_assets": 100, "missing_ratio": 0.05},
+    "large": {"packages": 50, "folders": 10, "scripts": 30, "scenes": 300, "prefabs": 5000,
+              "refs_per_file": 100, "scene_kb": 2048, "binary_assets": 500, "missing_ratio": 0.05},
+}
+
+YAML_HEADER = "%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"
+PADDING_LINE = "  m_LocalPosition: {x: 0, y: 0, z: 0}\n"
+
+def make_guid(rng):
+    return "%032x" % rng.getrandbits(128)
+
+def meta_text(guid):
+    return f"fileFormatVersion: 2\nguid: {guid}\nMonoImporter:\n  externalObjects: {{}}\n  serializedVersion: 2\n"
+
+def write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+
+def serialized_file(rng, script_guids, missing_guids, config, size_bytes):
+    # Unity YAML with refs_per_file MonoBehaviours, padded to roughly size_bytes
+    docs = [YAML_HEADER]
+    file_id = 100
+    for _ in range(config["refs_per_file"]):
+        if missing_guids and rng.random() < config["missing_ratio"]:
+            guid = rng.choice(missing_guids)
+        else:
+            guid = rng.choice(script_guids)
+        docs.append(f"--- !u!1 &{file_id}\nGameObject:\n  m_Name: Object{file_id}\n  m_Component:\n  - component: {{fileID: {file_id + 1}}}\n")
+        docs.append(f"--- !u!114 &{file_id + 1}\nMonoBehaviour:\n  m_GameObject: {{fileID: {file_id}}}\n  m_Enabled: 1\n"
+                    f"  m_Script: {{fileID: 11500000, guid: {guid}, type: 3}}\n  m_Name: \n")
+        file_id += 2
+
+    text = "".join(docs)
+    missing_bytes = size_bytes - len(text)
+    if missing_bytes > 0:
+        text += f"--- !u!4 &{file_id}\nTransform:\n" + PADDING_LINE * (missing_bytes // len(PADDING_LINE))
+    return text
+
+def generate_project(root, config, seed=1):
+    # Returns {"unity_path", "source_path", "old_path", "missing_guids", "script_guids"}; same seed -> same project
+    rng = random.Random(seed)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+
+    source_path = os.path.join(root, "Library", "PackageCache")
+    old_path = os.path.join(root, "Scripts")
+    unity_path = os.path.join(root, "Assets")
+
+    old_guids = []
+    new_guids = []
+    for p in range(config["packages"]):
+        package = f"com.bench.pkg{p}"
+        for m in range(config["folders"]):
+            for k in range(config["scripts"]):
+                rel = os.path.join("Runtime", f"Folder{m}", f"Script{p}_{m}_{k}.cs")
+                old_g, new_g = make_guid(rng), make_guid(rng)
+                old_guids.append(old_g)
+                new_guids.append(new_g)
+
+                new_file = os.path.join(source_path, f"{package}@1.0.0", rel)
+                write_text(new_file, f"public class Script{p}_{m}_{k} {{}}\n")
+                write_text(new_file + ".meta", meta_text(new_g))
+
+                old_file = os.path.join(old_path, package, rel)
+                write_text(old_file, f"public class Script{p}_{m}_{k} {{}}\n")
+                write_text(old_file + ".meta", meta_text(old_g))
+
+    # Script GUIDs no meta defines (deleted scripts), found by the missing-script scan
+    missing_guids = [make_guid(rng) for _ in range(max(1, len(old_guids) // 20))]
+
+    for i in range(config["scenes"]):
+        path = os.path.join(unity_path, "Scenes", f"Scene{i}.unity")
+        write_text(path, serialized_file(rng, old_guids, missing_guids, config, config["scene_kb"] * 1024))
+        write_text(path + ".meta", meta_text(make_guid(rng)))
+
+    for i in range(config["prefabs"]):
+        path = os.path.join(unity_path, "Prefabs", f"Prefab{i}.prefab")
+        write_text(path, serialized_file(rng, old_guids, missing_guids, config, 0))
+        write_text(path + ".meta", meta_text(make_guid(rng)))
+
+    for i in range(config["binary_assets"]):
+        path = os.path.join(unity_path, "Binary", f"Data{i}.asset")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            # Unity binary serialization header followed by data that happens to contain GUID-like text
+            f.write(b"\x00\x00\x00\x00\x00\x00\x10\x00" + rng.randbytes(4096) + rng.choice(old_guids).encode('ascii'))
+        write_text(path + ".meta", meta_text(make_guid(rng)))
+
+    return {
+        "unity_path": unity_path,
+        "source_path": source_path,
+        "old_path": old_path,
+        "missing_guids": missing_guids,
+        "script_guids": new_guids,
+    }
+
+def timed(func, *args):
+    # Returns (result, timing); phase times come from the engine's run profile
+    start = time.perf_counter()
+    result = func(*args)
+    wall = time.perf_counter() - start
+    profile = result.get("profile", {})
+    return result, {
+        "wall_seconds": wall,
+        "phases": {name: stats["wall_seconds"] for name, stats in profile.get("phases", {}).items()},
+        "files": sum(stats["files"] for stats in profile.get("phases", {}).values()),
+        "bytes_read": profile.get("bytes_read", 0),
+        "bytes_written": profile.get("bytes_written", 0),
+    }
+
+def run_once(project, work_dir, workers, log):
+    # One round of every benchmark. Mutating runs work on a fresh copy of Assets and a cold cache.
+    def new_engine(cache_name):
+        return GUIDFixerEngine(log=log, cache_path=os.path.join(work_dir, cache_name), workers=workers)
+
+    def fresh_assets():
+        assets = os.path.join(work_dir, "Assets")
+        if os.path.exists(assets):
+            shutil.rmtree(assets)
+        shutil.copytree(project["unity_path"], assets)
+        return assets
+
+    for name in os.listdir(work_dir):
+        if name.endswith(GUID_CACHE_FILE):
+            os.remove(os.path.join(work_dir, name))
+
+    timings = {}
+    engine = new_engine("scan" + GUID_CACHE_FILE)
+    scan, timings["scan"] = timed(engine.run_scan, project["source_path"], project["old_path"])
+
+    engine = new_engine("fix" + GUID_CACHE_FILE)
+    assets = fresh_assets()
+    _, timings["fix"] = timed(engine.run_fix, assets, scan["mappings"], project["source_path"], project["old_path"])
+
+    engine = new_engine("missing" + GUID_CACHE_FILE)
+    _, timings["missing"] = timed(engine.run_missing_scan, project["unity_path"])
+    _, timings["missing_warm"] = timed(engine.run_missing_scan, project["unity_path"])
+
+    engine = new_engine("replace" + GUID_CACHE_FILE)
+    assets = fresh_assets()
+    guid_map = dict(zip(project["missing_guids"], project["script_guids"]))
+    _, timings["replace"] = timed(engine.run_direct_guid_replacement, assets, guid_map)
+    return timings
+
+def summarize(rounds):
+    # [{benchmark: timing}] -> {benchmark: {median, min, runs, phases (median), files, bytes}}
+    summary = {}
+    for name in BENCHMARKS:
+        runs = [r[name] for r in rounds if name in r]
+        if not runs:
+            continue
+        phases = {}
+        for phase in runs[0]["phases"]:
+            phases[phase] = round(statistics.median(r["phases"].get(phase, 0.0) for r in runs), 4)
+        walls = [r["wall_seconds"] for r in runs]
+        summary[name] = {
+            "median_seconds": round(statistics.median(walls), 4),
+            "min_seconds": round(min(walls), 4),
+            "runs": [round(w, 4) for w in walls],
+            "phases": phases,
+            "files": runs[0]["files"],
+            "bytes_read": runs[0]["bytes_read"],
+            "bytes_written": runs[0]["bytes_written"],
+        }
+    return summary
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def load_results(path):
+    entries = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    return entries
+
+def find_entry(entries, key):
+    # key: label, revision or index (negative = from the end)
+    for entry in reversed(entries):
+        if key in (entry.get("label"), entry.get("revision")):
+            return entry
+    try:
+        return entries[int(key)]
+    except (ValueError, IndexError):
+        raise SystemExit(f"No benchmark run '{key}'")
+
+def build_config(args):
+    config = dict(PRESETS[args.preset])
+    for key in config:
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+    return config
+
+def cmd_generate(args):
+    config = build_config(args)
+    project = generate_project(args.root, config, args.seed)
+    print(json.dumps({"config": config, "unity_path": project["unity_path"], "source_path": project["source_path"], "old_path": project["old_path"]}, indent=4))
+
+def cmd_run(args):
+    config = build_config(args)
+    log = (lambda message, level=None: print(message, file=sys.stderr)) if args.verbose else (lambda message, level=None: None)
+    base = args.keep or tempfile.mkdtemp(prefix="guidfixer_bench_")
+    try:
+        print(f"Generating project ({args.preset}) in {base}...", file=sys.stderr)
+        start = time.perf_counter()
+        project = generate_project(os.path.join(base, "project"), config, args.seed)
+        print(f"Generated in {time.perf_counter() - start:.1f}s.", file=sys.stderr)
+
+        work_dir = os.path.join(base, "work")
+        os.makedirs(work_dir, exist_ok=True)
+        rounds = []
+        for i in range(args.repeat):
+            timings = run_once(project, work_dir, args.workers, log)
+            rounds.append(timings)
+            print(f"Round {i + 1}/{args.repeat}: " + ", ".join(f"{name} {t['wall_seconds']:.3f}s" for name, t in timings.items()), file=sys.stderr)
+    finally:
+        if not args.keep:
+            shutil.rmtree(base, ignore_errors=True)
+
+    entry = {
+        "label": args.label,
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": args.workers,
+        "preset": args.preset,
+        "seed": args.seed,
+        "config": config,
+        "results": summarize(rounds),
+    }
+    with open(args.out, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + "\n")
+    print(f"Results appended to {args.out}", file=sys.stderr)
+    print_summary(entry)
+
+def print_summary(entry):
+    print(f"{entry.get('label') or '-'} ({entry.get('revision') or 'no revision'}, {entry['preset']}, workers={entry['workers']})")
+    for name, result in entry["results"].items():
+        phases = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in result["phases"].items())
+        print(f"  {name:<13} median {result['median_seconds']:.3f}s  min {result['min_seconds']:.3f}s  [{phases}]")
+
+def cmd_compare(args):
+    entries = load_results(args.out)
+    if len(entries) < 2 and not (args.base and args.new):
+        raise SystemExit(f"Need at least two runs in {args.out} to compare.")
+    base = find_entry(entries, args.base) if args.base else entries[-2]
+    new = find_entry(entries, args.new) if args.new else entries[-1]
+    if base["config"] != new["config"]:
+        print("Note: the runs used different project configurations.")
+
+    print(f"base: {base.get('label') or '-'} ({base.get('revision')}, {base['timestamp']})")
+    print(f"new:  {new.get('label') or '-'} ({new.get('revision')}, {new['timestamp']})")
+    print(f"{'benchmark':<28}{'base':>10}{'new':>10}{'change':>10}")
+    for name, base_result in base["results"].items():
+        new_result = new["results"].get(name)
+        if not new_result:
+            continue
+        rows = [(name, base_result["median_seconds"], new_result["median_seconds"])]
+        rows += [(f"  {phase}", seconds, new_result["phases"].get(phase)) for phase, seconds in base_result["phases"].items()]
+        for label, a, b in rows:
+            if b is None:
+                continue
+            change = f"{(b - a) / a * 100:+.1f}%" if a else "-"
+            print(f"{label:<28}{a:>9.3f}s{b:>9.3f}s{change:>10}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Unity GUID Fixer benchmarks on generated projects")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_project_args(p):
+        p.add_argument("--preset", choices=sorted(PRESETS), default="small", help="Project size (default: small)")
+        p.add_argument("--seed", type=int, default=1, help="Random seed, same seed -> same project")
+        p.add_argument("--packages", type=int, help="Packages (one old + one new tree each)")
+        p.add_argument("--folders", type=int, help="Folders per package")
+        p.add_argument("--scripts", type=int, help="Scripts (.cs + .meta) per folder")
+        p.add_argument("--scenes", type=int, help="Scene files")
+        p.add_argument("--prefabs", type=int, help="Prefab files")
+        p.add_argument("--refs-per-file", dest="refs_per_file", type=int, help="Script references per scene/prefab")
+        p.add_argument("--scene-kb", dest="scene_kb", type=int, help="Approximate scene size in KB")
+        p.add_argument("--binary-assets", dest="binary_assets", type=int, help="Binary serialized .asset files")
+        p.add_argument("--missing-ratio", dest="missing_ratio", type=float, help="Share of references to deleted scripts")
+
+    p = sub.add_parser("generate", help="Only generate a project")
+    add_project_args(p)
+    p.add_argument("--root", required=True, help="Project root to create (deleted first if it exists)")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("run", help="Generate a project, time scan/fix/missing/replace and append the results")
+    add_project_args(p)
+    p.add_argument("--repeat", type=int, default=3, help="Rounds per benchmark (median and min are stored)")
+    p.add_argument("--workers", type=int, default=0, help="Engine worker processes (default: one per CPU)")
+    p.add_argument("--label", help="Name of this run, e.g. a branch or change")
+    p.add_argument("--out", default=RESULTS_FILE, help=f"JSON lines results file (default: {RESULTS_FILE})")
+    p.add_argument("--keep", metavar="DIR", help="Generate into DIR and keep it instead of a temp folder")
+    p.add_argument("--verbose", action="store_true", help="Print engine logs")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("compare", help="Compare two runs from the results file")
+    p.add_argument("base", nargs="?", help="Label, revision or index of the base run (default: second to last)")
+    p.add_argument("new", nargs="?", help="Label, revision or index of the new run (default: last)")
+    p.add_argument("--out", default=RESULTS_FILE, help=f"JSON lines results file (default: {RESULTS_FILE})")
+    p.set_defaults(func=cmd_compare)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
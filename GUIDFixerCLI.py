@@ -0,0 +1,291 @@
+import os
+import sys
+import json
+import argparse
+
+from GUIDFixerEngine import GUIDFixerEngine, PACKAGE_CATALOG_FILE, WRITE_MODES, PLAN_FILE, SOURCE_INDEX_DEPTH, MATCH_MODES, MATCH_SCOPES, STREAM_CHUNK_BYTES, DEBUG, INFO, is_guid
+from GUIDFixerSimilarity import CONTENT_MIN_SIMILARITY
+from GUIDFixerWalk import WALK_WORKERS
+from GUIDFixerWatch import watch_missing_scripts, write_report
+
+# Headless front-end for the GUID Fixer (no Tk / display needed).
+#
+# Examples:
+#   python GUIDFixerCLI.py scan --source Library/PackageCache --old Scripts --mappings-out mappings.json
+#   python GUIDFixerCLI.py fix --mappings mappings.json --json-out fix_result.json
+#   python GUIDFixerCLI.py fix-projects --mappings mappings.json --project ../BranchA/Assets --project ../BranchB/Assets
+#   python GUIDFixerCLI.py plan --mappings mappings.json --plan-out plan.json
+#   python GUIDFixerCLI.py apply --plan plan.json
+#   python GUIDFixerCLI.py missing --unity-path Assets
+#   python GUIDFixerCLI.py watch --unity-path Assets --report missing.json
+#   python GUIDFixerCLI.py replace --unity-path Assets --map 0123...cdef=fedc...3210
+#
+# Logs go to stderr, the JSON result goes to --json-out (or stdout).
+
+EXIT_OK = 0
+EXIT_ERROR = 1 # Run failed or some files could not be processed
+EXIT_USAGE = 2 # Bad arguments / paths (argparse uses 2 as well)
+EXIT_MISSING = 3 # 'missing --fail-on-missing' found missing scripts
+
+class UsageError(Exception):
+    pass
+
+def log_stderr(message):
+    print(message, file=sys.stderr, flush=True)
+
+def make_log(args):
+    # Engine log callable: log(message, level). Debug detail only with --verbose.
+    min_level = DEBUG if args.verbose else INFO
+
+    def log(message, level=INFO):
+        if not args.quiet and level >= min_level:
+            log_stderr(message)
+    return log
+
+def load_mappings_file(path):
+    # Same format as "Save Mappings" in GUIDFixer.py
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise UsageError(f"Failed to load mappings file {path}: {e}")
+    data["mappings"] = [(old_p, new_p) for old_p, new_p in data.get("mappings", [])]
+    return data
+
+def load_guid_map(args):
+    guid_map = {}
+    if args.guid_map:
+        try:
+            with open(args.guid_map, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise UsageError(f"Failed to load GUID map {args.guid_map}: {e}")
+        # Either {"old": "new"} or a fix result with a "guid_map" key
+        if isinstance(data, dict) and isinstance(data.get("guid_map"), dict):
+            data = data["guid_map"]
+        if not isinstance(data, dict):
+            raise UsageError(f"GUID map {args.guid_map} must be a JSON object of old -> new GUIDs")
+        guid_map.update(data)
+
+    for pair in args.map or []:
+        old_g, sep, new_g = pair.partition("=")
+        if not sep:
+            raise UsageError(f"Invalid --map '{pair}', expected OLD_GUID=NEW_GUID")
+        guid_map[old_g.strip()] = new_g.strip()
+
+    for old_g, new_g in guid_map.items():
+        if not is_guid(old_g) or not is_guid(new_g):
+            raise UsageError(f"Invalid GUID pair: {old_g} -> {new_g}")
+    return guid_map
+
+def require_dir(path, label):
+    if not path or not os.path.isdir(path):
+        raise UsageError(f"Invalid {label}: {path}")
+
+def write_json(data, path):
+    if path and path != "-":
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        log_stderr(f"Result written to {path}")
+    else:
+        json.dump(data, sys.stdout, indent=4)
+        sys.stdout.write("\n")
+
+def cmd_scan(engine, args):
+    require_dir(args.source, "Source Path")
+    require_dir(args.old, "Old Scripts Path")
+    depth = args.depth if args.depth >= 0 else None
+    result = engine.run_scan(args.source, args.old, depth, args.ignore or (), args.match, args.min_similarity)
+
+    if args.mappings_out:
+        data = {
+            "unity_path": args.unity_path or "",
+            "source_path": args.source,
+            "old_path": args.old,
+            "mappings": result["mappings"],
+        }
+        with open(args.mappings_out, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        log_stderr(f"Mappings saved to {args.mappings_out}")
+    return result, EXIT_OK
+
+def fix_arguments(args):
+    # (unity_path, mappings, source_path, old_path) for fix / plan
+    data = load_mappings_file(args.mappings)
+    # Command line paths override the ones stored in mappings.json
+    unity_path = args.unity_path or data.get("unity_path")
+    source_path = args.source or data.get("source_path")
+    old_path = args.old or data.get("old_path")
+
+    require_dir(unity_path, "Unity Project Path")
+    if not data["mappings"]:
+        raise UsageError(f"No mappings in {args.mappings}. Run 'scan' first.")
+    return unity_path, data["mappings"], source_path, old_path
+
+def cmd_fix(engine, args):
+    result = engine.run_fix(*fix_arguments(args))
+    return result, EXIT_ERROR if result["errors"] else EXIT_OK
+
+def cmd_fix_projects(engine, args):
+    reference_path, mappings, source_path, old_path = fix_arguments(args)
+    unity_paths = list(args.project or ())
+    if args.projects_file:
+        if not os.path.isfile(args.projects_file):
+            raise UsageError(f"Projects file not found: {args.projects_file}")
+        with open(args.projects_file, 'r', encoding='utf-8') as f:
+            unity_paths += [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    if not unity_paths:
+        raise UsageError("No projects given (--project / --projects-file).")
+    for unity_path in unity_paths:
+        require_dir(unity_path, "Unity Project Path")
+    result = engine.run_multi_fix(unity_paths, mappings, source_path, old_path, reference_path)
+    return result, EXIT_ERROR if result["errors"] else EXIT_OK
+
+def cmd_plan(engine, args):
+    unity_path, mappings, source_path, old_path = fix_arguments(args)
+    result = engine.run_plan(unity_path, mappings, source_path, old_path, args.plan_out)
+    return result, EXIT_ERROR if result["errors"] else EXIT_OK
+
+def cmd_apply(engine, args):
+    if not os.path.isfile(args.plan):
+        raise UsageError(f"Plan file not found: {args.plan}")
+    if args.unity_path:
+        require_dir(args.unity_path, "Unity Project Path")
+    result = engine.run_apply_plan(args.plan, args.unity_path, replan=not args.skip_changed)
+    return result, EXIT_ERROR if result["errors"] else EXIT_OK
+
+def cmd_missing(engine, args):
+    require_dir(args.unity_path, "Unity Project Path")
+    result = engine.run_missing_scan(args.unity_path)
+    if args.fail_on_missing and result["missing"]:
+        return result, EXIT_MISSING
+    return result, EXIT_OK
+
+def cmd_watch(engine, args):
+    require_dir(args.unity_path, "Unity Project Path")
+
+    last = {"unity_path": args.unity_path, "missing": []}
+
+    def on_report(report):
+        last.update(report)
+        if args.report:
+            write_report(report, args.report)
+
+    try:
+        watch_missing_scripts(engine, args.unity_path, on_report, interval=args.interval, polling=args.poll)
+    except KeyboardInterrupt:
+        pass # Ctrl+C is the normal way to stop watching, the last report is still written
+    return dict(last), EXIT_OK
+
+def cmd_replace(engine, args):
+    require_dir(args.unity_path, "Unity Project Path")
+    guid_map = load_guid_map(args)
+    if not guid_map:
+        raise UsageError("No GUIDs to replace. Use --guid-map and/or --map.")
+    result = engine.run_direct_guid_replacement(args.unity_path, guid_map)
+    return result, EXIT_ERROR if result["errors"] else EXIT_OK
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Unity GUID Fixer (headless)")
+    parser.add_argument("--cache", help="Path of the meta GUID cache database (default: ./.guidfixer_cache.sqlite)")
+    parser.add_argument("--json-out", help="Write the JSON result to this file instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="Do not print progress logs")
+    parser.add_argument("--verbose", action="store_true", help="Also print per-folder / per-file debug logs")
+    parser.add_argument("--profile", metavar="PATH", help="Write the run profile (per-phase timings, throughput, cache hit rates, slowest files) as JSON")
+    parser.add_argument("--index", action="store_true", help="Use/update the persistent GUID reference index and only open files that reference the GUIDs involved")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for the replacement phase (default: one per CPU, 1 = no pool)")
+    parser.add_argument("--match-scope", choices=MATCH_SCOPES, default="any", help="any: replace mapped GUIDs wherever they occur (default), references: only {fileID, guid, type} references in Unity YAML files")
+    parser.add_argument("--write-mode", choices=WRITE_MODES, default="mmap", help="mmap: patch matched GUIDs in place (default), rewrite: write changed files completely, stream: match in --chunk-mb windows and patch in place (bounded memory)")
+    parser.add_argument("--exclude", action="append", metavar="GLOB", help="Skip folders matching this glob (name or path relative to the Unity path) in fix / plan / missing / watch / replace, can be repeated. Library, Temp, Logs, obj, UserSettings and hidden folders are always skipped")
+    parser.add_argument("--walk-workers", type=int, default=WALK_WORKERS, help=f"Folders listed at the same time while walking the project (default: {WALK_WORKERS}, 1 = no threads; raise it on network drives)")
+    parser.add_argument("--package-catalog", nargs="?", const=PACKAGE_CATALOG_FILE, metavar="PATH", help=f"Catalog Library/PackageCache package versions once and serve later walks / GUID lookups of the same versions from it, shared by all projects (default path: {PACKAGE_CATALOG_FILE})")
+    parser.add_argument("--chunk-mb", type=float, default=STREAM_CHUNK_BYTES / (1024 * 1024), help=f"Window size of --write-mode stream in MB (default: {STREAM_CHUNK_BYTES // (1024 * 1024)})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("scan", help="Detect Old -> New folder mappings")
+    p.add_argument("--source", required=True, help="New Assets / Source Packages Path (e.g. Assets or PackageCache)")
+    p.add_argument("--old", required=True, help="Decompiled / Old Scripts Path")
+    p.add_argument("--unity-path", help="Unity Project Assets Path (stored in --mappings-out)")
+    p.add_argument("--depth", type=int, default=SOURCE_INDEX_DEPTH, help=f"Index source folders down to this depth (0 = direct subfolders, -1 = unlimited, default: {SOURCE_INDEX_DEPTH})")
+    p.add_argument("--ignore", action="append", metavar="GLOB", help="Skip folders matching this glob (name or path relative to --source / --old), can be repeated")
+    p.add_argument("--match", choices=MATCH_MODES, default="name", help="name: equal folder names (default), content: overlap of the script names inside, both: name matches plus content matches for the rest")
+    p.add_argument("--min-similarity", type=float, default=CONTENT_MIN_SIMILARITY, help=f"Lowest similarity (0-1) of a content match (default: {CONTENT_MIN_SIMILARITY})")
+    p.add_argument("--mappings-out", help="Save the detected mappings as mappings.json")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("fix", help="Build the GUID map from mappings.json and replace GUIDs in the project")
+    p.add_argument("--mappings", required=True, help="mappings.json (as saved by the GUI or 'scan')")
+    p.add_argument("--unity-path", help="Override unity_path from mappings.json")
+    p.add_argument("--source", help="Override source_path from mappings.json")
+    p.add_argument("--old", help="Override old_path from mappings.json")
+    p.set_defaults(func=cmd_fix)
+
+    p = sub.add_parser("fix-projects", help="Like 'fix', for several checkouts of the same project: the GUID map is built once, all projects share the worker pool")
+    p.add_argument("--mappings", required=True, help="mappings.json (as saved by the GUI or 'scan')")
+    p.add_argument("--project", action="append", metavar="PATH", help="Unity project (or its Assets folder) to fix, can be repeated")
+    p.add_argument("--projects-file", help="Text file with one project path per line (# comments)")
+    p.add_argument("--unity-path", help="Override unity_path from mappings.json (the checkout the mappings were scanned in)")
+    p.add_argument("--source", help="Override source_path from mappings.json")
+    p.add_argument("--old", help="Override old_path from mappings.json (skipped at the same place in every project)")
+    p.set_defaults(func=cmd_fix_projects)
+
+    p = sub.add_parser("plan", help="Like 'fix', but only save the planned replacements (offsets + file hashes) for 'apply'")
+    p.add_argument("--mappings", required=True, help="mappings.json (as saved by the GUI or 'scan')")
+    p.add_argument("--unity-path", help="Override unity_path from mappings.json")
+    p.add_argument("--source", help="Override source_path from mappings.json")
+    p.add_argument("--old", help="Override old_path from mappings.json")
+    p.add_argument("--plan-out", default=PLAN_FILE, help=f"Plan file to write (default: {PLAN_FILE})")
+    p.set_defaults(func=cmd_plan)
+
+    p = sub.add_parser("apply", help="Execute a plan from 'plan'; files changed since planning are matched again")
+    p.add_argument("--plan", required=True, help="Plan file written by 'plan'")
+    p.add_argument("--unity-path", help="Override the planned Unity Project Assets Path (plan made on another machine)")
+    p.add_argument("--skip-changed", action="store_true", help="Skip files changed since planning instead of matching them again")
+    p.set_defaults(func=cmd_apply)
+
+    p = sub.add_parser("missing", help="Find Missing Script references in Scenes/Prefabs/Assets")
+    p.add_argument("--unity-path", required=True, help="Unity Project Assets Path")
+    p.add_argument("--fail-on-missing", action="store_true", help=f"Exit with code {EXIT_MISSING} if missing scripts are found")
+    p.set_defaults(func=cmd_missing)
+
+    p = sub.add_parser("watch", help="Keep the Missing Script report up to date while the project changes (Ctrl+C to stop)")
+    p.add_argument("--unity-path", required=True, help="Unity Project Assets Path")
+    p.add_argument("--report", help="Rewrite this JSON file after every change")
+    p.add_argument("--interval", type=float, default=2.0, help="Polling interval in seconds when inotify is not available (default: 2)")
+    p.add_argument("--poll", action="store_true", help="Always poll mtimes instead of using inotify")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("replace", help="Replace GUIDs directly (Old GUID -> New GUID)")
+    p.add_argument("--unity-path", required=True, help="Unity Project Assets Path")
+    p.add_argument("--guid-map", help="JSON file with {old_guid: new_guid} (or a 'fix' result)")
+    p.add_argument("--map", action="append", metavar="OLD=NEW", help="Single GUID pair, can be repeated")
+    p.set_defaults(func=cmd_replace)
+
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    engine = GUIDFixerEngine(log=make_log(args), cache_path=args.cache, workers=args.workers, use_index=args.index, write_mode=args.write_mode, match_scope=args.match_scope,
+                             chunk_bytes=int(args.chunk_mb * 1024 * 1024), ignore_globs=args.exclude or (), walk_workers=args.walk_workers,
+                             catalog_path=args.package_catalog)
+    engine.profile_path = args.profile
+
+    try:
+        result, code = args.func(engine, args)
+    except UsageError as e:
+        log_stderr(f"Error: {e}")
+        return EXIT_USAGE
+    except Exception as e:
+        log_stderr(f"Error: {e}")
+        write_json({"command": args.command, "error": str(e)}, args.json_out)
+        return EXIT_ERROR
+
+    result["command"] = args.command
+    result["exit_code"] = code
+    write_json(result, args.json_out)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import os
+import sys
+from array import array
+
+# Compact storage for the big per-run indexes (missing script scan, meta filename index).
+# A 32 character GUID string costs ~80 bytes and a full absolute path ~100-200, and big projects
+# hold millions of them. GUIDs are kept as 128-bit ints instead (hashable, no decoding per lookup)
+# and paths as (folder id, file name) entries of a PathTable, where every folder path is stored once.
+
+def guid_key(guid):
+    # Compact key of a GUID string: its 128-bit int when it is in lowercase (what Unity writes),
+    # otherwise the string itself. GUIDs are matched case-sensitively everywhere (GUIDMatcher, the
+    # watcher), so "ABC..." and "abc..." must stay different keys and keep their own spelling.
+    if guid == guid.lower():
+        return int(guid, 16)
+    return sys.intern(guid)
+
+def guid_text(key):
+    # Inverse of guid_key, gives back the original spelling
+    if isinstance(key, str):
+        return key
+    return f"{key:032x}"
+
+class PathTable:
+    # Append-only table of file paths: entry i is names[i] in folder dirs[entry_dirs[i]].
+    # Entry ids are plain ints (their position), so collections of paths can be array('I') of ids.
+    __slots__ = ("dirs", "dir_ids", "entry_dirs", "names")
+
+    def __init__(self):
+        self.dirs = [] # folder paths, each stored once
+        self.dir_ids = {} # folder path -> index in dirs
+        self.entry_dirs = array('I')
+        self.names = [] # file names (interned, the same names repeat a lot between folders)
+
+    def add_dir(self, dir_path):
+        dir_id = self.dir_ids.get(dir_path)
+        if dir_id is None:
+            dir_id = self.dir_ids[dir_path] = len(self.dirs)
+            self.dirs.append(dir_path)
+        return dir_id
+
+    def add(self, dir_id, name):
+        # Id of a new entry for name in folder dir_id (see add_dir)
+        self.entry_dirs.append(dir_id)
+        self.names.append(sys.intern(name))
+        return len(self.names) - 1
+
+    def add_path(self, path):
+        dir_path, name = os.path.split(path)
+        return self.add(self.add_dir(dir_path), name)
+
+    def path(self, entry_id):
+        return os.path.join(self.dirs[self.entry_dirs[entry_id]], self.names[entry_id])
+
+    def name(self, entry_id):
+        return self.names[entry_id]
+
+    def paths(self, entry_ids=None):
+        # Paths of entry_ids (all entries by default), in order
+        if entry_ids is None:
+            entry_ids = range(len(self.names))
+        return [self.path(i) for i in entry_ids]
+
+    def __len__(self):
+        return len(self.names)
+
+class NameIndex(PathTable):
+    # PathTable with a lookup by (lowercase) key, e.g. meta filename -> candidate paths in insertion order.
+    # Most keys have one path, which is kept as a bare entry id; repeated keys get a list.
+    __slots__ = ("first", "more", "dir_parts")
+
+    def __init__(self):
+        PathTable.__init__(self)
+        self.first = {} # key -> entry id of its first path
+        self.more = {} # key -> [entry ids of its other paths]
+        self.dir_parts = {} # folder id -> its lowercase path components, deepest first (filled by rank)
+
+    def add_key(self, key, dir_id, name):
+        entry_id = self.add(dir_id, name)
+        if key in self.first:
+            self.more.setdefault(key, []).append(entry_id)
+        else:
+            self.first[key] = entry_id
+        return entry_id
+
+    def entries(self, key):
+        entry_id = self.first.get(key)
+        return [] if entry_id is None else [entry_id] + self.more.get(key, [])
+
+    def rank(self, key, context_dir, skip=None):
+        # [(matched folders, path)] of the paths under key, best first: the most trailing folder names
+        # shared with context_dir (the folder the file came from), then by lowercase path, so the order
+        # never depends on the walk. Costs (paths under key) x (folder depth), the index is not walked again.
+        # skip: optional callable(path) for candidates to leave out
+        context = folder_parts(context_dir)
+        ranked = []
+        for entry_id in self.entries(key):
+            path = self.path(entry_id)
+            if skip and skip(path):
+                continue
+            dir_id = self.entry_dirs[entry_id]
+            parts = self.dir_parts.get(dir_id)
+            if parts is None:
+                parts = self.dir_parts[dir_id] = folder_parts(self.dirs[dir_id])
+            matched = 0
+            for a, b in zip(context, parts):
+                if a != b:
+                    break
+                matched += 1
+            ranked.append((matched, path))
+        ranked.sort(key=lambda c: (-c[0], c[1].lower()))
+        return ranked
+
+def folder_parts(dir_path):
+    # Lowercase components of a folder path, deepest first
+    return os.path.normpath(os.path.abspath(dir_path)).lower().split(os.sep)[::-1]
@@ -0,0 +1,2030 @@
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import hashlib
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from GUIDFixerProfile import RunProfile
+from GUIDFixerYaml import iter_references, SCRIPT_FILE_ID
+from GUIDFixerWalk import WalkRules, ProjectSnapshot, compile_ignore_globs, list_folder, walk_project, path_key, WALK_WORKERS
+from GUIDFixerCompact import PathTable, NameIndex, guid_key, guid_text
+from GUIDFixerSimilarity import MinHasher, FolderContent, CONTENT_MIN_SIMILARITY, match_folders_by_content, folder_content_names, jaccard
+
+# GUI-free core of the GUID Fixer.
+# Used by GUIDFixer.py (Tk front-end) and GUIDFixerCLI.py (headless / batch runs).
+# Every run_* method returns a JSON-serializable result dict.
+
+# Generic folder names to ignore to avoid false positives
+# Removed "scripts", "plugins" to ensure we don't skip actual script folders
+IGNORE_NAMES = {
+    "core", "editor", "runtime", "resources", "tests", "samples", "examples",
+    "data", "internal", "utils", "extensions", "legacy", "serialization", "events", "jobs", "layers",
+    "enums", "classes", "interfaces", "structs", "models", "views", "controllers", "prefabs",
+    "materials", "textures", "images", "audio", "sounds", "music", "fonts", "shaders", "scenes",
+    "animations", "animators", "streamingassets", "gizmos", "settings", "documentation", "docs"
+}
+
+# Scan: source folders are indexed down to this depth below the source path
+# (0 = only its direct subfolders, 1 = also their subfolders, None = unlimited)
+SOURCE_INDEX_DEPTH = 1
+
+# Scan: how old folders are paired with source folders
+#   name     same folder name (lowercase, "@version" stripped)
+#   content  overlap of the script file names below them (see GUIDFixerSimilarity)
+#   both     name matches, plus content matches for old folders without one
+MATCH_MODES = ("name", "content", "both")
+
+# Extensions to skip (Binary Media / Libraries) to improve performance and safety
+SKIP_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.tga', '.tif', '.tiff', '.psd', '.bmp', '.gif', '.ico',
+    '.mp3', '.wav', '.ogg', '.aiff', '.m4a', '.mp4', '.avi', '.mov',
+    '.fbx', '.obj', '.dae', '.blend', '.max', '.3ds', '.dxf',
+    '.dll', '.exe', '.so', '.aar', '.jar', '.zip', '.7z', '.rar', '.gz',
+    '.ttf', '.otf', '.eot', '.woff', '.woff2',
+    '.mdb', '.pdb'
+}
+
+# Extensions scanned by the direct (missing script) replacement
+DIRECT_TARGET_EXTENSIONS = {'.unity', '.prefab', '.asset', '.mat', '.controller'}
+
+# Unity assets that must be text (Force Text serialization) for GUIDs to be replaceable
+SERIALIZED_ASSET_EXTENSIONS = ('.unity', '.prefab', '.asset', '.mat', '.controller', '.anim')
+
+# Header sniffing: only this much is read before deciding whether a file can contain GUID references
+HEADER_SNIFF_BYTES = 512
+
+# Text files that never hold asset references (sources, docs, project files)
+SOURCE_EXTENSIONS = {
+    '.cs', '.js', '.boo', '.py', '.txt', '.md', '.csv', '.html', '.htm', '.css',
+    '.shader', '.cginc', '.hlsl', '.glsl', '.compute', '.raytrace',
+    '.csproj', '.sln', '.bat', '.sh', '.rsp'
+}
+
+# Unity asset bundle / archive signatures
+UNITY_BUNDLE_SIGNATURES = (b"UnityFS", b"UnityWeb", b"UnityRaw", b"UnityArchive")
+
+# File kinds (see sniff_file_kind) that are fully read and searched for GUIDs
+SCANNABLE_KINDS = {"yaml", "meta", "json", "text"}
+
+# Files scanned for missing script references
+MISSING_SCAN_EXTENSIONS = ('.unity', '.prefab', '.asset')
+
+# Registry packages live below Library/, which project walks prune (see GUIDFixerWalk);
+# the missing scan still reads their metas so references to package scripts are not reported missing.
+PACKAGE_CACHE_FOLDER = os.path.join("Library", "PackageCache")
+
+# Package versions below a PackageCache folder ("com.unity.textmeshpro@3.0.6", "com.company.tool@1a2b3c4d5e")
+# never change, so their listings and meta GUIDs are catalogued once (see PackageCatalog)
+PACKAGE_FOLDER_PATTERN = re.compile(r"[a-z0-9][a-z0-9._-]*@[\w.+-]+", re.IGNORECASE)
+PACKAGE_CATALOG_FILE = os.path.join(os.path.expanduser("~"), ".guidfixer_packages.sqlite")
+
+# Matches: guid: <32_HEX_CHARS> (various spacing/formats)
+META_GUID_PATTERN = re.compile(rb"guid:\s*([a-fA-F0-9]{32})")
+
+# Any GUID-like token (same behavior as the original C++ tool: replace wherever it occurs)
+GUID_TOKEN_PATTERN = re.compile(rb"[a-fA-F0-9]{32}")
+HEX_BYTES = frozenset(b"0123456789abcdefABCDEF")
+GUID_LENGTH = 32
+
+# ReferenceIndex records the same tokens GUIDMatcher replaces (GUID_TOKEN_PATTERN, 32-char slices of longer
+# hex runs included), so an indexed run opens every file a full run would change.
+# Bumped whenever what is recorded changes; older index data is dropped and rebuilt.
+REFERENCE_INDEX_VERSION = 2
+
+# GUIDMatcher: maps up to this size are located with one bytes.find pass per GUID,
+# bigger ones are tokenized MATCH_WINDOW_BYTES at a time (extended to the next newline)
+DIRECT_FIND_MAX_GUIDS = 64
+MATCH_WINDOW_BYTES = 4 * 1024 * 1024
+
+# Which GUIDs a replacement touches:
+#   any         every GUID-like token, wherever it occurs (same as the original C++ tool)
+#   references  only {fileID, guid, type} references in Unity YAML files (see GUIDFixerYaml), other files are left alone
+MATCH_SCOPES = ("any", "references")
+
+GUID_CACHE_FILE = ".guidfixer_cache.sqlite"
+
+# How changed files are written:
+#   mmap     patch the 32 bytes of every hit in place, only the touched pages are written back
+#   rewrite  write the whole file again (same bytes otherwise)
+#   stream   read the file in windows of STREAM_CHUNK_BYTES and patch the hits in place with seek/write,
+#            so memory per file stays bounded (about twice the chunk size) however big the file is
+WRITE_MODES = ("mmap", "rewrite", "stream")
+FILE_CHANGED_ERROR = "file changed while it was being matched, skipped"
+
+# Plan files (run_plan / run_apply_plan): GUID map, per-file content hash and hit offsets
+PLAN_VERSION = 1
+PLAN_FILE = "guidfixer_plan.json"
+PLAN_STATUSES = ("applied", "replanned", "skipped", "missing")
+
+# Window size of the stream write mode and of the reference index / missing scan readers
+STREAM_CHUNK_BYTES = 8 * 1024 * 1024
+HEX_CHARS = b"0123456789abcdefABCDEF"
+
+# Interactive Mode: characters of the matched line shown per candidate in the review queue
+REVIEW_CONTEXT_CHARS = 160
+
+# Parallel replacement: files bigger than this get a task of their own,
+# smaller ones are batched together up to REPLACE_BATCH_BYTES / REPLACE_BATCH_FILES.
+REPLACE_LARGE_FILE_BYTES = 1024 * 1024
+REPLACE_BATCH_BYTES = 4 * 1024 * 1024
+REPLACE_BATCH_FILES = 64
+
+# Log levels (same values as the logging module). Log callables are called as log(message) or log(message, level).
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LOG_LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+
+def print_log(message, level=INFO):
+    # stderr, stdout may carry a JSON result (GUIDFixerCLI)
+    print(message, file=sys.stderr)
+
+def read_meta_guid(file_path):
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        match = META_GUID_PATTERN.search(content)
+        if match:
+            return match.group(1).decode('ascii')
+    except:
+        pass
+    return None
+
+def read_script_refs(file_path):
+    # GUIDs of all MonoBehaviour script references (m_Script: {fileID: 11500000, guid: <GUID>, type: 3})
+    # in a scene/prefab/asset, one entry per reference. Read window by window (references never span lines).
+    guids = []
+    with open(file_path, 'rb') as f:
+        for _, window in iter_file_windows(f):
+            guids.extend(guid.decode('ascii') for _, _, _, file_id, guid, ref_type, _ in iter_references(window, "m_Script")
+                         if file_id == SCRIPT_FILE_ID and ref_type == 3)
+    return guids
+
+def is_guid(value):
+    return isinstance(value, str) and len(value) == 32 and re.fullmatch(r"[a-fA-F0-9]{32}", value) is not None
+
+class GUIDMatcher:
+    # Finds mapped GUIDs in raw bytes.
+    # Token semantics are the same as re.subn with GUID_TOKEN_PATTERN: a hex run is cut into 32-char tokens from its start,
+    # so a mapped GUID only counts where it starts a token (not in the middle of a longer hex string).
+    # Small maps are located with one bytes.find pass per GUID (runs at memory speed).
+    # Bigger maps tokenize the data window by window in C (findall + set intersection), so windows
+    # without a mapped GUID are rejected without any Python work per token.
+    kinds = SCANNABLE_KINDS # File kinds (see sniff_file_kind) that are read and matched
+
+    def __init__(self, guid_map):
+        self.guid_map = {old_g.encode('ascii'): new_g.encode('ascii') for old_g, new_g in guid_map.items()}
+        self.keys = frozenset(self.guid_map)
+
+    def find(self, data):
+        # data: bytes / mmap. Returns [(offset, old_guid_bytes)] in file order.
+        size = len(data)
+        if len(self.keys) <= DIRECT_FIND_MAX_GUIDS:
+            hits = self.locate(data, self.keys, 0, size)
+        else:
+            hits = []
+            pos = 0
+            while pos < size:
+                # Windows end after a newline, so no hex run crosses a window edge
+                end = data.find(b"\n", pos + MATCH_WINDOW_BYTES)
+                end = size if end < 0 else end + 1
+
+                found = self.keys.intersection(GUID_TOKEN_PATTERN.findall(data, pos, end))
+                if found:
+                    hits.extend(self.locate(data, found, pos, end))
+                pos = end
+
+        # Token starts of one hex run are 32 chars apart, so hits never overlap
+        hits.sort()
+        return hits
+
+    def locate(self, data, guids, start, end):
+        # Offsets of guids in data[start:end] that start a token. data[start - 1] must not be hex.
+        hits = []
+        for old_g in guids:
+            i = data.find(old_g, start, end)
+            while i >= 0:
+                if self.is_token_start(data, i, start):
+                    hits.append((i, old_g))
+                    i = data.find(old_g, i + GUID_LENGTH, end)
+                else:
+                    i = data.find(old_g, i + 1, end)
+        return hits
+
+    @staticmethod
+    def is_token_start(data, offset, lower_bound=0):
+        # Walk back to the start of the hex run containing offset
+        start = offset
+        while start > lower_bound and data[start - 1] in HEX_BYTES:
+            start -= 1
+        return (offset - start) % GUID_LENGTH == 0
+
+    def apply(self, data, hits):
+        # Returns data with every hit replaced (same length, GUIDs are fixed width)
+        parts = []
+        last = 0
+        for offset, old_g in hits:
+            parts.append(data[last:offset])
+            parts.append(self.guid_map[old_g])
+            last = offset + GUID_LENGTH
+        parts.append(data[last:])
+        return b"".join(parts)
+
+    def patch(self, buf, hits):
+        # Overwrite every hit in a writable buffer (mmap). Returns False, without touching buf,
+        # if any hit offset no longer holds its old GUID (file changed since it was matched).
+        for offset, old_g in hits:
+            if buf[offset:offset + GUID_LENGTH] != old_g:
+                return False
+        for offset, old_g in hits:
+            buf[offset:offset + GUID_LENGTH] = self.guid_map[old_g]
+        return True
+
+class PathTrie:
+    # Folder paths stored component by component. Finding out whether any ancestor of a path is stored
+    # walks down its components once, instead of comparing it with every stored path.
+    def __init__(self):
+        self.root = {}
+
+    @staticmethod
+    def split(path):
+        return os.path.normpath(path).split(os.sep)
+
+    def add(self, path, value=True):
+        node = self.root
+        for part in self.split(path):
+            node = node.setdefault(part, {})
+        node[None] = value # None is never a component, it holds the value of a stored path
+
+    def ancestor(self, path):
+        # (stored ancestor path, value) of the shallowest stored path above path (path itself excluded), or None
+        node = self.root
+        parts = self.split(path)
+        for depth, part in enumerate(parts[:-1]):
+            node = node.get(part)
+            if node is None:
+                return None
+            if None in node:
+                return os.sep.join(parts[:depth + 1]), node[None]
+        return None
+
+class ReferenceMatcher(GUIDMatcher):
+    # Match scope "references": only the guid of {fileID, guid, type} references in Unity YAML files,
+    # so hex data that happens to contain a mapped GUID (mesh data, hashes, strings) is never touched.
+    kinds = {"yaml"}
+
+    def find(self, data):
+        guid_map = self.guid_map
+        return [(offset, guid) for _, _, _, _, guid, _, offset in iter_references(data) if guid in guid_map]
+
+def create_matcher(guid_map, match_scope="any"):
+    if match_scope not in MATCH_SCOPES:
+        raise ValueError(f"Unknown match scope: {match_scope}")
+    return ReferenceMatcher(guid_map) if match_scope == "references" else GUIDMatcher(guid_map)
+
+def is_yaml_header(data):
+    return data.startswith(b"%YAML") or data.startswith(b"\xef\xbb\xbf%YAML")
+
+def sniff_file_kind(file_path, header):
+    # Classify a file from its first HEADER_SNIFF_BYTES bytes:
+    #   yaml          Unity text serialization (%YAML)
+    #   meta          .meta importer settings
+    #   json          JSON (asmdef, shadergraph, inputactions, ...)
+    #   text          any other text, scanned to stay on the safe side
+    #   source        scripts / docs (SOURCE_EXTENSIONS), never hold asset references
+    #   unity-binary  Unity binary serialized file or asset bundle
+    #   binary        anything else with NUL bytes
+    #   empty
+    if not header:
+        return "empty"
+    if is_yaml_header(header):
+        return "yaml"
+
+    if b"\x00" in header:
+        if header.startswith(UNITY_BUNDLE_SIGNATURES):
+            return "unity-binary"
+        # SerializedFile header: metadata size, file size, format version (big endian)
+        if len(header) >= 16 and 5 <= int.from_bytes(header[8:12], 'big') <= 64:
+            return "unity-binary"
+        return "binary"
+
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".meta":
+        return "meta"
+    if ext in SOURCE_EXTENSIONS:
+        return "source"
+    if header.lstrip(b"\xef\xbb\xbf \t\r\n")[:1] in (b"{", b"["):
+        return "json"
+    return "text"
+
+def hit_context(data, offset, line):
+    # The line holding a hit, shortened to REVIEW_CONTEXT_CHARS around it (for the review queue)
+    start = data.rfind(b"\n", 0, offset) + 1
+    end = data.find(b"\n", offset)
+    end = len(data) if end < 0 else end
+    half = REVIEW_CONTEXT_CHARS // 2
+    start = max(start, offset - half)
+    end = min(end, offset + GUID_LENGTH + half)
+    return data[start:end].decode('utf-8', errors='replace').strip()
+
+def review_hits(data, hits, offset=0, line=1):
+    # [(offset, old_guid, line, context)] for hits in data (review queue / plan), data starts at file offset
+    # and line. Returns them and the line number at the end of data (for the next window).
+    # data may be an mmap (no count method), so lines are counted on slices.
+    found = []
+    last = 0
+    for hit_offset, old_g in hits:
+        line += data[last:hit_offset].count(b"\n")
+        last = hit_offset
+        found.append((offset + hit_offset, old_g.decode('ascii'), line, hit_context(data, hit_offset, line)))
+    return found, line + data[last:].count(b"\n")
+
+def window_end(data):
+    # How much of data can be matched without cutting a GUID token: up to the last newline,
+    # else up to the last non-hex byte, else (one long hex run) a whole number of 32-char tokens
+    end = data.rfind(b"\n") + 1
+    if not end:
+        end = len(data.rstrip(HEX_CHARS))
+    if not end:
+        end = len(data) - len(data) % GUID_LENGTH
+    return end
+
+def iter_file_windows(f, chunk_bytes=STREAM_CHUNK_BYTES):
+    # Read an open binary file from its current position in windows of about chunk_bytes: yields (offset, window).
+    # A window never ends inside a GUID token (see window_end), the unfinished tail is carried into the next one,
+    # so matching window by window finds exactly what matching the whole file would.
+    offset = f.tell()
+    carry = b""
+    while True:
+        block = f.read(max(chunk_bytes - len(carry), GUID_LENGTH))
+        data = carry + block if carry else block
+        if not block:
+            if data:
+                yield offset, data
+            return
+        end = window_end(data)
+        if end:
+            yield offset, data[:end]
+        offset += end
+        carry = data[end:]
+
+def write_guid_hits(file_path, matcher, hits, size, write_mode="mmap", data=None):
+    # Write the new GUIDs for hits ([(offset, old_guid_bytes)] from matcher.find) into file_path.
+    # The file must still be size bytes long and hold the old GUIDs at the hit offsets, otherwise
+    # nothing is written and OSError is raised. Returns the number of bytes written.
+    if write_mode == "mmap":
+        with open(file_path, 'r+b') as f:
+            if os.fstat(f.fileno()).st_size != size:
+                raise OSError(FILE_CHANGED_ERROR)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as buf:
+                if not matcher.patch(buf, hits):
+                    raise OSError(FILE_CHANGED_ERROR)
+                buf.flush()
+        # Writes through a mapped view do not reliably update the mtime on Windows; Unity's reimport and the
+        # size + mtime caches (GUIDCache, file_kinds, ReferenceIndex, ProjectSnapshot) rely on it
+        os.utime(file_path)
+        return len(hits) * GUID_LENGTH
+
+    if write_mode == "stream":
+        # Check every hit first, so a changed file is left untouched
+        with open(file_path, 'r+b') as f:
+            if os.fstat(f.fileno()).st_size != size:
+                raise OSError(FILE_CHANGED_ERROR)
+            for offset, old_g in hits:
+                f.seek(offset)
+                if f.read(GUID_LENGTH) != old_g:
+                    raise OSError(FILE_CHANGED_ERROR)
+            for offset, old_g in hits:
+                f.seek(offset)
+                f.write(matcher.guid_map[old_g])
+        return len(hits) * GUID_LENGTH
+
+    if data is None:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    if len(data) != size or any(data[offset:offset + GUID_LENGTH] != old_g for offset, old_g in hits):
+        raise OSError(FILE_CHANGED_ERROR)
+    with open(file_path, 'wb') as f:
+        f.write(matcher.apply(data, hits))
+    return len(data)
+
+def replace_guids_in_file(file_path, matcher, check_binary=False, write_mode="mmap", collect=False, chunk_bytes=STREAM_CHUNK_BYTES):
+    # Replace mapped GUIDs in a single file, byte-exact (no re-encoding, no BOM added).
+    # Only a small header is read first; files that cannot hold references (see sniff_file_kind) stop there.
+    # write_mode "mmap" matches on a read-only mapping and patches the hits through a writable one,
+    # so neither a copy of the file nor a full rewrite is needed; "stream" matches window by window (see WRITE_MODES).
+    # collect=True only finds the hits (review queue, plan): nothing is written, the result gets
+    # "hits": [(offset, old_guid, line, context)] instead (and "sha1" of the content if there are any).
+    # Returns {"path", "kind", "stat", "bytes_read", "bytes_written", "replacements", "guids": {old: count},
+    # "seconds", "cpu_seconds"} plus "binary" / "error".
+    # Runs in the main process or in a replacement worker process (see GUIDFixerEngine.replace_files).
+    start, start_cpu = time.perf_counter(), time.process_time()
+    result = {"path": file_path, "kind": None, "bytes_read": 0, "bytes_written": 0, "replacements": 0, "guids": {}}
+    try:
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            result["stat"] = (st.st_size, st.st_mtime_ns)
+
+            header = f.read(HEADER_SNIFF_BYTES)
+            kind = sniff_file_kind(file_path, header)
+            result["kind"] = kind
+
+            # Check for Binary files (Scene/Prefab) to warn user
+            if check_binary and kind != "yaml" and file_path.lower().endswith(SERIALIZED_ASSET_EXTENSIONS):
+                result["binary"] = True
+
+            if kind not in matcher.kinds:
+                result["bytes_read"] = len(header)
+                return result
+
+            data = None
+            found = None # collect: review_hits of the hits
+            digest = None
+            if write_mode == "stream":
+                f.seek(0)
+                hits = []
+                found = []
+                digest = hashlib.sha1() if collect else None
+                line = 1
+                for offset, window in iter_file_windows(f, chunk_bytes):
+                    window_hits = matcher.find(window)
+                    if collect:
+                        digest.update(window)
+                        window_found, line = review_hits(window, window_hits, offset, line)
+                        found.extend(window_found)
+                    hits.extend((offset + hit_offset, old_g) for hit_offset, old_g in window_hits)
+                result["bytes_read"] = st.st_size
+            elif write_mode == "mmap":
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hits = matcher.find(mapped)
+                    if collect:
+                        found = review_hits(mapped, hits)[0]
+                        digest = hashlib.sha1(mapped) if hits else None
+                result["bytes_read"] = st.st_size
+            else:
+                data = header + f.read()
+                hits = matcher.find(data)
+                if collect:
+                    found = review_hits(data, hits)[0]
+                    digest = hashlib.sha1(data) if hits else None
+                result["bytes_read"] = len(data)
+
+        if collect:
+            result["hits"] = found
+            if hits:
+                result["sha1"] = digest.hexdigest()
+            return result
+        if not hits:
+            return result
+
+        result["bytes_written"] = write_guid_hits(file_path, matcher, hits, st.st_size, write_mode, data)
+        st = os.stat(file_path)
+        result["stat"] = (st.st_size, st.st_mtime_ns)
+
+        guids = result["guids"]
+        for _, old_g in hits:
+            key = old_g.decode('ascii')
+            guids[key] = guids.get(key, 0) + 1
+        result["replacements"] = len(hits)
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        result["seconds"] = time.perf_counter() - start
+        result["cpu_seconds"] = time.process_time() - start_cpu
+    return result
+
+# State of a replacement worker process, set once by the pool initializer
+# so the (possibly large) GUID map is not pickled with every task.
+_worker_matcher = None
+
+def _init_replace_worker(matcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+def _replace_batch(batch, check_binary, write_mode, collect, chunk_bytes):
+    # batch: [(index, file_path)] -> [(index, result)]
+    return [(index, replace_guids_in_file(file_path, _worker_matcher, check_binary, write_mode, collect, chunk_bytes)) for index, file_path in batch]
+
+def apply_plan_file(file_path, matcher, entry, write_mode="mmap", replan=True, chunk_bytes=STREAM_CHUNK_BYTES):
+    # Apply one file of a plan. entry: {"size", "sha1", "hits": {old_guid: [offsets]}} (see GUIDFixerEngine.run_plan).
+    # A file with the planned size and hash is patched at the planned offsets without matching again.
+    # A changed file is matched again with the plan's GUID map (replan) or left alone.
+    # Returns a replace_guids_in_file result plus "plan": one of PLAN_STATUSES.
+    start, start_cpu = time.perf_counter(), time.process_time()
+    result = {"path": file_path, "kind": entry.get("kind"), "bytes_read": 0, "bytes_written": 0, "replacements": 0, "guids": {}}
+    try:
+        try:
+            st = os.stat(file_path)
+        except OSError as e:
+            result["plan"] = "missing"
+            result["error"] = str(e)
+            return result
+
+        digest = None
+        data = None
+        if st.st_size == entry["size"]:
+            with open(file_path, 'rb') as f:
+                if write_mode == "stream":
+                    sha1 = hashlib.sha1()
+                    for block in iter(lambda: f.read(chunk_bytes), b""):
+                        sha1.update(block)
+                    digest = sha1.hexdigest()
+                elif write_mode == "mmap" and st.st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        digest = hashlib.sha1(mapped).hexdigest()
+                else:
+                    data = f.read()
+                    digest = hashlib.sha1(data).hexdigest()
+            result["bytes_read"] = st.st_size
+
+        if digest != entry["sha1"]:
+            if not replan:
+                result["plan"] = "skipped"
+                result["stat"] = (st.st_size, st.st_mtime_ns)
+                return result
+            replanned = replace_guids_in_file(file_path, matcher, False, write_mode, chunk_bytes=chunk_bytes)
+            replanned["bytes_read"] += result["bytes_read"]
+            replanned["plan"] = "replanned"
+            return replanned
+
+        hits = sorted((offset, old_g.encode('ascii')) for old_g, offsets in entry["hits"].items() for offset in offsets)
+        result["bytes_written"] = write_guid_hits(file_path, matcher, hits, st.st_size, write_mode, data)
+        st = os.stat(file_path)
+        result["stat"] = (st.st_size, st.st_mtime_ns)
+        result["guids"] = {old_g: len(offsets) for old_g, offsets in entry["hits"].items()}
+        result["replacements"] = len(hits)
+        result["plan"] = "applied"
+    except Exception as e:
+        result["error"] = str(e)
+        result.setdefault("plan", "skipped")
+    finally:
+        result["seconds"] = time.perf_counter() - start
+        result["cpu_seconds"] = time.process_time() - start_cpu
+    return result
+
+_worker_plan = None
+
+def _init_apply_worker(matcher, entries):
+    global _worker_matcher, _worker_plan
+    _worker_matcher = matcher
+    _worker_plan = entries
+
+def _apply_batch(batch, write_mode, replan, chunk_bytes):
+    # batch: [(index, file_path)] -> [(index, result)]
+    return [(index, apply_plan_file(file_path, _worker_matcher, _worker_plan[file_path], write_mode, replan, chunk_bytes)) for index, file_path in batch]
+
+def write_plan(plan, path):
+    # Compact JSON, written next to the target and renamed so a plan is never half-written
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+def load_plan(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict) or plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"{path} is not a GUID Fixer plan (version {PLAN_VERSION})")
+    return plan
+
+def extract_file_refs(file_path):
+    # Every GUID referenced by a file, for the ReferenceIndex.
+    # Returns {"path", "kind", "stat", "refs": {guid: [offsets]}} or "error".
+    result = {"path": file_path, "kind": None, "refs": {}}
+    try:
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            result["stat"] = (st.st_size, st.st_mtime_ns)
+
+            header = f.read(HEADER_SNIFF_BYTES)
+            kind = sniff_file_kind(file_path, header)
+            result["kind"] = kind
+            if kind not in SCANNABLE_KINDS:
+                return result
+
+            f.seek(0)
+            refs = result["refs"]
+            for offset, window in iter_file_windows(f):
+                for match in GUID_TOKEN_PATTERN.finditer(window):
+                    refs.setdefault(match.group().decode('ascii'), []).append(offset + match.start())
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def _extract_batch(batch):
+    # batch: [(index, file_path)] -> [(index, result)]
+    return [(index, extract_file_refs(file_path)) for index, file_path in batch]
+
+def kind_histogram(results):
+    # {kind: file count} for replace_guids_in_file results
+    histogram = {}
+    for result in results:
+        kind = result.get("kind") or "unreadable"
+        histogram[kind] = histogram.get(kind, 0) + 1
+    return dict(sorted(histogram.items(), key=lambda x: -x[1]))
+
+def project_root(path):
+    # Root of the Unity project a path is given for (the project itself or its Assets folder)
+    path = os.path.abspath(path)
+    if not os.path.isdir(os.path.join(path, "Assets")) and os.path.basename(path).lower() == "assets":
+        return os.path.dirname(path)
+    return path
+
+def make_replace_batches(file_paths, known_size=None):
+    # Split files into pool tasks, largest first (big scenes start early, small files fill the gaps).
+    # known_size: optional callable(path) -> (size, ...) or None (ProjectSnapshot.stat), saves a stat per file
+    sized = []
+    for index, file_path in enumerate(file_paths):
+        known = known_size(file_path) if known_size else None
+        try:
+            size = known[0] if known else os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        sized.append((size, index, file_path))
+    sized.sort(key=lambda x: (-x[0], x[1]))
+
+    batches = []
+    current = []
+    current_bytes = 0
+    for size, index, file_path in sized:
+        if size >= REPLACE_LARGE_FILE_BYTES:
+            batches.append((size, [(index, file_path)]))
+            continue
+        current.append((index, file_path))
+        current_bytes += size
+        if current_bytes >= REPLACE_BATCH_BYTES or len(current) >= REPLACE_BATCH_FILES:
+            batches.append((current_bytes, current))
+            current = []
+            current_bytes = 0
+    if current:
+        batches.append((current_bytes, current))
+    return [batch for _, batch in batches]
+
+class GUIDCache:
+    # Persistent cache of .meta GUIDs keyed by absolute path, validated by size + mtime.
+    # The whole table is loaded into memory once; changed entries are written back by save().
+    def __init__(self, db_path, log=print_log):
+        self.db_path = db_path
+        self.log = log
+        self.lock = threading.Lock()
+        self.entries = {} # path -> (size, mtime_ns, guid or "")
+        self.dirty = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta_guids (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, guid TEXT)")
+        return conn
+
+    def load(self):
+        try:
+            conn = self.connect()
+            try:
+                for path, size, mtime_ns, guid in conn.execute("SELECT path, size, mtime_ns, guid FROM meta_guids"):
+                    self.entries[path] = (size, mtime_ns, guid)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # A broken cache is not fatal, we just start from scratch
+            self.log(f"GUID cache unavailable ({self.db_path}): {e}", WARNING)
+            self.entries = {}
+
+    def get(self, file_path):
+        path = os.path.abspath(file_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        cached = self.entries.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            self.hits += 1
+            return cached[2] or None
+
+        self.misses += 1
+        guid = read_meta_guid(path)
+        entry = (st.st_size, st.st_mtime_ns, guid or "")
+        with self.lock:
+            self.entries[path] = entry
+            self.dirty[path] = entry
+        return guid
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            rows = [(path, size, mtime_ns, guid) for path, (size, mtime_ns, guid) in self.dirty.items()]
+            self.dirty = {}
+        try:
+            conn = self.connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO meta_guids (path, size, mtime_ns, guid) VALUES (?, ?, ?, ?)", rows)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.log(f"Failed to save GUID cache: {e}", WARNING)
+
+class ReferenceIndex:
+    # Persistent reverse index: GUID -> files (and byte offsets) referencing it.
+    # Lives in the same SQLite file as the GUIDCache. Files are re-extracted only when size/mtime changed.
+    # The file table is kept in memory; refs are only queried by GUID.
+    def __init__(self, db_path, log=print_log):
+        self.db_path = db_path
+        self.log = log
+        self.files = {} # abs path -> (file_id, size, mtime_ns, kind)
+        self.load()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS ref_files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER, kind TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS refs (guid TEXT, file_id INTEGER, offsets BLOB)")
+        conn.execute("CREATE INDEX IF NOT EXISTS refs_guid ON refs (guid)")
+        conn.execute("CREATE INDEX IF NOT EXISTS refs_file ON refs (file_id)")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != REFERENCE_INDEX_VERSION:
+            with conn:
+                conn.execute("DELETE FROM refs")
+                conn.execute("DELETE FROM ref_files")
+                conn.execute(f"PRAGMA user_version = {REFERENCE_INDEX_VERSION}")
+        return conn
+
+    def load(self):
+        try:
+            conn = self.connect()
+            try:
+                for file_id, path, size, mtime_ns, kind in conn.execute("SELECT id, path, size, mtime_ns, kind FROM ref_files"):
+                    self.files[path] = (file_id, size, mtime_ns, kind)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.log(f"Reference index unavailable ({self.db_path}): {e}", WARNING)
+            self.files = {}
+
+    def stale_paths(self, abs_paths):
+        # Paths that are new or changed since they were indexed
+        stale = []
+        for path in abs_paths:
+            known = self.files.get(path)
+            if known:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if (st.st_size, st.st_mtime_ns) == known[1:3]:
+                    continue
+            stale.append(path)
+        return stale
+
+    def removed_paths(self, root_abs, seen_paths):
+        # Indexed paths below root_abs that no longer exist
+        prefix = root_abs.rstrip(os.sep) + os.sep
+        return [path for path in self.files if path.startswith(prefix) and path not in seen_paths]
+
+    def update(self, results, removed=()):
+        # results: extract_file_refs results (failed extractions are left out and retried next time)
+        conn = self.connect()
+        try:
+            with conn:
+                for path in removed:
+                    known = self.files.pop(path, None)
+                    if known:
+                        conn.execute("DELETE FROM refs WHERE file_id = ?", (known[0],))
+                        conn.execute("DELETE FROM ref_files WHERE id = ?", (known[0],))
+
+                for result in results:
+                    if "error" in result or "stat" not in result:
+                        continue
+                    path = result["path"]
+                    size, mtime_ns = result["stat"]
+                    known = self.files.get(path)
+                    if known:
+                        file_id = known[0]
+                        conn.execute("DELETE FROM refs WHERE file_id = ?", (file_id,))
+                        conn.execute("UPDATE ref_files SET size = ?, mtime_ns = ?, kind = ? WHERE id = ?", (size, mtime_ns, result["kind"], file_id))
+                    else:
+                        cur = conn.execute("INSERT INTO ref_files (path, size, mtime_ns, kind) VALUES (?, ?, ?, ?)", (path, size, mtime_ns, result["kind"]))
+                        file_id = cur.lastrowid
+                    self.files[path] = (file_id, size, mtime_ns, result["kind"])
+
+                    conn.executemany("INSERT INTO refs (guid, file_id, offsets) VALUES (?, ?, ?)",
+                                     [(guid, file_id, array('Q', offsets).tobytes()) for guid, offsets in result["refs"].items()])
+        finally:
+            conn.close()
+
+    def query(self, guids):
+        # {abs path: {guid: [offsets]}} for every indexed file referencing one of guids
+        by_id = {known[0]: path for path, known in self.files.items()}
+        found = {}
+        guids = list(guids)
+        conn = self.connect()
+        try:
+            for i in range(0, len(guids), 500):
+                chunk = guids[i:i + 500]
+                sql = f"SELECT guid, file_id, offsets FROM refs WHERE guid IN ({','.join('?' * len(chunk))})"
+                for guid, file_id, offsets in conn.execute(sql, chunk):
+                    path = by_id.get(file_id)
+                    if path:
+                        found.setdefault(path, {})[guid] = array('Q', offsets).tolist()
+        finally:
+            conn.close()
+        return found
+
+    def referenced_guids(self):
+        conn = self.connect()
+        try:
+            return {guid for (guid,) in conn.execute("SELECT DISTINCT guid FROM refs")}
+        finally:
+            conn.close()
+
+class PackageCatalog:
+    # Persistent catalog of immutable package versions (Library/PackageCache/<name>@<version>): every folder
+    # listing (with file sizes) and .meta GUID of a version, read once and shared by every project that uses
+    # the same catalog file. Walks (see ProjectSnapshot) and GUID lookups inside a catalogued version are
+    # served from it without touching the filesystem.
+    def __init__(self, db_path, log=print_log):
+        self.db_path = db_path
+        self.log = log
+        self.packages = {} # "name@version" (lowercase) -> id
+        self.loaded = {} # "name@version" -> ({folder: (dirs, files)}, {rel path: guid}), read on first use
+        self.lock = threading.Lock()
+        self.hits = 0 # Folder listings / GUIDs served
+        self.built = 0 # Versions catalogued in this session
+        self.load()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS packages (id INTEGER PRIMARY KEY, name TEXT, version TEXT, files INTEGER, built_at TEXT, UNIQUE (name, version))")
+        conn.execute("CREATE TABLE IF NOT EXISTS package_entries (package_id INTEGER, seq INTEGER, folder TEXT, name TEXT, is_dir INTEGER, size INTEGER, guid TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS package_entries_package ON package_entries (package_id)")
+        return conn
+
+    def load(self):
+        try:
+            conn = self.connect()
+            try:
+                for package_id, name, version in conn.execute("SELECT id, name, version FROM packages"):
+                    self.packages[f"{name}@{version}"] = package_id
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.log(f"Package catalog unavailable ({self.db_path}): {e}", WARNING)
+            self.packages = {}
+
+    @staticmethod
+    def split(path):
+        # (package folder, "name@version", "/" separated path inside it) for a path in a PackageCache package, else None
+        path = os.path.abspath(path)
+        if "@" not in path:
+            return None
+        parts = path.split(os.sep)
+        for i in range(1, len(parts)):
+            if parts[i - 1].lower() == "packagecache" and PACKAGE_FOLDER_PATTERN.fullmatch(parts[i]):
+                return os.sep.join(parts[:i + 1]), parts[i].lower(), "/".join(parts[i + 1:])
+        return None
+
+    def entry(self, key):
+        data = self.loaded.get(key)
+        if data is None and key in self.packages:
+            listings, guids = {}, {}
+            conn = self.connect()
+            try:
+                rows = conn.execute("SELECT folder, name, is_dir, size, guid FROM package_entries WHERE package_id = ? ORDER BY seq", (self.packages[key],))
+                for folder, name, is_dir, size, guid in rows:
+                    dirs, files = listings.setdefault(folder, ([], []))
+                    if is_dir:
+                        dirs.append(name)
+                        listings.setdefault(f"{folder}/{name}" if folder else name, ([], []))
+                    else:
+                        files.append((name, size, 0))
+                        if guid is not None:
+                            guids[f"{folder}/{name}" if folder else name] = guid
+            finally:
+                conn.close()
+            data = (listings, guids)
+            with self.lock:
+                self.loaded[key] = data
+        return data
+
+    def listing(self, dir_path):
+        # ([(name, path)], [(name, size, 0)]) of a folder inside a catalogued version, None if not catalogued
+        split = self.split(dir_path)
+        data = self.entry(split[1]) if split else None
+        listing = data[0].get(split[2]) if data else None
+        if listing is None:
+            return None
+        with self.lock:
+            self.hits += 1
+        return [(name, os.path.join(dir_path, name)) for name in listing[0]], list(listing[1])
+
+    def guid(self, meta_path):
+        # GUID of a .meta inside a catalogued version ("" if it has none), None if not catalogued
+        split = self.split(meta_path)
+        data = self.entry(split[1]) if split else None
+        guid = data[1].get(split[2]) if data else None
+        if guid is not None:
+            with self.lock:
+                self.hits += 1
+        return guid
+
+    def add(self, key, package_dir, walked, sizes):
+        # Catalogue one version from a walk of its folder (walked: walk_project result, sizes: {path: size})
+        name, version = key.split("@", 1)
+        rows = []
+        for dir_path, dirs, files in walked:
+            folder = os.path.relpath(dir_path, package_dir).replace(os.sep, "/")
+            folder = "" if folder == "." else folder
+            for d in dirs:
+                rows.append((folder, d, 1, 0, None))
+            for file in files:
+                path = os.path.join(dir_path, file)
+                guid = (read_meta_guid(path) or "") if file.endswith(".meta") else None
+                rows.append((folder, file, 0, sizes.get(path, 0), guid))
+
+        conn = self.connect()
+        try:
+            with conn:
+                cur = conn.execute("INSERT OR REPLACE INTO packages (name, version, files, built_at) VALUES (?, ?, ?, ?)",
+                                   (name, version, len(rows), time.strftime("%Y-%m-%dT%H:%M:%S")))
+                package_id = cur.lastrowid
+                conn.executemany("INSERT INTO package_entries (package_id, seq, folder, name, is_dir, size, guid) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 [(package_id,) + (seq,) + row for seq, row in enumerate(rows)])
+        finally:
+            conn.close()
+        with self.lock:
+            self.packages[key] = package_id
+            self.loaded.pop(key, None)
+            self.built += 1
+        return len(rows)
+
+class GUIDFixerEngine:
+    def __init__(self, log=None, cache_path=None, workers=1, use_index=False, write_mode="mmap", match_scope="any", chunk_bytes=STREAM_CHUNK_BYTES,
+                 ignore_globs=(), walk_workers=WALK_WORKERS, catalog_path=None):
+        # log: callable(message, level=INFO), see LOG_LEVELS. Defaults to print.
+        # workers: processes used by the replacement phase (1 = in-process, 0/None = one per CPU)
+        # use_index: keep a persistent GUID -> files index and only open files that reference mapped GUIDs
+        # write_mode: how changed files are written, see WRITE_MODES
+        # match_scope: which GUIDs fix / replace touch, see MATCH_SCOPES
+        # chunk_bytes: window size of the stream write mode (bounds the memory used per file)
+        # ignore_globs: folders skipped by every project walk (fix, plan, missing, replace), see WalkRules
+        # walk_workers: folders listed at the same time by project walks (1 = no threads)
+        # catalog_path: package catalog database (see PackageCatalog), None = no catalog
+        # Project walks are served from a session snapshot (see ProjectSnapshot), so Scan, Fix and
+        # Missing Scan on the same engine list the trees once and then only stat their folders.
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode: {write_mode}")
+        if match_scope not in MATCH_SCOPES:
+            raise ValueError(f"Unknown match scope: {match_scope}")
+        self.log = log or print_log
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.write_mode = write_mode
+        self.match_scope = match_scope
+        self.chunk_bytes = max(chunk_bytes, 64 * 1024)
+        self.ignore_globs = tuple(ignore_globs or ())
+        self.walk_workers = walk_workers
+        self.package_catalog = PackageCatalog(catalog_path, self.log) if catalog_path else None
+        self.snapshot = ProjectSnapshot(walk_workers, self.package_catalog)
+        # Session cache of sniffed file kinds: path -> (size, mtime_ns, kind).
+        # Files known to be irrelevant are not even opened again while unchanged.
+        self.file_kinds = {}
+        self.cache_path = cache_path or os.path.join(os.getcwd(), GUID_CACHE_FILE)
+        self.guid_cache = GUIDCache(self.cache_path, self.log)
+        self.reference_index = ReferenceIndex(self.cache_path, self.log) if use_index else None
+        # Run profile of the current / last run (see GUIDFixerProfile.RunProfile).
+        # on_progress: optional callable(profile, done, total) for a live readout,
+        # profile_path: if set, the profile of every run is also written there as JSON.
+        self.on_progress = None
+        self.profile_path = None
+        self.profile = RunProfile(None)
+
+    def debug(self, message):
+        # Per-folder / per-file detail, hidden unless the front-end shows debug output
+        self.log(message, DEBUG)
+
+    def warning(self, message):
+        self.log(message, WARNING)
+
+    def error(self, message):
+        self.log(message, ERROR)
+
+    def start_profile(self, run):
+        self.profile = RunProfile(run, self.on_progress)
+        self.profile_cache_base = (self.guid_cache.hits, self.guid_cache.misses, self.snapshot.reused, self.snapshot.listed,
+                                   self.package_catalog.hits if self.package_catalog else 0, self.package_catalog.built if self.package_catalog else 0)
+
+    def finish_profile(self, result):
+        # Attach the profile of the current run to its result (and write it to profile_path)
+        profile = self.profile
+        profile.finish()
+        hits, misses, reused, listed, catalog_hits, catalog_built = self.profile_cache_base
+        profile.set_cache("guid_cache", self.guid_cache.hits - hits, self.guid_cache.misses - misses)
+        profile.set_cache("snapshot", self.snapshot.reused - reused, self.snapshot.listed - listed)
+        if self.package_catalog:
+            # Misses are package versions catalogued in this run
+            profile.set_cache("package_catalog", self.package_catalog.hits - catalog_hits, self.package_catalog.built - catalog_built)
+        self.log(profile.summary())
+        result["profile"] = profile.to_dict()
+        if self.profile_path:
+            try:
+                profile.write(self.profile_path)
+            except OSError as e:
+                self.error(f"Failed to write run profile {self.profile_path}: {e}")
+        return result
+
+    def set_catalog_path(self, catalog_path):
+        # Switch the package catalog on (database path) or off (None)
+        if catalog_path and not (self.package_catalog and self.package_catalog.db_path == catalog_path):
+            self.package_catalog = PackageCatalog(catalog_path, self.log)
+        elif not catalog_path:
+            self.package_catalog = None
+        self.snapshot.catalog = self.package_catalog
+
+    def catalog_packages(self, root):
+        # Catalogue the package versions a walk of root reaches (root is a PackageCache folder or inside
+        # a package) that the catalog does not know yet; later walks / GUID lookups are served from it
+        catalog = self.package_catalog
+        if not catalog:
+            return
+        split = catalog.split(root)
+        if split:
+            packages = [(split[0], split[1])]
+        elif os.path.basename(os.path.abspath(root)).lower() == "packagecache":
+            try:
+                packages = [(entry.path, entry.name.lower()) for entry in os.scandir(root)
+                            if entry.is_dir() and PACKAGE_FOLDER_PATTERN.fullmatch(entry.name)]
+            except OSError:
+                return
+        else:
+            return
+
+        for package_dir, key in packages:
+            if key in catalog.packages or not os.path.isfile(os.path.join(package_dir, "package.json")):
+                continue
+            sizes = {}
+
+            def read_folder(dir_path):
+                dirs, files = list_folder(dir_path, with_stats=True)
+                for name, size, _ in files:
+                    sizes[os.path.join(dir_path, name)] = size
+                return dirs, [name for name, _, _ in files]
+
+            walked = walk_project(package_dir, None, self.walk_workers, read_folder)
+            try:
+                entries = catalog.add(key, package_dir, walked, sizes)
+            except sqlite3.Error as e:
+                self.error(f"Failed to catalogue package {key}: {e}")
+                return
+            self.debug(f"Package catalog: added {key} ({entries} entries).")
+
+    def set_use_index(self, enabled):
+        if enabled and not self.reference_index:
+            self.reference_index = ReferenceIndex(self.cache_path, self.log)
+        elif not enabled:
+            self.reference_index = None
+
+    def extract_guid(self, file_path):
+        # Served from the package catalog for catalogued package versions, else from the persistent cache
+        # unless the meta changed since the last run
+        if self.package_catalog:
+            guid = self.package_catalog.guid(file_path)
+            if guid is not None:
+                return guid or None
+        return self.guid_cache.get(file_path)
+
+    def walk_rules(self, root, exclude_paths=()):
+        # Pruning rules of a project walk below root (Unity junk folders, ignore_globs, exclude_paths)
+        return WalkRules(root, self.ignore_globs, exclude_paths)
+
+    def tree_rules(self, root, exclude_paths=(), ignore_globs=()):
+        # Pruning rules of a source / Old tree walk: only what the caller names. No Unity junk folders
+        # (a source tree may be a project root whose Library/PackageCache holds the metas) and no
+        # ignore_globs of the project walks.
+        return WalkRules(root, ignore_globs, exclude_paths, unity_defaults=False)
+
+    def walk(self, root, exclude_paths=(), rules=None):
+        # [(dir_path, dirs, files)] below root in os.walk order, pruned by walk_rules (see GUIDFixerWalk),
+        # served from the session snapshot
+        self.snapshot.workers = self.walk_workers
+        self.catalog_packages(root)
+        walked = self.snapshot.walk(root, rules or self.walk_rules(root, exclude_paths))
+        if walked:
+            summary = self.snapshot.summary(walked)
+            self.debug(f"Walked {root}: {len(walked)} folders, " +
+                       ", ".join(f"{count} {cls} ({size / (1024 * 1024):.1f} MB)" for cls, (count, size) in summary.items()))
+        return walked
+
+    def walk_files(self, root, exclude_paths=(), extensions=None, skip_extensions=None):
+        # Paths of the files below root (walk order), optionally filtered by (lowercase) extension
+        file_paths = []
+        for dir_path, _, files in self.walk(root, exclude_paths):
+            for file in files:
+                ext = os.path.splitext(file)[1].lower()
+                if (extensions is None or ext in extensions) and not (skip_extensions and ext in skip_extensions):
+                    file_paths.append(os.path.join(dir_path, file))
+        return file_paths
+
+    def build_meta_index(self, search_path, exclude_paths):
+        # Walk a tree once and map lowercase .meta filename -> [candidate paths] (in walk order, see NameIndex).
+        # Folders in exclude_paths are skipped with everything below them.
+        index = NameIndex()
+        for r_s, _, f_s in self.walk(search_path, rules=self.tree_rules(search_path, exclude_paths)):
+            dir_id = None
+            for f in f_s:
+                f_lower = f.lower()
+                if f_lower.endswith(".meta"):
+                    if dir_id is None:
+                        dir_id = index.add_dir(r_s)
+                    index.add_key(f_lower, dir_id, f)
+        return index
+
+    # ------------------------------------------------------------------
+    # 1. Scan: detect Old -> New folder mappings by folder name
+    # ------------------------------------------------------------------
+    def index_source_folders(self, source_path, depth=SOURCE_INDEX_DEPTH, ignore_globs=()):
+        # Lowercase folder name -> folder path for every folder below source_path down to depth
+        # (see SOURCE_INDEX_DEPTH), breadth first so the shallowest folder wins when a name repeats.
+        # Generic names (IGNORE_NAMES) are not indexed but still descended into (Runtime/Behaviours);
+        # hidden folders and folders matching ignore_globs are skipped with everything below them.
+        is_ignored = compile_ignore_globs(ignore_globs)
+        self.catalog_packages(source_path)
+        source_map = {}
+        duplicates = 0
+        level = [(source_path, "")]
+        current_depth = 0
+        while level and (depth is None or current_depth <= depth):
+            next_level = []
+            for dir_path, rel_dir in level:
+                listing = self.package_catalog.listing(dir_path) if self.package_catalog else None
+                if listing:
+                    entries = sorted(name for name, _ in listing[0])
+                else:
+                    try:
+                        entries = sorted(e.name for e in os.scandir(dir_path) if e.is_dir())
+                    except OSError:
+                        continue
+                for item in entries:
+                    rel_path = f"{rel_dir}/{item}" if rel_dir else item
+                    if item.startswith(".") or is_ignored(item, rel_path): # skip .git, .vs etc
+                        continue
+                    full_path = os.path.join(dir_path, item)
+                    next_level.append((full_path, rel_path))
+                    if item.lower() in IGNORE_NAMES:
+                        continue
+
+                    # Use lowercase key for case-insensitive matching
+                    names = [item.lower()]
+                    if "@" in item:
+                        names.append(item.split("@")[0].lower())
+                    for name in names:
+                        if name in source_map:
+                            duplicates += 1
+                        else:
+                            source_map[name] = full_path
+            self.profile.add(files=len(level))
+            level = next_level
+            current_depth += 1
+
+        if duplicates:
+            self.debug(f"{duplicates} source folders share a name with a shallower one and were not indexed.")
+        return source_map
+
+    def run_scan(self, source_path, old_path, depth=SOURCE_INDEX_DEPTH, ignore_globs=(), match_mode="name", min_similarity=CONTENT_MIN_SIMILARITY):
+        # depth: how deep source folders are indexed (see SOURCE_INDEX_DEPTH)
+        # ignore_globs: folder globs skipped in both trees (see compile_ignore_globs)
+        # match_mode: see MATCH_MODES; min_similarity: lowest score of a content match
+        # Every mapping gets a score: Jaccard similarity of the script names below both folders.
+        if match_mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {match_mode}")
+        self.log("Scanning for matching folders...")
+        self.start_profile("scan")
+
+        # 1. Index Source Packages (FolderName -> FullPath)
+        with self.profile.phase("index_source"):
+            depth_text = "unlimited" if depth is None else f"0-{depth}"
+            self.log(f"Indexing source path (Depth {depth_text}): {source_path}")
+            source_map = self.index_source_folders(source_path, depth, ignore_globs)
+            self.log(f"Indexed {len(source_map)} source folders.")
+
+        # Both trees are walked once (session snapshot) for name matching, content matching and scoring
+        def walk_tree(root):
+            self.catalog_packages(root)
+            return self.snapshot.walk(root, self.tree_rules(root, ignore_globs=ignore_globs))
+
+        potential_mappings = [] # (old, new, method)
+        found_count = 0
+        with self.profile.phase("match_folders"):
+            # 2. Walk Old Scripts Path and find matches
+            for root, dirs, files in ([] if match_mode == "content" else walk_tree(old_path)):
+                for d in dirs:
+                    if d.lower() in IGNORE_NAMES:
+                        continue
+
+                    # Check if directory name exists in source map
+                    if d.lower() in source_map:
+                        old_dir_full = os.path.join(root, d)
+                        new_dir_full = source_map[d.lower()]
+
+                        potential_mappings.append((old_dir_full, new_dir_full, "name"))
+                        found_count += 1
+                self.profile.add(files=1)
+
+        source_content = old_content = None
+        if match_mode != "name":
+            # 2b. Pair folders by the script names below them (MinHash / LSH)
+            with self.profile.phase("match_content"):
+                hasher = MinHasher()
+                source_content = FolderContent(hasher, source_path, walked=walk_tree(source_path))
+                old_content = FolderContent(hasher, old_path, walked=walk_tree(old_path))
+                self.profile.add(files=len(source_content.names) + len(old_content.names))
+                name_matched = {old for old, _, _ in potential_mappings}
+                content_matches = match_folders_by_content(source_content, old_content, depth, min_similarity)
+                for old_dir_full, new_dir_full, _ in content_matches:
+                    if old_dir_full not in name_matched:
+                        potential_mappings.append((old_dir_full, new_dir_full, "content"))
+                        found_count += 1
+                self.log(f"Content matching: {len(content_matches)} old folders similar to a source folder "
+                         f"({len(old_content.names)} old / {len(source_content.names)} source folders compared).")
+
+        with self.profile.phase("filter_mappings"):
+            # 3. Filter Redundant Sub-mappings
+            # If we map Parent -> Parent, we don't need to map Parent/Child -> Parent/Child
+            # This reduces noise significantly.
+
+            self.log("Filtering redundant sub-mappings...")
+
+            # Sort by length of old path (shortest first), so parents are accepted before their subfolders
+            potential_mappings.sort(key=lambda x: len(x[0]))
+
+            # Accepted old paths go into a trie: a candidate is a subfolder of an accepted mapping
+            # exactly when one of its ancestors is stored, one lookup per path component.
+            accepted = PathTrie()
+            final_mappings = []
+            for pm in potential_mappings:
+                if accepted.ancestor(pm[0]) is None:
+                    accepted.add(pm[0])
+                    final_mappings.append(pm)
+
+        with self.profile.phase("score_mappings"):
+            matches = []
+            names_cache = {}
+
+            def names_below(content, folder):
+                if content and folder in content.names:
+                    return content.names_below(folder)
+                if folder not in names_cache:
+                    names_cache[folder] = folder_content_names(folder, self.snapshot.walk(folder, self.tree_rules(folder)))
+                return names_cache[folder]
+
+            for old_dir_full, new_dir_full, method in final_mappings:
+                score = jaccard(names_below(old_content, old_dir_full), names_below(source_content, new_dir_full))
+                matches.append({"old": old_dir_full, "new": new_dir_full, "method": method, "score": round(score, 4)})
+                self.debug(f"{method} match ({score:.2f}): {old_dir_full} -> {new_dir_full}")
+
+        self.log(f"Scan complete. Found {len(final_mappings)} valid mappings (filtered from {found_count}).")
+        if not final_mappings:
+            self.log("No matches found. Try pointing Source/Old paths to parent directories.")
+
+        return self.finish_profile({
+            "source_path": source_path,
+            "old_path": old_path,
+            "source_index_depth": depth,
+            "source_folders_indexed": len(source_map),
+            "candidates": found_count,
+            "match_mode": match_mode,
+            "mappings": [[m["old"], m["new"]] for m in matches],
+            "matches": matches,
+        })
+
+    # ------------------------------------------------------------------
+    # 2. Fix: build the Old GUID -> New GUID map from the folder mappings
+    # ------------------------------------------------------------------
+    def build_guid_map(self, mappings, source_path=None, old_path=None):
+        with self.profile.phase("build_guid_map"):
+            return self._build_guid_map(mappings, source_path, old_path)
+
+    def _build_guid_map(self, mappings, source_path, old_path):
+        guid_map = {}
+        total_meta_files_checked = 0
+        unmatched = 0
+        ambiguous = [] # Filenames with several equally ranked candidates, see find_in_path
+        resolved = 0 # Filenames with several candidates, decided by folder context
+
+        # Filename indexes of the new/source trees, built lazily (one walk per tree per run)
+        meta_indexes = {}
+        global_exclude_paths = []
+        if old_path:
+            global_exclude_paths.append(old_path)
+
+        def get_meta_index(search_path):
+            key = os.path.abspath(search_path).lower()
+            if key not in meta_indexes:
+                self.log(f"  Indexing meta files in: {search_path}")
+                meta_indexes[key] = self.build_meta_index(search_path, global_exclude_paths)
+            return meta_indexes[key]
+
+        for old_dir, new_dir in mappings:
+            self.log(f"--- Processing Mapping ---")
+            self.log(f"Old (Source of GUIDs): {old_dir}")
+            self.log(f"New (Target for Match): {new_dir}")
+
+            # Check if directory has meta files
+            has_meta = False
+            old_dir_abs = os.path.abspath(old_dir).lower() if old_dir else None
+
+            # Helper to look up a match in a directory tree.
+            # Each tree is walked once per run (see build_meta_index), so this is a dict lookup.
+            # Several candidates are ranked by the folder names they share with the old file
+            # (Runtime/Utils/Utils.cs beats Editor/Utils.cs for Old/Runtime/Utils/Utils.cs).
+            def find_in_path(search_path, target_filename, old_meta_path):
+                nonlocal resolved
+                index = get_meta_index(search_path)
+
+                # Skip candidates inside the current "Old" directory to avoid self-matching
+                def in_old_dir(cand):
+                    return old_dir_abs and os.path.abspath(os.path.dirname(cand)).lower().startswith(old_dir_abs)
+
+                ranked = index.rank(target_filename.lower(), os.path.dirname(old_meta_path), in_old_dir)
+                if not ranked:
+                    return None
+
+                if len(ranked) > 1:
+                    best = ranked[0][0]
+                    tied = [path for matched, path in ranked if matched == best]
+                    if len(tied) > 1:
+                        self.warning(f"WARNING: Multiple candidates found for {target_filename}:")
+                        for c in tied:
+                            self.warning(f"  - {c}")
+                        self.warning(f"  > Using first one: {tied[0]}")
+                        ambiguous.append({
+                            "file": target_filename,
+                            "old_path": old_meta_path,
+                            "search_path": search_path,
+                            "candidates": [{"path": path, "matched_folders": matched} for matched, path in ranked],
+                            "chosen": tied[0],
+                        })
+                    else:
+                        resolved += 1
+                        self.debug(f"  {len(ranked)} candidates for {target_filename}, closest folders: {ranked[0][1]}")
+
+                return ranked[0][1]
+
+            # Walk old dir
+            for root, _, files in self.walk(old_dir, rules=self.tree_rules(old_dir)):
+                self.debug(f"  Walking subfolder: {root} (Files: {len(files)})")
+                for file in files:
+                    if not file.endswith(".meta"):
+                        continue
+
+                    has_meta = True
+                    total_meta_files_checked += 1
+                    self.profile.add(files=1)
+                    self.profile.progress(total_meta_files_checked)
+                    old_meta_path = os.path.join(root, file)
+
+                    self.debug(f"Searching match for: {file}")
+
+                    # Strategy:
+                    # 1. Try finding in the mapped 'new_dir' first (fastest/most accurate).
+                    # 2. If not found, try finding in the ROOT Source Path (recursive).
+                    new_meta_path = find_in_path(new_dir, file, old_meta_path)
+
+                    if not new_meta_path and source_path and os.path.isdir(source_path):
+                         self.debug(f"  Attempt 2: Fallback search in {source_path}")
+                         new_meta_path = find_in_path(source_path, file, old_meta_path)
+
+                    if not new_meta_path:
+                        unmatched += 1
+                        continue
+
+                    old_guid = self.extract_guid(old_meta_path)
+                    new_guid = self.extract_guid(new_meta_path)
+
+                    if old_guid and new_guid:
+                        if old_guid != new_guid:
+                            guid_map[old_guid] = new_guid
+                            self.debug(f"Map: {file} ({old_guid} -> {new_guid})")
+                        else:
+                            # GUIDs are same. This is suspicious if we expect them to be different.
+                            # Could mean the "Old" file was already updated or is identical to the new one.
+                            self.warning(f"WARNING: Same GUID found in Old and New for {file} ({old_guid}).")
+                            self.warning(f"  Old Path: {old_meta_path}")
+                            self.warning(f"  New Path: {new_meta_path}")
+                            self.warning(f"  Skipping map for this file.")
+                    else:
+                        self.warning(f"Warning: Could not extract GUID from {file}")
+
+            if not has_meta:
+                self.warning(f"WARNING: No .meta files found in {old_dir}. \nAre you pointing to a folder with valid Unity metadata?")
+
+        self.guid_cache.save()
+        self.log(f"Checked {total_meta_files_checked} meta files.")
+        self.log(f"GUID cache: {self.guid_cache.hits} hits, {self.guid_cache.misses} re-read.")
+        self.log(f"GUID Map built. {len(guid_map)} GUIDs to replace.")
+        if resolved or ambiguous:
+            self.log(f"Several candidates: {resolved} decided by folder context, {len(ambiguous)} ambiguous (see ambiguous_candidates).")
+
+        stats = {
+            "meta_files_checked": total_meta_files_checked,
+            "unmatched_meta_files": unmatched,
+            "resolved_by_context": resolved,
+            "ambiguous_candidates": ambiguous,
+        }
+        return guid_map, stats
+
+    # ------------------------------------------------------------------
+    # Reference index (GUID -> files), see ReferenceIndex
+    # ------------------------------------------------------------------
+    def refresh_reference_index(self, root):
+        # Bring the index up to date for every candidate file below root, re-reading only new/changed files.
+        # Returns the files below root (walk order, as walked).
+        with self.profile.phase("reference_index"):
+            return self._refresh_reference_index(root)
+
+    def _refresh_reference_index(self, root):
+        root_files = self.walk_files(root, skip_extensions=SKIP_EXTENSIONS)
+
+        abs_paths = {os.path.abspath(p) for p in root_files}
+        stale = self.reference_index.stale_paths(sorted(abs_paths))
+        removed = self.reference_index.removed_paths(os.path.abspath(root), abs_paths)
+
+        results = []
+        if stale:
+            self.log(f"Reference index: reading {len(stale)} new/changed files...")
+            results = self.run_batches(_extract_batch, stale)
+            for result in results:
+                if "error" in result:
+                    self.error(f"Error indexing {result['path']}: {result['error']}")
+        self.reference_index.update(results, removed)
+        self.profile.add(files=len(root_files))
+        self.profile.set_cache("reference_index", len(root_files) - len(stale), len(stale))
+        self.log(f"Reference index up to date: {len(root_files)} files ({len(stale)} re-read, {len(removed)} removed).")
+        return root_files
+
+    def indexed_files_referencing(self, root, guids, extensions=None):
+        # Files below root (walk order) that reference any of guids, optionally filtered by extension
+        root_files = self.refresh_reference_index(root)
+        found = self.reference_index.query(guids)
+        return [p for p in root_files
+                if os.path.abspath(p) in found and (extensions is None or os.path.splitext(p)[1].lower() in extensions)]
+
+    def reindex_files(self, results):
+        # Files rewritten by a replacement must be re-indexed, otherwise the next refresh re-reads them anyway
+        if not self.reference_index:
+            return
+        changed = [os.path.abspath(result["path"]) for result in results if result["replacements"]]
+        if changed:
+            with self.profile.phase("reindex"):
+                self.reference_index.update([extract_file_refs(path) for path in changed])
+                self.profile.add(files=len(changed))
+
+    # ------------------------------------------------------------------
+    # 2b. Fix: replace mapped GUIDs in every text file of the Unity project
+    # ------------------------------------------------------------------
+    def run_batches(self, batch_func, file_paths, batch_args=(), initializer=None, initargs=()):
+        # Run batch_func([(index, path)], *batch_args) over file_paths, in a process pool when workers > 1.
+        # Results always come back in file_paths order, whatever order the workers finish in.
+        workers = min(self.workers, len(file_paths))
+        if workers <= 1:
+            if initializer:
+                initializer(*initargs)
+            results = []
+            for start in range(0, len(file_paths), REPLACE_BATCH_FILES):
+                batch = list(enumerate(file_paths[start:start + REPLACE_BATCH_FILES], start))
+                results.extend(result for _, result in batch_func(batch, *batch_args))
+                self.profile.progress(len(results), len(file_paths))
+            return results
+
+        batches = make_replace_batches(file_paths, self.snapshot.stat)
+        self.log(f"Processing {len(file_paths)} files with {workers} worker processes ({len(batches)} tasks)...")
+
+        results = [None] * len(file_paths)
+        done = 0
+        report_every = max(1, len(file_paths) // 10)
+        next_report = report_every
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            futures = [pool.submit(batch_func, batch, *batch_args) for batch in batches]
+            for future in as_completed(futures):
+                for index, result in future.result():
+                    results[index] = result
+                    done += 1
+                self.profile.progress(done, len(file_paths))
+                if done >= next_report:
+                    self.log(f"  Processed {done}/{len(file_paths)} files...")
+                    next_report += report_every
+        return results
+
+    def replace_files(self, file_paths, guid_map, check_binary=False, review=None):
+        # Run replace_guids_in_file over file_paths (see run_batches), results in file_paths order.
+        # review: optional callable([candidate]) -> [approved candidates] (Interactive Mode). Every hit is
+        # collected first without writing, reviewed in one go, then only the approved ones are written.
+        with self.profile.phase("collect" if review else "replace"):
+            results = self._replace_files(file_paths, guid_map, check_binary, review is not None)
+        if review:
+            candidates = []
+            for result in results:
+                for offset, old_g, line, context in result.pop("hits", ()):
+                    candidates.append({"path": result["path"], "offset": offset, "line": line,
+                                       "old_guid": old_g, "new_guid": guid_map[old_g], "context": context})
+            self.log(f"Review: {len(candidates)} candidate replacements in {len({c['path'] for c in candidates})} files.")
+            approved = review(candidates) if candidates else []
+            self.log(f"Review: {len(approved)} of {len(candidates)} replacements approved.")
+            with self.profile.phase("apply"):
+                self.apply_review(results, approved, guid_map)
+        return results
+
+    def apply_review(self, results, approved, guid_map):
+        # Write the approved candidates, one pass over the files that have any,
+        # and record them in the (collect) results like a normal replacement
+        matcher = create_matcher(guid_map, self.match_scope)
+        by_path = {}
+        for candidate in approved:
+            by_path.setdefault(candidate["path"], []).append((candidate["offset"], candidate["old_guid"].encode('ascii')))
+
+        for result in results:
+            hits = sorted(by_path.get(result["path"], ()))
+            if not hits:
+                continue
+            try:
+                written = write_guid_hits(result["path"], matcher, hits, result["stat"][0], self.write_mode)
+                st = os.stat(result["path"])
+            except Exception as e:
+                result["error"] = str(e)
+                continue
+            result["stat"] = (st.st_size, st.st_mtime_ns)
+            result["bytes_written"] = written
+            result["replacements"] = len(hits)
+            for _, old_g in hits:
+                key = old_g.decode('ascii')
+                result["guids"][key] = result["guids"].get(key, 0) + 1
+            self.profile.add(files=1, bytes_written=written)
+
+    def _replace_files(self, file_paths, guid_map, check_binary, collect):
+        matcher = create_matcher(guid_map, self.match_scope)
+        results = [None] * len(file_paths)
+
+        # Files already sniffed as irrelevant in this session (and unchanged since) are skipped
+        pending = []
+        for index, file_path in enumerate(file_paths):
+            known = self.file_kinds.get(file_path)
+            if known and known[2] not in matcher.kinds:
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    st = None
+                if st and (st.st_size, st.st_mtime_ns) == known[:2]:
+                    result = {"path": file_path, "kind": known[2], "stat": known[:2], "bytes_read": 0, "bytes_written": 0, "replacements": 0, "guids": {}}
+                    if check_binary and known[2] != "yaml" and file_path.lower().endswith(SERIALIZED_ASSET_EXTENSIONS):
+                        result["binary"] = True
+                    results[index] = result
+                    continue
+            pending.append(index)
+
+        pending_results = self.run_batches(_replace_batch, [file_paths[index] for index in pending],
+                                           (check_binary, self.write_mode, collect, self.chunk_bytes), _init_replace_worker, (matcher,))
+        for index, result in zip(pending, pending_results):
+            results[index] = result
+
+        for index in pending:
+            self.profile.add_file_result(results[index])
+        self.profile.add(files=len(file_paths) - len(pending))
+        self.profile.set_cache("file_kinds", len(file_paths) - len(pending), len(pending))
+
+        for result in results:
+            if result.get("kind") and "stat" in result:
+                self.file_kinds[result["path"]] = result["stat"] + (result["kind"],)
+
+        histogram = kind_histogram(results)
+        bytes_read = sum(result["bytes_read"] for result in results)
+        self.log("File types: " + ", ".join(f"{kind} {count}" for kind, count in histogram.items()))
+        self.log(f"Read {bytes_read / (1024 * 1024):.1f} MB ({len(file_paths) - len(pending)} files skipped from cache).")
+        return results
+
+    def replace_guids(self, unity_path, guid_map, old_path=None, review=None):
+        # review: optional callable([candidate]) -> [approved candidates] (Interactive Mode, see replace_files)
+        self.log("Replacing GUIDs in Unity Project...")
+        file_paths = self.target_files(unity_path, guid_map, old_path)
+        results = self.replace_files(file_paths, guid_map, check_binary=True, review=review)
+        self.reindex_files(results)
+        return self.replacement_summary(file_paths, results)
+
+    def target_files(self, unity_path, guid_map, old_path=None):
+        # Files of the Unity project the replacement has to look at (the Old folder is never touched)
+        # Find ALL GUID-like tokens in each file, check if in map, replace (see GUIDMatcher).
+        # (Iterating 100s of keys for every file is slow.)
+        if self.reference_index:
+            # Only open files the index says reference a mapped GUID
+            file_paths = self.indexed_files_referencing(unity_path, guid_map)
+            if old_path:
+                # Same folder test as the walk (WalkRules.prunes_path): Assets/Old, not Assets/OldScenes
+                old_prefix = os.path.join(path_key(old_path), "")
+                file_paths = [p for p in file_paths if not path_key(p).startswith(old_prefix)]
+            self.log(f"Reference index: {len(file_paths)} files reference mapped GUIDs.")
+        else:
+            with self.profile.phase("walk"):
+                # The Old folder is pruned before it is entered; known binary/media files are skipped.
+                # Like the original C++ tool, any mapped GUID is replaced wherever it occurs.
+                # Whether a file can hold references at all is decided from its header (sniff_file_kind).
+                file_paths = self.walk_files(unity_path, [old_path] if old_path else (), skip_extensions=SKIP_EXTENSIONS)
+                self.profile.add(files=len(file_paths))
+        return file_paths
+
+    def replacement_summary(self, file_paths, results):
+        # Result dict of a replacement run from replace_guids_in_file results
+        updated_files = []
+        errors = []
+        binary_warnings = []
+        total_replacements = 0
+        per_guid = {}
+
+        for result in results:
+            file_path = result["path"]
+            file = os.path.basename(file_path)
+            if result.get("binary"):
+                binary_warnings.append(file_path)
+                self.warning(f"WARNING: {file} appears to be BINARY. Cannot replace GUIDs. Set 'Asset Serialization' to 'Force Text' in Unity.")
+            if "error" in result:
+                errors.append({"path": file_path, "error": result["error"]})
+                self.error(f"Error processing {file}: {result['error']}")
+                continue
+            if result["replacements"]:
+                total_replacements += result["replacements"]
+                for old_g, count in result["guids"].items():
+                    per_guid[old_g] = per_guid.get(old_g, 0) + count
+                updated_files.append({"path": file_path, "replacements": result["replacements"]})
+                if file.lower().endswith((".unity", ".prefab", ".asset")):
+                    self.log(f"Fixed File: {file} ({result['replacements']} replacements)")
+
+        self.log(f"Done! Updated {len(updated_files)} files.")
+        return {
+            "files_scanned": len(file_paths),
+            "updated_files": updated_files,
+            "replacements": total_replacements,
+            "replacements_per_guid": per_guid,
+            "file_kinds": kind_histogram(results),
+            "bytes_read": sum(result["bytes_read"] for result in results),
+            "binary_warnings": binary_warnings,
+            "errors": errors,
+        }
+
+    def run_fix(self, unity_path, mappings, source_path=None, old_path=None, review=None):
+        self.log("Starting Fix Process...")
+        self.start_profile("fix")
+
+        # 1. Build GUID Map
+        guid_map, stats = self.build_guid_map(mappings, source_path, old_path)
+
+        result = {
+            "unity_path": unity_path,
+            "mappings": len(mappings),
+            "guid_map": guid_map,
+        }
+        result.update(stats)
+
+        if not guid_map:
+            self.log("No GUIDs need replacing.")
+            result.update({"files_scanned": 0, "updated_files": [], "replacements": 0, "replacements_per_guid": {}, "file_kinds": {}, "bytes_read": 0, "binary_warnings": [], "errors": []})
+            return self.finish_profile(result)
+
+        # 2. Replace in Unity Project
+        result.update(self.replace_guids(unity_path, guid_map, old_path, review))
+        return self.finish_profile(result)
+
+    # ------------------------------------------------------------------
+    # 2b'. Fix several checkouts of the same project with one GUID map
+    # ------------------------------------------------------------------
+    def run_multi_fix(self, unity_paths, mappings, source_path=None, old_path=None, reference_path=None):
+        # run_fix for branches / forks of one project: the GUID map is built once (mappings, source_path and
+        # old_path belong to the reference checkout, default the first one), then the files of all projects go
+        # through one replacement pool. The Old folder is left alone in every checkout that has it at the same
+        # place. Result: totals like run_fix plus one replacement summary per project under "projects".
+        self.log(f"Starting Fix Process for {len(unity_paths)} projects...")
+        self.start_profile("multi_fix")
+
+        guid_map, stats = self.build_guid_map(mappings, source_path, old_path)
+        result = {
+            "unity_paths": list(unity_paths),
+            "mappings": len(mappings),
+            "guid_map": guid_map,
+        }
+        result.update(stats)
+
+        reference_root = project_root(reference_path or unity_paths[0])
+        old_rel = None
+        if old_path:
+            try:
+                old_rel = os.path.relpath(os.path.abspath(old_path), reference_root)
+            except ValueError: # Other drive
+                pass
+            if old_rel and old_rel.split(os.sep)[0] == os.pardir:
+                old_rel = None # Outside the checkout: only that folder itself is protected
+
+        targets = [] # (unity_path, files)
+        seen = set()
+        for unity_path in unity_paths:
+            if not guid_map:
+                targets.append((unity_path, []))
+                continue
+            project_old = os.path.join(project_root(unity_path), old_rel) if old_rel else old_path
+            files = []
+            for file_path in self.target_files(unity_path, guid_map, project_old):
+                key = os.path.normcase(os.path.abspath(file_path))
+                if key not in seen: # Overlapping paths: a file is replaced once, for the first project
+                    seen.add(key)
+                    files.append(file_path)
+            self.log(f"{unity_path}: {len(files)} files to check.")
+            targets.append((unity_path, files))
+
+        if not guid_map:
+            self.log("No GUIDs need replacing.")
+        all_files = [file_path for _, files in targets for file_path in files]
+        results = self.replace_files(all_files, guid_map, check_binary=True) if all_files else []
+        self.reindex_files(results)
+
+        projects = []
+        start = 0
+        for unity_path, files in targets:
+            self.log(f"--- {unity_path} ---")
+            summary = {"unity_path": unity_path}
+            summary.update(self.replacement_summary(files, results[start:start + len(files)]))
+            start += len(files)
+            projects.append(summary)
+
+        per_guid = {}
+        for summary in projects:
+            for old_g, count in summary["replacements_per_guid"].items():
+                per_guid[old_g] = per_guid.get(old_g, 0) + count
+        result.update({
+            "files_scanned": len(all_files),
+            "updated_files": [updated for summary in projects for updated in summary["updated_files"]],
+            "replacements": sum(per_guid.values()),
+            "replacements_per_guid": per_guid,
+            "file_kinds": kind_histogram(results),
+            "bytes_read": sum(summary["bytes_read"] for summary in projects),
+            "binary_warnings": [path for summary in projects for path in summary["binary_warnings"]],
+            "errors": [error for summary in projects for error in summary["errors"]],
+            "projects": projects,
+        })
+        self.log(f"All projects done: {len(result['updated_files'])} files updated, {result['replacements']} replacements.")
+        return self.finish_profile(result)
+
+    # ------------------------------------------------------------------
+    # 2c. Plan / apply: match once and save the offsets, patch them later
+    # ------------------------------------------------------------------
+    def run_plan(self, unity_path, mappings, source_path=None, old_path=None, plan_path=PLAN_FILE):
+        # Same matching as run_fix, but nothing is written to the project: the GUID map and, per affected
+        # file, its size, SHA-1 and hit offsets go to plan_path for run_apply_plan.
+        self.log("Starting Plan...")
+        self.start_profile("plan")
+
+        guid_map, stats = self.build_guid_map(mappings, source_path, old_path)
+        file_paths = self.target_files(unity_path, guid_map, old_path) if guid_map else []
+        with self.profile.phase("collect"):
+            results = self._replace_files(file_paths, guid_map, True, True) if file_paths else []
+
+        unity_abs = os.path.abspath(unity_path)
+        files = {} # path relative to unity_path ("/" separated) -> entry
+        per_guid = {}
+        errors = []
+        binary_warnings = []
+        for result in results:
+            if result.get("binary"):
+                binary_warnings.append(result["path"])
+                self.warning(f"WARNING: {os.path.basename(result['path'])} appears to be BINARY. Cannot replace GUIDs. Set 'Asset Serialization' to 'Force Text' in Unity.")
+            if "error" in result:
+                errors.append({"path": result["path"], "error": result["error"]})
+                self.error(f"Error processing {os.path.basename(result['path'])}: {result['error']}")
+                continue
+            hits = result.pop("hits", None)
+            if not hits:
+                continue
+            by_guid = {}
+            for offset, old_g, _, _ in hits:
+                by_guid.setdefault(old_g, []).append(offset)
+                per_guid[old_g] = per_guid.get(old_g, 0) + 1
+            rel_path = os.path.relpath(os.path.abspath(result["path"]), unity_abs).replace(os.sep, "/")
+            files[rel_path] = {"kind": result["kind"], "size": result["stat"][0], "sha1": result["sha1"], "hits": by_guid}
+
+        plan = {
+            "version": PLAN_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "unity_path": unity_abs,
+            "match_scope": self.match_scope,
+            "guid_map": guid_map,
+            "files": files,
+        }
+        write_plan(plan, plan_path)
+
+        replacements = sum(per_guid.values())
+        self.log(f"Plan saved to {plan_path}: {replacements} replacements in {len(files)} files.")
+
+        result = {
+            "unity_path": unity_path,
+            "plan_path": plan_path,
+            "mappings": len(mappings),
+            "guid_map": guid_map,
+        }
+        result.update(stats)
+        result.update({
+            "files_scanned": len(file_paths),
+            "planned_files": len(files),
+            "replacements": replacements,
+            "replacements_per_guid": per_guid,
+            "file_kinds": kind_histogram(results),
+            "bytes_read": sum(result["bytes_read"] for result in results),
+            "binary_warnings": binary_warnings,
+            "errors": errors,
+        })
+        return self.finish_profile(result)
+
+    def run_apply_plan(self, plan_path, unity_path=None, replan=True):
+        # Execute a plan from run_plan. Files whose size and hash still match are patched at the planned
+        # offsets; changed files are matched again (replan) or skipped. unity_path overrides the planned
+        # project root (plan made on another machine). Files added after planning are not looked at.
+        self.log(f"Applying plan {plan_path}...")
+        self.start_profile("apply")
+
+        plan = load_plan(plan_path)
+        root = unity_path or plan["unity_path"]
+        guid_map = plan["guid_map"]
+        # Changed files are matched again the way they were planned
+        matcher = create_matcher(guid_map, plan.get("match_scope", "any"))
+        entries = {os.path.join(root, *rel_path.split("/")): entry for rel_path, entry in plan["files"].items()}
+        file_paths = list(entries)
+
+        with self.profile.phase("apply"):
+            results = self.run_batches(_apply_batch, file_paths, (self.write_mode, replan, self.chunk_bytes),
+                                       _init_apply_worker, (matcher, entries)) if file_paths else []
+            for result in results:
+                self.profile.add_file_result(result)
+        self.reindex_files(results)
+
+        statuses = {status: 0 for status in PLAN_STATUSES}
+        changed_files = []
+        for result in results:
+            statuses[result["plan"]] += 1
+            if result["plan"] != "applied":
+                changed_files.append({"path": result["path"], "plan": result["plan"]})
+                self.warning(f"{os.path.basename(result['path'])} changed since planning: {result['plan']}")
+        self.log(f"Plan: {statuses['applied']} files applied as planned, {statuses['replanned']} re-planned, "
+                 f"{statuses['skipped']} skipped, {statuses['missing']} missing.")
+
+        result = {
+            "unity_path": root,
+            "plan_path": plan_path,
+            "planned_at": plan.get("created_at"),
+            "guid_map": guid_map,
+            "plan_status": statuses,
+            "changed_files": changed_files,
+        }
+        result.update(self.replacement_summary(file_paths, results))
+        return self.finish_profile(result)
+
+    # ------------------------------------------------------------------
+    # 3. Missing scripts: references to GUIDs that no meta file defines
+    # ------------------------------------------------------------------
+    def run_missing_scan(self, unity_path):
+        self.log("Scanning project for Missing Scripts...")
+        self.start_profile("missing")
+
+        # 1. Collect ALL valid GUIDs from current project meta files
+        # GUIDs are kept as 128-bit ints and paths as PathTable entry ids (see GUIDFixerCompact)
+        valid_guids = set()
+        self.log("Indexing valid GUIDs in project...")
+        with self.profile.phase("walk"):
+            # One walk for the metas and the files to scan
+            paths = PathTable()
+            meta_ids = array('I')
+            scan_ids = array('I')
+            for root, _, files in self.walk(unity_path):
+                dir_id = paths.add_dir(root)
+                for file in files:
+                    if file.endswith(".meta"):
+                        meta_ids.append(paths.add(dir_id, file))
+                    elif file.endswith(MISSING_SCAN_EXTENSIONS):
+                        scan_ids.append(paths.add(dir_id, file))
+            package_cache = os.path.join(unity_path, PACKAGE_CACHE_FOLDER)
+            if os.path.isdir(package_cache):
+                meta_ids.extend(paths.add_path(p) for p in self.walk_files(package_cache, extensions={".meta"}))
+            self.profile.add(files=len(meta_ids) + len(scan_ids))
+
+        with self.profile.phase("index_metas"):
+            count_meta = 0
+            for meta_id in meta_ids:
+                guid = self.extract_guid(paths.path(meta_id))
+                if guid:
+                    valid_guids.add(guid_key(guid))
+                    count_meta += 1
+                self.profile.progress(count_meta)
+
+        self.guid_cache.save()
+        self.log(f"Indexed {len(valid_guids)} valid GUIDs from {count_meta} meta files.")
+        self.log(f"GUID cache: {self.guid_cache.hits} hits, {self.guid_cache.misses} re-read.")
+
+        # 2. Scan Scenes/Prefabs for Script references
+        missing_counts = {} # GUID -> Count
+        files_with_missing = {} # GUID -> array of PathTable entry ids
+
+        if self.reference_index:
+            # Only files referencing a GUID that no meta defines can have missing scripts
+            root_files = self.refresh_reference_index(unity_path)
+            unknown_guids = {guid for guid in self.reference_index.referenced_guids() if guid_key(guid) not in valid_guids}
+            found = self.reference_index.query(unknown_guids) if unknown_guids else {}
+            scan_ids = array('I', (paths.add_path(p) for p in root_files if p.endswith(MISSING_SCAN_EXTENSIONS) and os.path.abspath(p) in found))
+            self.log(f"Reference index: {len(scan_ids)} files reference unknown GUIDs.")
+
+        scanned_files = 0
+
+        with self.profile.phase("scan_references"):
+            for scan_id in scan_ids:
+                scanned_files += 1
+                file_path = paths.path(scan_id)
+                start = time.perf_counter()
+                try:
+                    matches = read_script_refs(file_path)
+                    self.profile.add_file(file_path, time.perf_counter() - start, os.path.getsize(file_path))
+                    self.profile.progress(scanned_files, len(scan_ids))
+                    for guid in matches:
+                        guid = guid_key(guid)
+                        if guid not in valid_guids:
+                            missing_counts[guid] = missing_counts.get(guid, 0) + 1
+                            if guid not in files_with_missing:
+                                files_with_missing[guid] = array('I')
+                            if len(files_with_missing[guid]) < 3: # Keep only first 3 examples
+                                files_with_missing[guid].append(scan_id)
+                except:
+                    pass
+
+        self.log(f"Scanned {scanned_files} files. Found {len(missing_counts)} unique missing script GUIDs.")
+
+        if not missing_counts:
+            self.log("No missing scripts found! (Or they are not referenced as Monobehaviours)")
+
+        # Sort by occurrence count (highest first)
+        sorted_missing = sorted(missing_counts.items(), key=lambda x: x[1], reverse=True)
+
+        return self.finish_profile({
+            "unity_path": unity_path,
+            "valid_guids": len(valid_guids),
+            "meta_files": count_meta,
+            "scanned_files": scanned_files,
+            "missing": [{"guid": guid_text(guid), "count": count, "example_files": [paths.name(i) for i in files_with_missing[guid]]}
+                        for guid, count in sorted_missing],
+        })
+
+    # ------------------------------------------------------------------
+    # 3b. Replace GUIDs directly (Old GUID -> New GUID), e.g. for missing scripts
+    # ------------------------------------------------------------------
+    def run_direct_guid_replacement(self, unity_path, guid_map):
+        self.log("Replacing GUIDs...")
+        self.start_profile("replace")
+
+        if self.reference_index:
+            file_paths = self.indexed_files_referencing(unity_path, guid_map, DIRECT_TARGET_EXTENSIONS)
+            self.log(f"Reference index: {len(file_paths)} files reference mapped GUIDs.")
+        else:
+            with self.profile.phase("walk"):
+                file_paths = self.walk_files(unity_path, extensions=DIRECT_TARGET_EXTENSIONS)
+                self.profile.add(files=len(file_paths))
+
+        updated_files = []
+        errors = []
+        total_replacements = 0
+        per_guid = {}
+
+        results = self.replace_files(file_paths, guid_map)
+        self.reindex_files(results)
+        for result in results:
+            file_path = result["path"]
+            file = os.path.basename(file_path)
+            if "error" in result:
+                errors.append({"path": file_path, "error": result["error"]})
+                self.error(f"Error processing {file}: {result['error']}")
+                continue
+            if result["replacements"]:
+                for old_g, count in result["guids"].items():
+                    self.debug(f"  > Found target GUID {old_g} in {file}")
+                    per_guid[old_g] = per_guid.get(old_g, 0) + count
+                total_replacements += result["replacements"]
+                updated_files.append({"path": file_path, "replacements": result["replacements"]})
+                self.log(f"FIXED: {file} (Replaced GUIDs)")
+
+        self.log(f"Done! Updated {len(updated_files)} files.")
+        return self.finish_profile({
+            "unity_path": unity_path,
+            "guid_map": guid_map,
+            "files_scanned": len(file_paths),
+            "updated_files": updated_files,
+            "replacements": total_replacements,
+            "replacements_per_guid": per_guid,
+            "file_kinds": kind_histogram(results),
+            "bytes_read": sum(result["bytes_read"] for result in results),
+            "errors": errors,
+        })
@@ -2,11 +2,19 @@ import os
 import sys
 import re
 import json
+import shutil
+import locale
+import tempfile
 import threading
 import subprocess
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 
+# Piped to ReplaceGUIDwithCorrectOne.exe: load 'mappings.json', don't delete the OLD folders, press Enter
+LEGACY_TOOL_ANSWERS = b"3\nn\n\n"
+# Result lines of the tool shown again when it is done
+LEGACY_TOOL_SUMMARY_KEYS = ("Total Pairs", "Total Unique GUID Replacements collected", "Files Modified", "Total Replacements")
+
 class GUIDFixerApp:
     def __init__(self, root):
         self.root = root
@@ -421,73 +429,74 @@ class GUIDFixerApp:
     def run_legacy_fix(self, unity_path, mappings):
         self.log("Starting Legacy Fix Process...")
         self.log(f"Using tool: {self.legacy_tool_path}")
-        
-        count = 0
-        total = len(mappings)
-        
-        for i, (old_dir, new_dir) in enumerate(mappings):
-            self.log(f"--- [{i+1}/{total}] Processing ---")
-            self.log(f"Old: {old_dir}")
-            self.log(f"New: {new_dir}")
-            
-            # Prepare inputs
-            # Tool expects:
-            # 1. Incorrect GUIDs Path (Old)
-            # 2. Correct GUIDs Path (New)
-            # 3. Unity Project Assets Path
-            
-            # Prepare paths with Windows separators
-            p_old = os.path.normpath(old_dir)
-            p_new = os.path.normpath(new_dir)
-            p_unity = os.path.normpath(unity_path)
-            
-            # Create a temporary batch file to drive the tool reliably with visible CMD
-            bat_path = os.path.join(os.getcwd(), "temp_fix_step.bat")
-            bat_content = f"""@echo off
-(
-echo {p_old}
-echo {p_new}
-echo {p_unity}
-) | "{self.legacy_tool_path}"
-if %errorlevel% neq 0 (
-    echo.
-    echo Tool exited with error code %errorlevel%
-    pause
-)
-"""
-            
+        self.log(f"Processing {len(mappings)} folder pairs in one run (one project pass)...")
+
+        # The tool loads every pair from 'mappings.json' in its working directory (menu choice 3),
+        # so it is written to a temporary folder and the tool is started there once.
+        # Paths use "/" separators: the tool's JSON reader does not unescape "\\".
+        work_dir = tempfile.mkdtemp(prefix="guidfixer_legacy_")
+        data = {
+            "unity_path": os.path.abspath(unity_path).replace("\\", "/"),
+            "mappings": [(os.path.abspath(old_dir).replace("\\", "/"), os.path.abspath(new_dir).replace("\\", "/")) for old_dir, new_dir in mappings]
+        }
+        summary = {}
+        try:
+            with open(os.path.join(work_dir, "mappings.json"), 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+
+            # Answers to the tool's prompts: mappings source (3 = mappings.json), delete the OLD folders (n),
+            # "Press Enter to exit". Its output is read through a pipe and shown here while it runs.
+            process = subprocess.Popen(
+                [self.legacy_tool_path],
+                cwd=work_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+            )
             try:
-                with open(bat_path, "w") as f:
-                    f.write(bat_content)
-
-                # Run the process in a new console window so user can see it
-                process = subprocess.Popen(
-                    [bat_path],
-                    creationflags=subprocess.CREATE_NEW_CONSOLE
-                )
-                
-                # Wait for batch file to finish
-                process.wait()
-                
-                if process.returncode != 0:
-                    self.log(f"Tool exited with code {process.returncode}")
-                else:
-                    self.log("Tool finished for this pair.")
-                    
-                count += 1
-                
-            except Exception as e:
-                self.log(f"Error running tool: {e}")
-            finally:
-                if os.path.exists(bat_path):
-                    try:
-                        os.remove(bat_path)
-                    except:
-                        pass
-                
+                process.stdin.write(LEGACY_TOOL_ANSWERS)
+                process.stdin.close()
+            except OSError:
+                pass # Tool exited early, its output says why
+
+            encoding = locale.getpreferredencoding(False)
+            pending = b""
+            while True:
+                chunk = process.stdout.read1(4096)
+                if not chunk:
+                    break
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    self.log_tool_line(line, encoding, summary)
+            if pending:
+                self.log_tool_line(pending, encoding, summary)
+            process.wait()
+
+            if process.returncode != 0:
+                self.log(f"Tool exited with code {process.returncode}")
+            else:
+                self.log("Tool finished.")
+        except Exception as e:
+            self.log(f"Error running tool: {e}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
         self.log("All tasks completed.")
         self.btn_run.config(state='normal')
-        messagebox.showinfo("Done", "Legacy Tool execution finished.")
+        details = "".join(f"\n{key}: {value}" for key, value in summary.items())
+        messagebox.showinfo("Done", f"Legacy Tool execution finished.{details}")
+
+    def log_tool_line(self, line, encoding, summary):
+        # Progress lines end in "\r" (overwritten in a console), only the last state is shown
+        text = line.decode(encoding, errors="replace").rstrip("\r").split("\r")[-1].rstrip()
+        if not text:
+            return
+        self.log(f"  {text}")
+        for key in LEGACY_TOOL_SUMMARY_KEYS:
+            if text.startswith(key + ":"):
+                summary[key] = text[len(key) + 1:].strip()
 
     def load_settings(self):
         if os.path.exists(self.settings_file):
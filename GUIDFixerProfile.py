@@ -0,0 +1,137 @@
+import json
+import time
+import heapq
+from contextlib import contextmanager
+
+# Run profile of one engine run (scan / fix / missing / replace):
+# per-phase wall and CPU time, files and bytes, cache hit rates and the slowest files.
+# GUIDFixerEngine attaches profile.to_dict() to every result as "profile".
+
+PROFILE_FILE = "guidfixer_profile.json"
+SLOWEST_FILES = 10
+PROGRESS_INTERVAL = 0.25 # Seconds between on_progress calls
+
+class RunProfile:
+    def __init__(self, run, on_progress=None):
+        # on_progress: optional callable(profile, done, total), called at most every PROGRESS_INTERVAL
+        self.run = run
+        self.on_progress = on_progress
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.phases = {} # name -> counters, in execution order
+        self.current = None
+        self.phase_start = None
+        self.cache = {} # name -> {hits, misses, hit_rate}
+        self.slowest = [] # min-heap of (seconds, path, bytes)
+        self.last_progress = 0.0
+
+    @contextmanager
+    def phase(self, name):
+        # Phases do not nest: everything is counted in the phase that is currently open
+        stats = self.phases.setdefault(name, {
+            "wall_seconds": 0.0, "cpu_seconds": 0.0, "file_cpu_seconds": 0.0,
+            "files": 0, "bytes_read": 0, "bytes_written": 0,
+        })
+        self.current = name
+        self.phase_start = time.perf_counter()
+        wall, cpu = self.phase_start, time.process_time()
+        try:
+            yield stats
+        finally:
+            stats["wall_seconds"] += time.perf_counter() - wall
+            stats["cpu_seconds"] += time.process_time() - cpu
+            self.current = None
+
+    def add(self, files=0, bytes_read=0, bytes_written=0):
+        stats = self.phases.get(self.current)
+        if stats is None:
+            return
+        stats["files"] += files
+        stats["bytes_read"] += bytes_read
+        stats["bytes_written"] += bytes_written
+
+    def add_file(self, path, seconds, bytes_read=0, bytes_written=0, cpu_seconds=0.0):
+        # One processed file; cpu_seconds is the CPU time spent on it (in a worker process when the pool is used)
+        self.add(1, bytes_read, bytes_written)
+        stats = self.phases.get(self.current)
+        if stats is not None:
+            stats["file_cpu_seconds"] += cpu_seconds
+        entry = (seconds, path, bytes_read)
+        if len(self.slowest) < SLOWEST_FILES:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def add_file_result(self, result):
+        # replace_guids_in_file result
+        self.add_file(result["path"], result.get("seconds", 0.0), result["bytes_read"],
+                      result.get("bytes_written", 0), result.get("cpu_seconds", 0.0))
+
+    def set_cache(self, name, hits, misses):
+        total = hits + misses
+        self.cache[name] = {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 4) if total else None}
+
+    def progress(self, done, total=None):
+        if not self.on_progress:
+            return
+        now = time.perf_counter()
+        if now - self.last_progress < PROGRESS_INTERVAL and done != total:
+            return
+        self.last_progress = now
+        self.on_progress(self, done, total)
+
+    def status_line(self, done, total=None):
+        # e.g. "replace: 1200/5000 files, 850 files/s, 96.3 MB read"
+        stats = self.phases.get(self.current)
+        if stats is None:
+            return f"{self.run}: {done} files"
+        elapsed = max(time.perf_counter() - self.phase_start, 1e-9)
+        count = f"{done}/{total}" if total else f"{done}"
+        return f"{self.current}: {count} files, {done / elapsed:.0f} files/s, {stats['bytes_read'] / (1024 * 1024):.1f} MB read"
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self.start_wall
+        self.cpu_seconds = time.process_time() - self.start_cpu
+
+    def summary(self):
+        # One log line: "replace 1.20s (850 files/s, 96.3 MB/s), ..."
+        parts = []
+        for name, stats in self.phases.items():
+            part = f"{name} {stats['wall_seconds']:.2f}s"
+            if stats["files"] and stats["wall_seconds"] > 0:
+                part += f" ({stats['files'] / stats['wall_seconds']:.0f} files/s"
+                if stats["bytes_read"]:
+                    part += f", {stats['bytes_read'] / (1024 * 1024) / stats['wall_seconds']:.1f} MB/s"
+                part += ")"
+            parts.append(part)
+        return f"Profile ({self.run}, {self.wall_seconds or 0:.2f}s): " + ", ".join(parts)
+
+    def to_dict(self):
+        phases = {}
+        for name, stats in self.phases.items():
+            wall = stats["wall_seconds"]
+            phases[name] = dict(stats,
+                                files_per_second=round(stats["files"] / wall, 1) if wall > 0 else None,
+                                mb_read_per_second=round(stats["bytes_read"] / (1024 * 1024) / wall, 2) if wall > 0 else None)
+            for key in ("wall_seconds", "cpu_seconds", "file_cpu_seconds"):
+                phases[name][key] = round(stats[key], 4)
+
+        return {
+            "run": self.run,
+            "started_at": self.started_at,
+            "wall_seconds": round(self.wall_seconds or 0.0, 4),
+            "cpu_seconds": round(self.cpu_seconds or 0.0, 4),
+            "phases": phases,
+            "bytes_read": sum(stats["bytes_read"] for stats in self.phases.values()),
+            "bytes_written": sum(stats["bytes_written"] for stats in self.phases.values()),
+            "cache": self.cache,
+            "slowest_files": [{"path": path, "seconds": round(seconds, 4), "bytes": size}
+                              for seconds, path, size in sorted(self.slowest, reverse=True)],
+        }
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=4)
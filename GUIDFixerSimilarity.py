@@ -0,0 +1,159 @@
+import os
+import random
+import hashlib
+
+# Content-based folder matching for the scan: two folders are similar when the script file names
+# below them overlap (Jaccard similarity of the name sets). Every folder gets a MinHash signature,
+# computed bottom-up from its own names and its subfolders' signatures, and LSH banding on the
+# signatures only pairs up folders that are likely to be similar; candidates are then scored exactly.
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16 # 16 bands x 4 rows: pairs above ~0.5 similarity share a band with high probability
+CONTENT_MIN_FILES = 2 # Folders with fewer script names are too unspecific to match by content
+CONTENT_MIN_SIMILARITY = 0.5
+CONTENT_CANDIDATES = 8 # LSH candidates per old folder that are scored exactly (best estimates first)
+MINHASH_PRIME = (1 << 61) - 1
+MINHASH_SEED = 0x6755 # Fixed, so the same trees always give the same candidates
+
+def content_name(file_name):
+    # Normalized script name of a file ("Foo.cs" and "Foo.cs.meta" -> "foo.cs"), None for other files
+    name = file_name.lower()
+    if name.endswith(".meta"):
+        name = name[:-5]
+    return name if name.endswith(".cs") else None
+
+def folder_content_names(folder, walked=None):
+    # Script names below folder (one walk), for scoring single mappings
+    # walked: optional [(dir_path, dirs, files)] of folder (e.g. from a project snapshot) instead of os.walk
+    names = set()
+    for _, _, files in (os.walk(folder) if walked is None else walked):
+        for file in files:
+            name = content_name(file)
+            if name:
+                names.add(name)
+    return names
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class MinHasher:
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, seed=MINHASH_SEED):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, MINHASH_PRIME), rng.randrange(0, MINHASH_PRIME)) for _ in range(permutations)]
+        self.empty = (MINHASH_PRIME,) * permutations
+        self.cache = {} # name -> hashes, names repeat a lot between the two trees
+
+    def hashes(self, name):
+        hashed = self.cache.get(name)
+        if hashed is None:
+            x = int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little')
+            hashed = tuple((a * x + b) % MINHASH_PRIME for a, b in self.params)
+            self.cache[name] = hashed
+        return hashed
+
+    def combine(self, signatures):
+        # Signature of the union of the sets behind signatures
+        result = self.empty
+        for signature in signatures:
+            result = tuple(map(min, result, signature))
+        return result
+
+    @staticmethod
+    def estimate(a, b):
+        return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+class FolderContent:
+    # Script names and MinHash signature of every folder of a tree (one os.walk)
+    def __init__(self, hasher, root, is_ignored=None, walked=None):
+        # is_ignored: optional callable(name, rel_path) for folders to skip with everything below them
+        # walked: optional top-down [(dir_path, dirs, files)] of root, already pruned, instead of os.walk
+        self.hasher = hasher
+        self.root = root
+        self.names = {} # folder -> its own script names
+        self.children = {} # folder -> subfolders
+        self.depths = {} # folder -> depth below root (0 = direct subfolder)
+        self.signatures = {} # folder -> signature of all names below it
+        self.sizes = {} # folder -> number of script files below it (a name repeated in subfolders counts again)
+        self.name_sets = {} # folder -> names below it, filled on demand
+
+        order = []
+        for dir_path, dirs, files in (os.walk(root) if walked is None else walked):
+            rel_dir = os.path.relpath(dir_path, root).replace(os.sep, "/")
+            rel_dir = "" if rel_dir == "." else rel_dir + "/"
+            if walked is None:
+                dirs[:] = [d for d in dirs if not d.startswith(".") and not (is_ignored and is_ignored(d, rel_dir + d))]
+            self.names[dir_path] = {name for name in map(content_name, files) if name}
+            self.children[dir_path] = [os.path.join(dir_path, d) for d in dirs]
+            self.depths[dir_path] = rel_dir.count("/") - 1
+            order.append(dir_path)
+
+        # Children are walked after their parents, so reversed order is bottom-up
+        for dir_path in reversed(order):
+            own = [hasher.hashes(name) for name in self.names[dir_path]]
+            below = [self.signatures[child] for child in self.children[dir_path]]
+            self.signatures[dir_path] = hasher.combine(own + below)
+            self.sizes[dir_path] = len(self.names[dir_path]) + sum(self.sizes[child] for child in self.children[dir_path])
+
+    def names_below(self, folder):
+        names = self.name_sets.get(folder)
+        if names is None:
+            names = set(self.names[folder])
+            for child in self.children[folder]:
+                names |= self.names_below(child)
+            self.name_sets[folder] = names
+        return names
+
+    def folders(self, max_depth=None, min_files=CONTENT_MIN_FILES):
+        # Folders below root (root itself excluded) worth matching by content
+        return [folder for folder, depth in self.depths.items()
+                if depth >= 0 and (max_depth is None or depth <= max_depth) and self.sizes[folder] >= min_files]
+
+class LSHIndex:
+    # Banded MinHash index: folders whose signatures agree on all rows of any band are candidates
+    def __init__(self, bands=LSH_BANDS):
+        self.bands = bands
+        self.buckets = {}
+
+    def band_keys(self, signature):
+        rows = len(signature) // self.bands
+        return [(band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def add(self, key, signature):
+        for band_key in self.band_keys(signature):
+            self.buckets.setdefault(band_key, []).append(key)
+
+    def candidates(self, signature):
+        found = set()
+        for band_key in self.band_keys(signature):
+            found.update(self.buckets.get(band_key, ()))
+        return found
+
+def match_folders_by_content(source_content, old_content, source_depth=None, min_similarity=CONTENT_MIN_SIMILARITY):
+    # Best source folder per old folder: [(old_folder, source_folder, similarity)], similarity >= min_similarity.
+    # Source folders are taken down to source_depth (same meaning as the scan's source index depth).
+    index = LSHIndex()
+    for folder in source_content.folders(source_depth):
+        index.add(folder, source_content.signatures[folder])
+
+    matches = []
+    for old_folder in old_content.folders():
+        signature = old_content.signatures[old_folder]
+        candidates = index.candidates(signature)
+        if not candidates:
+            continue
+
+        old_names = old_content.names_below(old_folder)
+        best = None
+        # Exact similarity for the most promising candidates only
+        ranked = sorted(candidates, key=lambda c: (-MinHasher.estimate(signature, source_content.signatures[c]), c))
+        for candidate in ranked[:CONTENT_CANDIDATES]:
+            score = jaccard(old_names, source_content.names_below(candidate))
+            # Ties go to the deeper (tighter) folder, then to the better estimate
+            key = (score, source_content.depths[candidate])
+            if score >= min_similarity and (best is None or key > best[0]):
+                best = (key, candidate)
+        if best:
+            matches.append((old_folder, best[1], round(best[0][0], 4)))
+    return matches
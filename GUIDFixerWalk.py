@@ -0,0 +1,263 @@
+import os
+import re
+import time
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Shared project walker: lists a tree with os.scandir (the entry types come with the listing, so no
+# extra stat per entry), prunes folders with a compiled rule set before descending into them and
+# lists folders concurrently on a thread pool, which hides the per-folder latency of network drives.
+# ProjectSnapshot keeps the listings of a session, so later walks of the same trees only stat folders.
+
+# Folders Unity (or the IDE) regenerates next to Assets/; pruned when directly below the walked root
+# and the root is a project root (has an Assets folder), so e.g. an Old scripts folder named "Temp" is kept
+UNITY_ROOT_FOLDERS = {"library", "temp", "logs", "obj", "usersettings", "memorycaptures"}
+
+# Folders listed at the same time (threads; listing is I/O bound)
+WALK_WORKERS = 8
+# Folders a thread lists depth first before handing the rest of its subtree back to the pool
+# (one task per folder costs more than listing a folder on a local disk)
+WALK_BATCH_FOLDERS = 32
+
+# Snapshot file classes, by extension (everything else is "other")
+SNAPSHOT_CLASSES = ("meta", "yaml", "script", "other")
+UNITY_YAML_EXTENSIONS = {
+    '.unity', '.prefab', '.asset', '.mat', '.controller', '.overridecontroller', '.anim', '.mask',
+    '.physicmaterial', '.physicsmaterial2d', '.playable', '.signal', '.mixer', '.spriteatlas',
+    '.lighting', '.terrainlayer', '.rendertexture', '.cubemap', '.flare', '.guiskin', '.fontsettings', '.brush'
+}
+SCRIPT_EXTENSIONS = {'.cs', '.js', '.boo'}
+
+# A folder whose mtime is this close to the time it was listed is listed again on the next walk:
+# a change in the same timestamp tick (coarse on FAT / network drives) would not change its mtime
+SNAPSHOT_RACY_NS = 2 * 1000 * 1000 * 1000
+
+def compile_ignore_globs(ignore_globs):
+    # Folder ignore rules: fnmatch globs matched (case-insensitive) against the folder name
+    # and against its "/" separated path relative to the walked root. Returns callable(name, rel_path).
+    patterns = [re.compile(fnmatch.translate(glob.lower().strip("/"))) for glob in ignore_globs or () if glob.strip("/")]
+    if not patterns:
+        return lambda name, rel_path: False
+
+    def is_ignored(name, rel_path):
+        name, rel_path = name.lower(), rel_path.lower()
+        return any(p.match(name) or p.match(rel_path) for p in patterns)
+    return is_ignored
+
+def path_key(path):
+    # Normalized absolute path, lowercase (Unity projects are compared case-insensitively)
+    return os.path.abspath(path).lower()
+
+class WalkRules:
+    # Which folders a project walk skips, with everything below them:
+    #   unity_defaults  UNITY_ROOT_FOLDERS directly below root, hidden folders (.git, .vs, .idea, ...) anywhere
+    #   ignore_globs    see compile_ignore_globs (paths relative to root)
+    #   exclude_paths   folders given by path, e.g. the Old scripts folder
+    def __init__(self, root, ignore_globs=(), exclude_paths=(), unity_defaults=True):
+        self.root_key = path_key(root)
+        self.unity_defaults = unity_defaults
+        self.project_root = unity_defaults and os.path.isdir(os.path.join(root, "Assets"))
+        self.is_ignored = compile_ignore_globs(ignore_globs)
+        self.excluded = {path_key(p) for p in exclude_paths if p}
+
+    def prunes(self, parent_key, name, rel_path):
+        # parent_key: path_key of the folder holding name, rel_path: "/" separated path of the folder below root
+        lower = name.lower()
+        if self.unity_defaults:
+            if lower.startswith("."): # Unity never imports hidden folders
+                return True
+            if self.project_root and lower in UNITY_ROOT_FOLDERS and parent_key == self.root_key:
+                return True
+        if self.excluded and os.path.join(parent_key, lower) in self.excluded:
+            return True
+        return self.is_ignored(name, rel_path)
+
+    def rel_dir(self, key):
+        # "/" separated path of a folder below root plus a trailing "/" ("" for root and folders outside it)
+        if not key.startswith(os.path.join(self.root_key, "")):
+            return ""
+        return key[len(self.root_key) + 1:].replace(os.sep, "/") + "/"
+
+    def prunes_path(self, path):
+        # Whether a whole walk starting at path is pruned (path inside an excluded / junk folder)
+        key = path_key(path)
+        if any(key == ex or key.startswith(os.path.join(ex, "")) for ex in self.excluded):
+            return True
+        parent, rel_path = self.root_key, ""
+        for part in self.rel_dir(key).split("/")[:-1]:
+            rel_path += part
+            if self.prunes(parent, part, rel_path):
+                return True
+            parent = os.path.join(parent, part)
+            rel_path += "/"
+        return False
+
+def file_class(name):
+    # Snapshot class of a file name, see SNAPSHOT_CLASSES
+    name = name.lower()
+    if name.endswith(".meta"):
+        return "meta"
+    ext = os.path.splitext(name)[1]
+    if ext in UNITY_YAML_EXTENSIONS:
+        return "yaml"
+    return "script" if ext in SCRIPT_EXTENSIONS else "other"
+
+def list_folder(dir_path, with_stats=False):
+    # ([(subfolder name, path)], files) of one folder in listing order; files are names, or
+    # (name, size, mtime_ns) with_stats. Like os.walk, symlinked folders are not descended into
+    # and folders that cannot be listed (vanished, no access) count as empty.
+    dirs, files = [], []
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    if with_stats:
+                        # Comes with the listing on Windows, one stat elsewhere
+                        try:
+                            st = entry.stat()
+                            files.append((entry.name, st.st_size, st.st_mtime_ns))
+                        except OSError:
+                            files.append((entry.name, 0, 0))
+                    else:
+                        files.append(entry.name)
+                elif not entry.is_symlink():
+                    dirs.append((entry.name, entry.path))
+    except OSError:
+        pass
+    return dirs, files
+
+def walk_project(root, rules=None, workers=WALK_WORKERS, read_folder=list_folder):
+    # [(dir_path, dirs, files)] of every folder below root that rules do not prune, in the same
+    # (top-down) order as os.walk, so results do not depend on which listing finished first.
+    # read_folder: callable(dir_path) -> ([(name, path)], file names), see list_folder / ProjectSnapshot
+    if rules and rules.prunes_path(root):
+        return []
+    root_key = path_key(root)
+    root_rel = rules.rel_dir(root_key) if rules else ""
+    listings = {}
+
+    def visit(dir_path, key, rel_dir, listing):
+        dirs, files = listing
+        if rules:
+            dirs = [d for d in dirs if not rules.prunes(key, d[0], rel_dir + d[0])]
+        listings[dir_path] = (dirs, files)
+        prefix = os.path.join(key, "")
+        return [(path, prefix + name.lower(), rel_dir + name + "/") for name, path in dirs]
+
+    def list_batch(stack, limit=None):
+        # Lists folders of stack depth first, returns the ones left over
+        listed = 0
+        while stack and (limit is None or listed < limit):
+            folder = stack.pop()
+            stack.extend(visit(*folder, read_folder(folder[0])))
+            listed += 1
+        return stack
+
+    if workers and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(list_batch, [(root, root_key, root_rel)], WALK_BATCH_FOLDERS)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for folder in future.result():
+                        pending.add(pool.submit(list_batch, [folder], WALK_BATCH_FOLDERS))
+    else:
+        list_batch([(root, root_key, root_rel)])
+
+    walked = []
+    stack = [root]
+    while stack:
+        dir_path = stack.pop()
+        dirs, files = listings[dir_path]
+        walked.append((dir_path, [name for name, _ in dirs], files))
+        stack.extend(path for _, path in reversed(dirs))
+    return walked
+
+class SnapshotFolder:
+    __slots__ = ("mtime_ns", "dirs", "files")
+
+    def __init__(self, mtime_ns, dirs, files):
+        self.mtime_ns = mtime_ns # None: list again on the next walk (see SNAPSHOT_RACY_NS)
+        self.dirs = dirs # subfolder names
+        self.files = files # name -> (size, mtime_ns, class), in listing order
+
+class ProjectSnapshot:
+    # Listings of every folder walked in a session (scan, fix, missing scan...), shared by all phases.
+    # A walk stats each folder it visits and only lists those whose mtime changed since, so files added,
+    # removed or renamed in between are picked up while unchanged trees cost one stat per folder.
+    # File sizes / mtimes are those of the last listing of their folder: fine for scheduling and statistics,
+    # content checks (GUID cache, reference index, plans) keep stat-ing the files themselves.
+    def __init__(self, workers=WALK_WORKERS, catalog=None):
+        # catalog: optional PackageCatalog (GUIDFixerEngine), folders of catalogued package versions come from it
+        self.workers = workers
+        self.catalog = catalog
+        self.folders = {} # normcase abspath -> SnapshotFolder
+        self.lock = threading.Lock()
+        self.reused = 0 # Folders served from the snapshot / listed, over the session
+        self.listed = 0
+
+    @staticmethod
+    def key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def read_folder(self, dir_path):
+        if self.catalog:
+            listing = self.catalog.listing(dir_path)
+            if listing is not None:
+                with self.lock:
+                    self.reused += 1
+                return listing[0], [name for name, _, _ in listing[1]]
+        key = self.key(dir_path)
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            self.folders.pop(key, None)
+            return [], []
+
+        folder = self.folders.get(key)
+        if folder and folder.mtime_ns == mtime_ns:
+            with self.lock:
+                self.reused += 1
+            return [(name, os.path.join(dir_path, name)) for name in folder.dirs], list(folder.files)
+
+        listed_at = time.time_ns()
+        dirs, files = list_folder(dir_path, with_stats=True)
+        if listed_at - mtime_ns < SNAPSHOT_RACY_NS:
+            mtime_ns = None
+        if folder:
+            # Records of subfolders that are gone would never be read again
+            for name in set(folder.dirs).difference(name for name, _ in dirs):
+                self.folders.pop(os.path.join(key, os.path.normcase(name)), None)
+        self.folders[key] = SnapshotFolder(mtime_ns, [name for name, _ in dirs], {name: (size, mtime, file_class(name)) for name, size, mtime in files})
+        with self.lock:
+            self.listed += 1
+        return dirs, [name for name, _, _ in files]
+
+    def walk(self, root, rules=None):
+        # Same result as walk_project(root, rules), from the snapshot (folders changed since are listed again)
+        return walk_project(root, rules, self.workers, self.read_folder)
+
+    def stat(self, path):
+        # (size, mtime_ns, class) of a file as of the last listing of its folder, None if not in the snapshot
+        folder = self.folders.get(self.key(os.path.dirname(path) or "."))
+        return folder.files.get(os.path.basename(path)) if folder else None
+
+    def summary(self, walked):
+        # {class: [files, bytes]} of the files of a walk (see SNAPSHOT_CLASSES)
+        summary = {cls: [0, 0] for cls in SNAPSHOT_CLASSES}
+        for dir_path, _, files in walked:
+            folder = self.folders.get(self.key(dir_path))
+            for name in files:
+                size, _, cls = folder.files[name] if folder and name in folder.files else (0, 0, file_class(name))
+                counts = summary[cls]
+                counts[0] += 1
+                counts[1] += size
+        return summary
+
+    def clear(self):
+        self.folders.clear()
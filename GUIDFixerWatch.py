@@ -0,0 +1,339 @@
+import os
+import sys
+import json
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from GUIDFixerEngine import MISSING_SCAN_EXTENSIONS, PACKAGE_CACHE_FOLDER, WARNING, read_script_refs
+from GUIDFixerWalk import walk_project, WALK_WORKERS
+
+# Long-lived "missing scripts" watch.
+# The first pass reads every .meta / .unity / .prefab / .asset once, after that only the files
+# reported by filesystem events (inotify on Linux, mtime snapshots elsewhere) are re-read and the
+# valid GUID set / missing reference counts are updated in place.
+
+WATCH_EXTENSIONS = ('.meta',) + MISSING_SCAN_EXTENSIONS
+DEBOUNCE_SECONDS = 0.25 # Unity / VCS write files in bursts, collect them into one update
+MAX_EXAMPLE_FILES = 3 # Same as run_missing_scan
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+INOTIFY_EVENT = struct.Struct("iIII") # wd, mask, cookie, len (+ name)
+
+class MissingScriptState:
+    def __init__(self, engine, unity_path):
+        self.engine = engine
+        self.unity_path = unity_path
+        self.rules = engine.walk_rules(unity_path) # Same pruning as run_missing_scan
+        self.meta_guids = {} # .meta path -> GUID
+        self.guid_metas = {} # GUID -> number of metas defining it (duplicates happen after copy/paste)
+        self.file_refs = {} # scene/prefab/asset path -> {GUID: count}
+        self.ref_files = {} # GUID -> {path: count}
+        self._report = None
+
+    def load(self):
+        self.meta_guids.clear()
+        self.guid_metas.clear()
+        self.file_refs.clear()
+        self.ref_files.clear()
+        self._report = None
+        self.scan_tree(self.unity_path)
+        # Package metas are read once (Library/ is not watched), like in run_missing_scan
+        package_cache = os.path.join(self.unity_path, PACKAGE_CACHE_FOLDER)
+        if os.path.isdir(package_cache):
+            for root, _, files in walk_project(package_cache, workers=self.engine.walk_workers):
+                for file in files:
+                    if file.endswith(".meta"):
+                        self.update_file(os.path.join(root, file))
+
+    def scan_tree(self, dir_path):
+        for root, _, files in walk_project(dir_path, self.rules, self.engine.walk_workers):
+            for file in files:
+                if file.endswith(WATCH_EXTENSIONS):
+                    self.update_file(os.path.join(root, file))
+
+    def update_file(self, path):
+        # Re-read one file; a file that no longer exists is just dropped
+        self.remove_file(path)
+        if not os.path.isfile(path):
+            return
+
+        if path.endswith(".meta"):
+            guid = self.engine.extract_guid(path)
+            if guid:
+                self.meta_guids[path] = guid
+                self.guid_metas[guid] = self.guid_metas.get(guid, 0) + 1
+            return
+
+        try:
+            matches = read_script_refs(path)
+        except OSError:
+            return
+        counts = {}
+        for guid in matches:
+            counts[guid] = counts.get(guid, 0) + 1
+        if counts:
+            self.file_refs[path] = counts
+            for guid, count in counts.items():
+                self.ref_files.setdefault(guid, {})[path] = count
+
+    def remove_file(self, path):
+        self._report = None
+        guid = self.meta_guids.pop(path, None)
+        if guid:
+            left = self.guid_metas[guid] - 1
+            if left:
+                self.guid_metas[guid] = left
+            else:
+                del self.guid_metas[guid]
+
+        for guid in self.file_refs.pop(path, ()):
+            files = self.ref_files[guid]
+            del files[path]
+            if not files:
+                del self.ref_files[guid]
+
+    def refresh_tree(self, dir_path):
+        # Folder created / deleted / moved: drop everything below it and walk it again if it still exists
+        if dir_path == self.unity_path:
+            self.load()
+            return
+        prefix = os.path.join(dir_path, "")
+        for path in [p for p in self.meta_guids if p.startswith(prefix)] + [p for p in self.file_refs if p.startswith(prefix)]:
+            self.remove_file(path)
+        if os.path.isdir(dir_path):
+            self.scan_tree(dir_path)
+
+    def apply(self, paths, dirs):
+        for dir_path in sorted(dirs, key=len):
+            self.refresh_tree(dir_path)
+        for path in paths:
+            if not any(path.startswith(os.path.join(d, "")) for d in dirs): # Already re-read with its folder
+                self.update_file(path)
+
+    def missing(self):
+        # Derived from the per-file state, only touches the distinct script GUIDs
+        missing = []
+        for guid, files in self.ref_files.items():
+            if guid in self.guid_metas:
+                continue
+            examples = [os.path.basename(p) for p in sorted(files)[:MAX_EXAMPLE_FILES]]
+            missing.append({"guid": guid, "count": sum(files.values()), "example_files": examples})
+        missing.sort(key=lambda m: (-m["count"], m["guid"]))
+        return missing
+
+    def report(self):
+        if self._report is None:
+            self._report = {
+                "unity_path": self.unity_path,
+                "valid_guids": len(self.guid_metas),
+                "meta_files": len(self.meta_guids),
+                "scanned_files": len(self.file_refs),
+                "missing": self.missing(),
+            }
+        return self._report
+
+class PollingWatcher:
+    # Fallback: re-stat the tree every interval and diff (size, mtime_ns) against the last snapshot
+    mode = "polling"
+
+    def __init__(self, root, interval=2.0, rules=None, workers=WALK_WORKERS):
+        self.root = root
+        self.interval = interval
+        self.rules = rules
+        self.workers = workers
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        snapshot = {}
+        for root, _, files in walk_project(self.root, self.rules, self.workers):
+            for file in files:
+                if file.endswith(WATCH_EXTENSIONS):
+                    path = os.path.join(root, file)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self, stop_event=None):
+        if stop_event:
+            stop_event.wait(self.interval)
+        else:
+            time.sleep(self.interval)
+
+        snapshot = self.take_snapshot()
+        changed = {p for p, sig in snapshot.items() if self.snapshot.get(p) != sig}
+        changed.update(p for p in self.snapshot if p not in snapshot)
+        self.snapshot = snapshot
+        return changed, set()
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    # One watch per folder; new folders get their watch when their IN_CREATE arrives
+    mode = "inotify"
+
+    def __init__(self, root, timeout=1.0, rules=None, workers=WALK_WORKERS):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify not supported")
+
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.root = root
+        self.timeout = timeout
+        self.rules = rules # Pruned folders (Library/, .git, ...) get no watch
+        self.workers = workers
+        self.wds = {} # watch descriptor -> folder path
+        try:
+            self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, dir_path):
+        for root, _, _ in walk_project(dir_path, self.rules, self.workers):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), INOTIFY_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue # Folder vanished in the meantime
+            self.wds[wd] = root
+
+    def drop_tree(self, dir_path):
+        # Folder moved away: its watches would keep reporting the old path
+        prefix = os.path.join(dir_path, "")
+        for wd, path in list(self.wds.items()):
+            if path == dir_path or path.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.wds[wd]
+
+    def wait(self, stop_event=None):
+        paths, dirs = set(), set()
+        ready, _, _ = select.select([self.fd], [], [], self.timeout)
+        if not ready:
+            return paths, dirs
+
+        time.sleep(DEBOUNCE_SECONDS)
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            self.parse(data, paths, dirs)
+        return paths, dirs
+
+    def parse(self, data, paths, dirs):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+            offset += INOTIFY_EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, only a full rescan is safe
+                dirs.add(self.root)
+                continue
+            if mask & IN_IGNORED:
+                self.wds.pop(wd, None)
+                continue
+            dir_path = self.wds.get(wd)
+            if dir_path is None or not name:
+                continue
+
+            path = os.path.join(dir_path, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & IN_MOVED_FROM:
+                    self.drop_tree(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+                dirs.add(path)
+            elif path.endswith(WATCH_EXTENSIONS):
+                paths.add(path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+def create_watcher(root, interval=2.0, polling=False, log=None, rules=None, workers=WALK_WORKERS):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, rules=rules, workers=workers)
+        except OSError as e:
+            if log:
+                log(f"inotify unavailable ({e}), falling back to polling.", WARNING)
+    return PollingWatcher(root, interval, rules, workers)
+
+def write_report(report, path):
+    # Write next to the target and rename so readers never see a half-written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    os.replace(tmp_path, path)
+
+def watch_missing_scripts(engine, unity_path, on_report=None, interval=2.0, polling=False, stop_event=None):
+    # Runs until stop_event is set (or KeyboardInterrupt), calls on_report(report) after every change
+    log = engine.log
+    # Start watching before the first pass so changes made during it are not lost
+    watcher = create_watcher(unity_path, interval, polling, log, engine.walk_rules(unity_path), engine.walk_workers)
+    state = MissingScriptState(engine, unity_path)
+    try:
+        start = time.perf_counter()
+        state.load()
+        engine.guid_cache.save()
+        report = state.report()
+        log(f"Watching {unity_path} ({watcher.mode}): {report['valid_guids']} valid GUIDs, "
+            f"{report['scanned_files']} files with script references, {len(report['missing'])} missing "
+            f"({time.perf_counter() - start:.2f}s).")
+        if on_report:
+            on_report(report)
+
+        missing = {m["guid"] for m in report["missing"]}
+        while not (stop_event and stop_event.is_set()):
+            paths, dirs = watcher.wait(stop_event)
+            if not paths and not dirs:
+                continue
+
+            start = time.perf_counter()
+            state.apply(paths, dirs)
+            engine.guid_cache.save()
+            report = state.report()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            log(f"Updated {len(paths)} files, {len(dirs)} folders in {elapsed_ms:.1f} ms: {len(report['missing'])} missing script GUIDs.")
+
+            now_missing = {m["guid"] for m in report["missing"]}
+            for guid in sorted(now_missing - missing):
+                log(f"  New missing script: {guid}")
+            for guid in sorted(missing - now_missing):
+                log(f"  Resolved: {guid}")
+            missing = now_missing
+
+            if on_report:
+                on_report(report)
+    finally:
+        watcher.close()
+    return state.report()
@@ -0,0 +1,98 @@
+import re
+
+# Reference extractor for Unity text serialization (Force Text .unity / .prefab / .asset / .mat ...).
+# A file is a list of YAML documents, each starting with "--- !u!<classID> &<fileID>", and every
+# reference to another asset is written inline as "{fileID: <id>, guid: <32 hex>, type: <n>}".
+# One pass over the raw bytes (bytes or mmap) finds every such reference together with its document,
+# class ID, field name and byte offset; no YAML parser and no decoding of the whole file are needed.
+
+# "--- !u!114 &11400000" (the document may be marked " stripped" after the fileID).
+# Patterns start with a literal so the regex engine can skip ahead with a fast search; anchors or
+# lookbehinds in front make it try every position and are an order of magnitude slower.
+DOC_HEADER_PATTERN = re.compile(rb"\n--- !u!(\d+) &(-?\d+)")
+FIRST_DOC_HEADER_PATTERN = re.compile(rb"--- !u!(\d+) &(-?\d+)")
+
+# {fileID: 11500000, guid: 0123456789abcdef0123456789abcdef, type: 3}
+REFERENCE_PATTERN = re.compile(rb"\{fileID: (-?\d+), guid: ([0-9a-fA-F]{32}), type: (\d+)\}")
+
+# The mapping key a reference is the value of ("  m_Script: {...}", "  - target: {...}")
+FIELD_PATTERN = re.compile(rb"([\w.\[\]]+):[ \t]*$")
+
+# References of one field, found directly by the regex engine (see iter_references)
+_field_patterns = {}
+
+def field_reference_pattern(field):
+    pattern = _field_patterns.get(field)
+    if pattern is None:
+        pattern = re.compile(re.escape(field.encode('ascii')) + rb":[ \t]*" + REFERENCE_PATTERN.pattern)
+        _field_patterns[field] = pattern
+    return pattern
+
+# fileID of a MonoScript in m_Script references
+SCRIPT_FILE_ID = 11500000
+
+def iter_references(data, field=None):
+    # Yields (doc_file_id, class_id, field, file_id, guid, ref_type, offset) for every reference in data, in file order.
+    #   doc_file_id / class_id  of the document holding the reference (None before the first document header)
+    #   field                   mapping key the reference belongs to; for list items ("- {fileID: ...}") the key of the list
+    #   guid                    32 bytes as written (bytes), offset is where they start in data
+    # field: optional key (str); only references written as "<field>: {...}" are yielded (not list items),
+    # they are searched for directly so other references cost nothing
+    headers = [(m.start(), int(m.group(1)), int(m.group(2))) for m in DOC_HEADER_PATTERN.finditer(data)]
+    first = FIRST_DOC_HEADER_PATTERN.match(data)
+    if first:
+        headers.insert(0, (0, int(first.group(1)), int(first.group(2))))
+    next_header = 0
+    doc_file_id = class_id = None
+    last_item = None # (line start, key) of the last list item, consecutive items share their key
+
+    if field:
+        for match in field_reference_pattern(field).finditer(data):
+            start = match.start()
+            if start and (data[start - 1:start].isalnum() or data[start - 1:start] in (b"_", b".", b"]")):
+                continue # Only the end of a longer key
+            while next_header < len(headers) and headers[next_header][0] < start:
+                _, class_id, doc_file_id = headers[next_header]
+                next_header += 1
+            yield (doc_file_id, class_id, field, int(match.group(1)), match.group(2), int(match.group(3)), match.start(2))
+        return
+
+    for match in REFERENCE_PATTERN.finditer(data):
+        start = match.start()
+        while next_header < len(headers) and headers[next_header][0] < start:
+            _, class_id, doc_file_id = headers[next_header]
+            next_header += 1
+
+        line_start = data.rfind(b"\n", 0, start) + 1
+        prefix = data[line_start:start]
+        key_match = FIELD_PATTERN.search(prefix)
+        if key_match:
+            key = key_match.group(1).decode('ascii')
+        elif prefix.strip() == b"-":
+            key = list_key(data, line_start, last_item)
+            last_item = (line_start, key)
+        else:
+            key = None
+
+        yield (doc_file_id, class_id, key, int(match.group(1)), match.group(2), int(match.group(3)), match.start(2))
+
+def list_key(data, line_start, last_item=None):
+    # Key of the list the item starting at line_start belongs to: the nearest line above that is not an item
+    pos = line_start
+    while pos > 0:
+        prev_start = data.rfind(b"\n", 0, pos - 1) + 1
+        if last_item and last_item[0] == prev_start:
+            return last_item[1]
+        line = data[prev_start:pos - 1].strip()
+        if not line.startswith(b"-"):
+            key_match = FIELD_PATTERN.search(line)
+            return key_match.group(1).decode('ascii') if key_match else None
+        pos = prev_start
+    return None
+
+def read_references(file_path, field=None):
+    # iter_references of a whole file, as dicts (guid decoded)
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return [{"doc": doc, "class": class_id, "field": key, "fileID": file_id, "guid": guid.decode('ascii'), "type": ref_type, "offset": offset}
+            for doc, class_id, key, file_id, guid, ref_type, offset in iter_references(data, field)]
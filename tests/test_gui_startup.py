@@ -0,0 +1,54 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import GUIDFixer
+from GUIDFixerEngine import GUID_CACHE_FILE, WARNING
+
+# The GUI must start with a broken GUID cache in the working directory (the engine logs a warning
+# while it is built, before the log area exists). Uses a real Tk root when a display is available,
+# otherwise tkinter is replaced by mocks (only the startup order is under test then).
+
+class GUIStartupTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work_dir = tempfile.mkdtemp()
+        os.chdir(self.work_dir)
+        with open(GUID_CACHE_FILE, 'wb') as f:
+            f.write(b"this is not a sqlite database" * 100)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def start_app(self):
+        try:
+            root = GUIDFixer.tk.Tk()
+        except GUIDFixer.tk.TclError:
+            root = None
+        if root is not None:
+            root.withdraw()
+            self.addCleanup(root.destroy)
+            app = GUIDFixer.GUIDFixerApp(root)
+            root.update()
+            return app
+
+        patches = [mock.patch.object(GUIDFixer, name, mock.MagicMock()) for name in ("tk", "ttk", "scrolledtext", "filedialog", "messagebox")]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        return GUIDFixer.GUIDFixerApp(mock.MagicMock())
+
+    def test_broken_cache_file(self):
+        app = self.start_app()
+        warnings = [message for level, message in app.log_pump.history if level == WARNING]
+        self.assertTrue(any(message.startswith("GUID cache unavailable") for message in warnings), warnings)
+        self.assertIsNone(app.startup_logs)
+
+if __name__ == "__main__":
+    unittest.main()
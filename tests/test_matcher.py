@@ -0,0 +1,111 @@
+import os
+import sys
+import random
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import GUIDFixerEngine
+from GUIDFixerEngine import GUIDMatcher, GUID_TOKEN_PATTERN, DIRECT_FIND_MAX_GUIDS
+
+# GUIDMatcher against the original replacement: re.subn of every 32-hex token with a dict lookup
+
+HEX = "0123456789abcdef"
+
+def random_guid(rng):
+    return "".join(rng.choice(HEX) for _ in range(32))
+
+def reference_replace(data, guid_map):
+    # The original tool's semantics (decode + GUID_PATTERN.subn), on bytes
+    encoded = {old_g.encode('ascii'): new_g.encode('ascii') for old_g, new_g in guid_map.items()}
+    replaced = [0]
+
+    def substitute(match):
+        new_g = encoded.get(match.group())
+        if new_g is None:
+            return match.group()
+        replaced[0] += 1
+        return new_g
+    return GUID_TOKEN_PATTERN.sub(substitute, data), replaced[0]
+
+def random_data(rng, keys, pieces):
+    # Mapped GUIDs mixed with hex noise (so GUIDs sit inside, before and after longer hex runs),
+    # uppercase hex, separators and newlines
+    parts = []
+    for _ in range(pieces):
+        roll = rng.random()
+        if roll < 0.3:
+            parts.append(rng.choice(keys))
+        elif roll < 0.5:
+            parts.append("".join(rng.choice(HEX) for _ in range(rng.randint(1, 40))))
+        elif roll < 0.55:
+            parts.append(rng.choice(keys).upper())
+        elif roll < 0.75:
+            parts.append(rng.choice(["\n", " ", ": ", ", ", "{fileID: 11500000, guid: ", ", type: 3}\n", "g", "-"]))
+        else:
+            parts.append("".join(rng.choice("xyz_ \n") for _ in range(rng.randint(1, 20))))
+    return "".join(parts).encode('ascii')
+
+class GUIDMatcherTest(unittest.TestCase):
+    def check(self, data, guid_map):
+        expected, count = reference_replace(data, guid_map)
+        matcher = GUIDMatcher(guid_map)
+        hits = matcher.find(data)
+        self.assertEqual(matcher.apply(data, hits), expected)
+        self.assertEqual(len(hits), count)
+        self.assertEqual(hits, sorted(hits))
+
+        buf = bytearray(data)
+        self.assertTrue(matcher.patch(buf, hits))
+        self.assertEqual(bytes(buf), expected)
+
+    def fuzz(self, map_size, rounds, seed):
+        rng = random.Random(seed)
+        for _ in range(rounds):
+            guid_map = {random_guid(rng): random_guid(rng) for _ in range(map_size)}
+            keys = list(guid_map) + [random_guid(rng) for _ in range(3)] # some unmapped GUIDs too
+            self.check(random_data(rng, keys, rng.randint(0, 200)), guid_map)
+
+    def test_small_map(self):
+        # Located with bytes.find per GUID
+        self.fuzz(3, 300, 1)
+
+    def test_map_at_direct_find_limit(self):
+        self.fuzz(DIRECT_FIND_MAX_GUIDS, 50, 2)
+
+    def test_big_map(self):
+        # More than DIRECT_FIND_MAX_GUIDS: tokenized window by window
+        self.fuzz(DIRECT_FIND_MAX_GUIDS + 36, 100, 3)
+
+    def test_big_map_small_windows(self):
+        # Many windows, most of them without a mapped GUID (rejected by the prefilter)
+        with mock.patch.object(GUIDFixerEngine, "MATCH_WINDOW_BYTES", 64):
+            self.fuzz(DIRECT_FIND_MAX_GUIDS + 36, 100, 4)
+            rng = random.Random(5)
+            guid_map = {random_guid(rng): random_guid(rng) for _ in range(100)}
+            filler = ("x" * 50 + "\n") * 200
+            key = next(iter(guid_map))
+            self.check((filler + key + "\n" + filler).encode('ascii'), guid_map)
+
+    def test_start_and_end_of_file(self):
+        rng = random.Random(6)
+        for size in (2, DIRECT_FIND_MAX_GUIDS + 10):
+            guid_map = {random_guid(rng): random_guid(rng) for _ in range(size)}
+            a, b = list(guid_map)[:2]
+            for data in (a, a + b, a + "\n" + b, "ff" + a, a + "ff", "  " + a + "\n  " + b):
+                self.check(data.encode('ascii'), guid_map)
+
+    def test_token_alignment(self):
+        # Only GUIDs starting a 32-char token of their hex run are replaced
+        guid_map = {"a" * 32: "b" * 32, "c" * 32: "d" * 32}
+        for size in (2, DIRECT_FIND_MAX_GUIDS + 10):
+            big_map = dict(guid_map)
+            rng = random.Random(size)
+            while len(big_map) < size:
+                big_map[random_guid(rng)] = random_guid(rng)
+            for data in ("a" * 32 + "c" * 32, "0123" + "a" * 32, "a" * 33, "a" * 64, "1" * 32 + "a" * 32):
+                self.check(data.encode('ascii'), big_map)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GUIDFixerEngine import GUIDFixerEngine
+from GUIDFixerWatch import MissingScriptState
+
+# GUID case: the missing scan, the watcher state and the direct replacement must all match GUIDs
+# exactly as written, so a reference in another case than its meta is missing everywhere and a fix
+# built from the report finds its bytes
+
+YAML_HEADER = "%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"
+LOWER = "0123456789abcdef0123456789abcdef"
+UPPER = "ABCDEF0123456789ABCDEF0123456789"
+NEW = "fedcba9876543210fedcba9876543210"
+
+def script_ref(guid):
+    return f"  m_Script: {{fileID: 11500000, guid: {guid}, type: 3}}\n"
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='\n') as f:
+        f.write(text)
+
+class MissingCaseTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.assets = os.path.join(self.root, "Assets")
+        write(os.path.join(self.assets, "Scripts", "Known.cs.meta"), f"fileFormatVersion: 2\nguid: {LOWER}\n")
+        write(os.path.join(self.assets, "Scripts", "Upper.cs.meta"), f"fileFormatVersion: 2\nguid: {UPPER}\n")
+        # LOWER in uppercase has no meta; UPPER in lowercase has none either
+        refs = script_ref(LOWER) + script_ref(LOWER.upper()) * 2 + script_ref(UPPER) + script_ref(UPPER.lower())
+        self.scene = os.path.join(self.assets, "Scene.unity")
+        write(self.scene, YAML_HEADER + "--- !u!114 &1\nMonoBehaviour:\n" + refs)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def engine(self, use_index=False):
+        return GUIDFixerEngine(log=lambda *args: None, cache_path=os.path.join(self.root, "cache.sqlite"), workers=1, use_index=use_index)
+
+    def test_scan_matches_watcher(self):
+        # Reported with their own spelling (example files differ: the scan lists a file once per reference)
+        expected = [(LOWER.upper(), 2), (UPPER.lower(), 1)]
+        for use_index in (False, True):
+            report = self.engine(use_index).run_missing_scan(self.assets)
+            self.assertEqual([(m["guid"], m["count"]) for m in report["missing"]], expected)
+            self.assertEqual(report["valid_guids"], 2)
+
+        state = MissingScriptState(self.engine(), self.assets)
+        state.load()
+        self.assertEqual([(m["guid"], m["count"]) for m in state.report()["missing"]], expected)
+        self.assertEqual(state.report()["valid_guids"], 2)
+
+    def test_fix_from_report(self):
+        engine = self.engine()
+        missing = engine.run_missing_scan(self.assets)["missing"]
+        guid_map = {m["guid"]: NEW for m in missing}
+        result = engine.run_direct_guid_replacement(self.assets, guid_map)
+        self.assertEqual(result["replacements"], 3)
+        self.assertEqual(engine.run_missing_scan(self.assets)["missing"], [{"guid": NEW, "count": 3, "example_files": ["Scene.unity"] * 3}])
+        with open(self.scene) as f:
+            text = f.read()
+        self.assertEqual(text.count(LOWER), 1)
+        self.assertEqual(text.count(UPPER), 1)
+
+if __name__ == "__main__":
+    unittest.main()
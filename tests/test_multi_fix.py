@@ -0,0 +1,91 @@
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GUIDFixerEngine import GUIDFixerEngine
+
+# run_multi_fix over several checkouts must report like run_fix (same keys and value types, totals)
+
+HEX = "0123456789abcdef"
+YAML_HEADER = "%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"
+
+def random_guid(rng):
+    return "".join(rng.choice(HEX) for _ in range(32))
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='\n') as f:
+        f.write(text)
+
+def make_project(root, old, new, seed):
+    # Old scripts in Scripts/, the same scripts (new GUIDs) in Library/PackageCache, references in Assets/
+    rng = random.Random(seed)
+    for name in old:
+        meta = "fileFormatVersion: 2\nguid: {}\n"
+        write(os.path.join(root, "Scripts", "com.me.pkg", "Runtime", name + ".meta"), meta.format(old[name]))
+        write(os.path.join(root, "Library", "PackageCache", "com.me.pkg@1.0.0", "Runtime", name + ".meta"), meta.format(new[name]))
+    for i in range(4):
+        refs = "".join(f"  m_Script: {{fileID: 11500000, guid: {rng.choice(list(old.values()))}, type: 3}}\n" for _ in range(5))
+        write(os.path.join(root, "Assets", "Scenes", f"Scene{i}.unity"), YAML_HEADER + "--- !u!114 &1\nMonoBehaviour:\n" + refs)
+    write(os.path.join(root, "Assets", "Code.cs"), "// nothing to replace\n")
+
+class MultiFixTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        rng = random.Random(1)
+        old = {f"Script{i}.cs": random_guid(rng) for i in range(3)}
+        new = {name: random_guid(rng) for name in old}
+        for name in ("Single", "A", "B"):
+            make_project(os.path.join(self.root, name), old, new, 2)
+        self.logs = []
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def engine(self):
+        return GUIDFixerEngine(log=lambda message, level=None: self.logs.append(message),
+                               cache_path=os.path.join(self.root, "cache.sqlite"), workers=1)
+
+    def args(self, project):
+        root = os.path.join(self.root, project)
+        mappings = [(os.path.join(root, "Scripts", "com.me.pkg"), os.path.join(root, "Library", "PackageCache", "com.me.pkg@1.0.0"))]
+        return os.path.join(root, "Assets"), mappings, None, os.path.join(root, "Scripts")
+
+    def test_result_matches_run_fix(self):
+        unity_path, mappings, source_path, old_path = self.args("Single")
+        single = self.engine().run_fix(unity_path, mappings, source_path, old_path)
+
+        _, mappings, source_path, old_path = self.args("A")
+        unity_paths = [os.path.join(self.root, name, "Assets") for name in ("A", "B")]
+        multi = self.engine().run_multi_fix(unity_paths, mappings, source_path, old_path)
+
+        # Same top-level schema as run_fix (plus the multi-project keys)
+        for key, value in single.items():
+            if key == "unity_path":
+                continue
+            self.assertIn(key, multi)
+            self.assertIsInstance(multi[key], type(value), key)
+        self.assertEqual(multi["guid_map"], single["guid_map"])
+
+        # Totals are the single-project numbers twice
+        self.assertEqual(len(multi["updated_files"]), 2 * len(single["updated_files"]))
+        self.assertEqual(multi["replacements"], 2 * single["replacements"])
+        self.assertEqual(multi["files_scanned"], 2 * single["files_scanned"])
+        self.assertEqual(multi["file_kinds"], {kind: 2 * count for kind, count in single["file_kinds"].items()})
+        self.assertEqual([len(project["updated_files"]) for project in multi["projects"]], [len(single["updated_files"])] * 2)
+
+    def test_summary_log(self):
+        _, mappings, source_path, old_path = self.args("A")
+        unity_paths = [os.path.join(self.root, name, "Assets") for name in ("A", "B")]
+        result = self.engine().run_multi_fix(unity_paths, mappings, source_path, old_path)
+        summary = [message for message in self.logs if message.startswith("All projects done:")]
+        self.assertEqual(summary, [f"All projects done: {len(result['updated_files'])} files updated, {result['replacements']} replacements."])
+        self.assertGreater(len(result["updated_files"]), 0)
+
+if __name__ == "__main__":
+    unittest.main()
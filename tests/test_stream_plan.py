@@ -0,0 +1,177 @@
+import io
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GUIDFixerEngine import GUIDFixerEngine, GUIDMatcher, GUID_TOKEN_PATTERN, iter_file_windows, replace_guids_in_file
+
+# Stream mode (windowed matching) and plan -> apply: both must give what a whole-file run gives
+
+HEX = "0123456789abcdef"
+YAML_HEADER = "%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"
+
+def random_guid(rng):
+    return "".join(rng.choice(HEX) for _ in range(32))
+
+def random_data(rng, keys, pieces):
+    # Long hex runs (no newline for a while) and GUIDs, so windows often have to end inside a hex run
+    parts = []
+    for _ in range(pieces):
+        roll = rng.random()
+        if roll < 0.35:
+            parts.append(rng.choice(keys))
+        elif roll < 0.6:
+            parts.append("".join(rng.choice(HEX) for _ in range(rng.randint(1, 100))))
+        elif roll < 0.75:
+            parts.append("\n")
+        else:
+            parts.append(rng.choice([" ", ": ", "{fileID: 11500000, guid: ", ", type: 3}", "x"]))
+    return "".join(parts).encode('ascii')
+
+def script_ref(guid):
+    return f"  m_Script: {{fileID: 11500000, guid: {guid}, type: 3}}\n"
+
+def meta(guid):
+    return f"fileFormatVersion: 2\nguid: {guid}\nMonoImporter:\n  serializedVersion: 2\n"
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='\n') as f:
+        f.write(text)
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+class FileWindowsTest(unittest.TestCase):
+    def test_windows_never_split_a_guid(self):
+        rng = random.Random(1)
+        for _ in range(300):
+            guid_map = {random_guid(rng): random_guid(rng) for _ in range(rng.choice((3, 80)))}
+            data = random_data(rng, list(guid_map), rng.randint(0, 120))
+            chunk_bytes = rng.randint(33, 200)
+            windows = list(iter_file_windows(io.BytesIO(data), chunk_bytes))
+
+            # Windows cover the data exactly, in order
+            self.assertEqual(b"".join(window for _, window in windows), data)
+            expected_offset = 0
+            for offset, window in windows:
+                self.assertEqual(offset, expected_offset)
+                expected_offset += len(window)
+
+            # Same tokens, and the same hits, as matching the whole data
+            tokens = [(offset + m.start(), m.group()) for offset, window in windows for m in GUID_TOKEN_PATTERN.finditer(window)]
+            self.assertEqual(tokens, [(m.start(), m.group()) for m in GUID_TOKEN_PATTERN.finditer(data)])
+            matcher = GUIDMatcher(guid_map)
+            hits = [(offset + hit, old_g) for offset, window in windows for hit, old_g in matcher.find(window)]
+            self.assertEqual(hits, matcher.find(data))
+
+    def test_one_long_hex_run(self):
+        rng = random.Random(2)
+        data = "".join(rng.choice(HEX) for _ in range(32 * 40 + 7)).encode('ascii')
+        for chunk_bytes in (33, 64, 100):
+            windows = list(iter_file_windows(io.BytesIO(data), chunk_bytes))
+            self.assertEqual(b"".join(window for _, window in windows), data)
+            self.assertTrue(all(offset % 32 == 0 for offset, _ in windows))
+
+class StreamWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_stream_matches_mmap(self):
+        rng = random.Random(3)
+        for i in range(40):
+            guid_map = {random_guid(rng): random_guid(rng) for _ in range(rng.choice((3, 80)))}
+            data = YAML_HEADER.encode('ascii') + random_data(rng, list(guid_map), rng.randint(10, 150))
+            results = {}
+            for write_mode in ("mmap", "stream"):
+                path = os.path.join(self.root, f"{write_mode}{i}.asset")
+                with open(path, 'wb') as f:
+                    f.write(data)
+                result = replace_guids_in_file(path, GUIDMatcher(guid_map), write_mode=write_mode, chunk_bytes=rng.randint(33, 120))
+                self.assertNotIn("error", result)
+                results[write_mode] = (read(path), result["replacements"])
+            self.assertEqual(results["stream"], results["mmap"])
+
+class PlanApplyTest(unittest.TestCase):
+    # Old scripts in Scripts/, the same scripts (new GUIDs) in Library/PackageCache, references in Assets/
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        rng = random.Random(4)
+        self.old = {f"Script{i}.cs": random_guid(rng) for i in range(5)}
+        self.new = {name: random_guid(rng) for name in self.old}
+        for name in self.old:
+            write(os.path.join(self.root, "Scripts", "com.me.pkg", "Runtime", name + ".meta"), meta(self.old[name]))
+            write(os.path.join(self.root, "Library", "PackageCache", "com.me.pkg@1.0.0", "Runtime", name + ".meta"), meta(self.new[name]))
+        guids = list(self.old.values())
+        for i in range(6):
+            refs = "".join(script_ref(rng.choice(guids)) for _ in range(10))
+            write(os.path.join(self.root, "Assets", "Scenes", f"Scene{i}.unity"), YAML_HEADER + "--- !u!114 &1\nMonoBehaviour:\n" + refs)
+        self.mappings = [(os.path.join(self.root, "Scripts", "com.me.pkg"), os.path.join(self.root, "Library", "PackageCache", "com.me.pkg@1.0.0"))]
+        self.plan_path = os.path.join(self.root, "plan.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def engine(self, write_mode="mmap"):
+        engine = GUIDFixerEngine(log=lambda *args: None, cache_path=os.path.join(self.root, "cache.sqlite"), workers=1, write_mode=write_mode)
+        engine.chunk_bytes = 40 # Engine minimum is 64 KB; tiny windows exercise the window edges
+        return engine
+
+    def expected(self, path):
+        # The file with every old GUID replaced (what run_fix writes)
+        data = read(path)
+        for name, old_g in self.old.items():
+            data = data.replace(old_g.encode('ascii'), self.new[name].encode('ascii'))
+        return data
+
+    def run_round_trip(self, write_mode, replan):
+        assets = os.path.join(self.root, "Assets")
+        plan = self.engine(write_mode).run_plan(assets, self.mappings, None, os.path.join(self.root, "Scripts"), self.plan_path)
+        self.assertEqual(plan["planned_files"], 6)
+
+        # Changed after planning: a reference added in front, so every planned offset moved
+        changed = os.path.join(assets, "Scenes", "Scene0.unity")
+        before = read(changed)
+        write(changed, before.decode('ascii').replace("MonoBehaviour:\n", "MonoBehaviour:\n" + script_ref(self.old["Script0.cs"]), 1))
+        changed_data = read(changed)
+        changed_expected = self.expected(changed)
+        others = {os.path.join(assets, "Scenes", f"Scene{i}.unity") for i in range(1, 6)}
+        expected = {path: self.expected(path) for path in others}
+
+        result = self.engine(write_mode).run_apply_plan(self.plan_path, replan=replan)
+        self.assertEqual(result["errors"], [])
+        for path in others:
+            self.assertEqual(read(path), expected[path])
+        if replan:
+            self.assertEqual(result["plan_status"]["replanned"], 1)
+            self.assertEqual(read(changed), changed_expected)
+            self.assertNotEqual(changed_expected, changed_data)
+        else:
+            self.assertEqual(result["plan_status"]["skipped"], 1)
+            self.assertEqual(read(changed), changed_data)
+        self.assertEqual(result["plan_status"]["applied"], 5)
+        self.assertEqual(result["changed_files"], [{"path": changed, "plan": "replanned" if replan else "skipped"}])
+
+    def test_replan_changed_file_mmap(self):
+        self.run_round_trip("mmap", replan=True)
+
+    def test_replan_changed_file_stream(self):
+        self.run_round_trip("stream", replan=True)
+
+    def test_skip_changed_file_mmap(self):
+        self.run_round_trip("mmap", replan=False)
+
+    def test_skip_changed_file_stream(self):
+        self.run_round_trip("stream", replan=False)
+
+if __name__ == "__main__":
+    unittest.main()